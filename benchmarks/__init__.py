@@ -0,0 +1,4 @@
+"""Benchmarks of the RCON clients against local stand-in servers.
+
+Run them with "python -m benchmarks" from the repository's root directory.
+"""
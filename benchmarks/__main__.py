@@ -0,0 +1,369 @@
+"""Run the benchmarks and print the results as JSON."""
+
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from asyncio import TimeoutError as AsyncTimeoutError, gather, run
+from importlib.metadata import PackageNotFoundError, version
+from json import dump
+from platform import platform, python_implementation, python_version
+from statistics import fmean, quantiles
+from sys import stdout
+from time import perf_counter
+from tracemalloc import start, stop, take_snapshot
+from typing import Any, Callable
+
+from rcon import battleye, source
+from rcon.source.proto import Decoder, Packet, Type
+
+from benchmarks.servers import Behaviour, FakeBattlEyeServer, FakeSourceServer
+from benchmarks.servers import ServerProcess, ServerThread
+
+PACKET_SIZES = (16, 1024, 4096)
+TIMEOUTS = (TimeoutError, AsyncTimeoutError)
+LOGIN_ERRORS = (OSError, AsyncTimeoutError)
+
+
+def get_args(description: str = __doc__) -> Namespace:
+    """Parse the command line arguments."""
+
+    parser = ArgumentParser(description=description)
+    parser.add_argument(
+        "-b",
+        "--benchmark",
+        action="append",
+        choices=BENCHMARKS,
+        help="benchmark to run, may be given multiple times (default: all)",
+    )
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument("-s", "--size", type=int, default=64, help="response size")
+    parser.add_argument("-f", "--fragment-size", type=int, default=4096)
+    parser.add_argument("-l", "--latency", type=float, default=0, help="in seconds")
+    parser.add_argument("-p", "--loss", type=float, default=0, help="UDP loss rate")
+    parser.add_argument("-c", "--connections", type=int, default=32)
+    parser.add_argument("-t", "--timeout", type=float, default=1)
+    parser.add_argument("-o", "--output", help="write the results to this file")
+    return parser.parse_args()
+
+
+def get_version() -> str:
+    """Return the installed version of the library."""
+
+    try:
+        return version("rcon")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def throughput(function: Callable[[], Any], amount: int) -> float:
+    """Return the calls of the function per second."""
+
+    started = perf_counter()
+
+    for _ in range(amount):
+        function()
+
+    return amount / (perf_counter() - started)
+
+
+def latencies(samples: list[float]) -> dict[str, float]:
+    """Summarize latencies in milliseconds.
+
+    Percentiles are interpolated between the samples only, so that none exceeds
+    the maximum. Without samples, all values are None.
+    """
+
+    if not samples:
+        return dict.fromkeys(("mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"))
+
+    if len(samples) < 2:
+        percentiles = samples * 99
+    else:
+        percentiles = quantiles(samples, n=100, method="inclusive")
+
+    return {
+        "mean_ms": fmean(samples) * 1000,
+        "p50_ms": percentiles[49] * 1000,
+        "p90_ms": percentiles[89] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+
+
+async def log_in(client: source.AsyncClient | battleye.AsyncClient) -> bool:
+    """Connect and log in the client and return whether it succeeded."""
+
+    try:
+        await client.__aenter__()
+    except LOGIN_ERRORS:
+        return False
+
+    return True
+
+
+def packet_codec(args: Namespace) -> dict[str, Any]:
+    """Measure Source RCON packet encoding and decoding."""
+
+    results = {}
+
+    for size in PACKET_SIZES:
+        packet = Packet(1, Type.SERVERDATA_RESPONSE_VALUE, b"x" * size)
+        data = bytes(packet) * args.requests
+        decoder = Decoder()
+
+        def decode() -> None:
+            decoder.feed(data)
+            decoder.decode()
+
+        encodes = throughput(lambda: bytes(packet), args.requests * 10)
+        decodes = throughput(decode, 10) * args.requests
+        results[str(size)] = {
+            "encode_per_s": encodes,
+            "decode_per_s": decodes,
+            "encode_mb_per_s": encodes * len(bytes(packet)) / 1e6,
+            "decode_mb_per_s": decodes * len(bytes(packet)) / 1e6,
+        }
+
+    return results
+
+
+def run_latency(
+    args: Namespace, client: source.Client | battleye.Client
+) -> dict[str, Any]:
+    """Measure the latency of Client.run().
+
+    If the login fails, the BattlEye client logs in again on the next command.
+    """
+
+    samples = []
+    failures = 0
+    command = f"size {args.size}"
+
+    try:
+        try:
+            client.connect(login=True)
+        except LOGIN_ERRORS:
+            failed_logins = 1
+        else:
+            failed_logins = 0
+
+        for _ in range(args.requests):
+            started = perf_counter()
+
+            try:
+                client.run(command)
+            except TIMEOUTS:
+                failures += 1
+                continue
+
+            samples.append(perf_counter() - started)
+    finally:
+        client.close()
+
+    return {**latencies(samples), "failures": failures, "failed_logins": failed_logins}
+
+
+def source_latency(args: Namespace, behaviour: Behaviour) -> dict[str, Any]:
+    """Measure the latency of the Source RCON client."""
+
+    with ServerThread() as thread:
+        thread.call((server := FakeSourceServer(behaviour)).start())
+        return run_latency(
+            args,
+            source.Client(
+                "127.0.0.1",
+                server.port,
+                timeout=args.timeout,
+                passwd=behaviour.passwd,
+                frag_threshold=behaviour.fragment_size,
+            ),
+        )
+
+
+def battleye_latency(args: Namespace, behaviour: Behaviour) -> dict[str, Any]:
+    """Measure the latency of the BattlEye RCon client."""
+
+    with ServerThread() as thread:
+        thread.call((server := FakeBattlEyeServer(behaviour)).start())
+        return run_latency(
+            args,
+            battleye.Client(
+                "127.0.0.1", server.port, timeout=args.timeout, passwd=behaviour.passwd
+            ),
+        )
+
+
+async def fan_out(
+    args: Namespace, clients: list[source.AsyncClient | battleye.AsyncClient]
+) -> dict[str, Any]:
+    """Run the requests distributed over the clients concurrently.
+
+    Clients, which fail to log in, are left out.
+    """
+
+    command = f"size {args.size}"
+    per_client = max(args.requests // len(clients), 1)
+    logins = await gather(*map(log_in, clients))
+    clients = [client for client, success in zip(clients, logins) if success]
+
+    async def run_commands(client: source.AsyncClient | battleye.AsyncClient) -> int:
+        failures = 0
+
+        for _ in range(per_client):
+            try:
+                await client.run(command)
+            except TIMEOUTS:
+                failures += 1
+
+        return failures
+
+    try:
+        started = perf_counter()
+        failures = sum(await gather(*map(run_commands, clients)))
+        elapsed = perf_counter() - started
+    finally:
+        await gather(*(client.close() for client in clients))
+
+    return {
+        "connections": len(clients),
+        "requests": per_client * len(clients),
+        "requests_per_s": per_client * len(clients) / elapsed,
+        "failures": failures,
+        "failed_logins": logins.count(False),
+    }
+
+
+def source_fan_out(args: Namespace, behaviour: Behaviour) -> dict[str, Any]:
+    """Measure the throughput of many asynchronous Source RCON clients."""
+
+    async def benchmark() -> dict[str, Any]:
+        await (server := FakeSourceServer(behaviour)).start()
+
+        try:
+            return await fan_out(
+                args,
+                [
+                    source.AsyncClient(
+                        "127.0.0.1",
+                        server.port,
+                        timeout=args.timeout,
+                        passwd=behaviour.passwd,
+                        frag_threshold=behaviour.fragment_size,
+                    )
+                    for _ in range(args.connections)
+                ],
+            )
+        finally:
+            await server.stop()
+
+    return run(benchmark())
+
+
+def battleye_fan_out(args: Namespace, behaviour: Behaviour) -> dict[str, Any]:
+    """Measure the throughput of many asynchronous BattlEye RCon clients."""
+
+    async def benchmark() -> dict[str, Any]:
+        await (server := FakeBattlEyeServer(behaviour)).start()
+
+        try:
+            return await fan_out(
+                args,
+                [
+                    battleye.AsyncClient(
+                        "127.0.0.1",
+                        server.port,
+                        timeout=args.timeout,
+                        passwd=behaviour.passwd,
+                    )
+                    for _ in range(args.connections)
+                ],
+            )
+        finally:
+            await server.stop()
+
+    return run(benchmark())
+
+
+def memory_per_connection(args: Namespace, behaviour: Behaviour) -> dict[str, Any]:
+    """Measure the memory allocated per logged-in asynchronous client."""
+
+    async def measure(port: int, cls: type) -> tuple[float | None, int]:
+        clients = [
+            cls("127.0.0.1", port, timeout=args.timeout, passwd=behaviour.passwd)
+            for _ in range(args.connections)
+        ]
+        start()
+        before = take_snapshot()
+
+        try:
+            logins = await gather(*map(log_in, clients))
+            after = take_snapshot()
+        finally:
+            stop()
+            await gather(*(client.close() for client in clients))
+
+        if not (logged_in := logins.count(True)):
+            return None, len(clients)
+
+        allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        return allocated / logged_in, len(clients) - logged_in
+
+    with ServerProcess(FakeSourceServer(behaviour)) as server:
+        source_bytes, source_failed = run(measure(server.port, source.AsyncClient))
+
+    with ServerProcess(FakeBattlEyeServer(behaviour)) as server:
+        battleye_bytes, battleye_failed = run(
+            measure(server.port, battleye.AsyncClient)
+        )
+
+    return {
+        "source_bytes": source_bytes,
+        "battleye_bytes": battleye_bytes,
+        "source_failed_logins": source_failed,
+        "battleye_failed_logins": battleye_failed,
+    }
+
+
+BENCHMARKS = {
+    "packet_codec": lambda args, _: packet_codec(args),
+    "source_latency": source_latency,
+    "battleye_latency": battleye_latency,
+    "source_fan_out": source_fan_out,
+    "battleye_fan_out": battleye_fan_out,
+    "memory_per_connection": memory_per_connection,
+}
+
+
+def main() -> None:
+    """Run the selected benchmarks."""
+
+    args = get_args()
+    behaviour = Behaviour(
+        fragment_size=args.fragment_size, latency=args.latency, loss=args.loss
+    )
+    results = {
+        "rcon": get_version(),
+        "python": f"{python_implementation()} {python_version()}",
+        "platform": platform(),
+        "parameters": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in {"benchmark", "output"}
+        },
+        "results": {
+            name: benchmark(args, behaviour)
+            for name, benchmark in BENCHMARKS.items()
+            if not args.benchmark or name in args.benchmark
+        },
+    }
+
+    if args.output is None:
+        dump(results, stdout, indent=2)
+        print()
+        return
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Stand-in Source RCON and BattlEye RCon servers."""
+
+from __future__ import annotations
+from asyncio import AbstractEventLoop, DatagramProtocol, DatagramTransport, Event
+from asyncio import IncompleteReadError, Server, StreamReader, StreamWriter
+from asyncio import all_tasks, current_task, get_running_loop, wait
+from asyncio import new_event_loop, run, run_coroutine_threadsafe, sleep, start_server
+from dataclasses import dataclass
+from multiprocessing import Process, SimpleQueue
+from random import Random
+from struct import Struct
+from threading import Thread
+from typing import Any, Coroutine
+from zlib import crc32
+
+
+__all__ = [
+    "Behaviour",
+    "FakeBattlEyeServer",
+    "FakeSourceServer",
+    "ServerProcess",
+    "ServerThread",
+]
+
+
+SIZE = Struct("<i")
+BODY = Struct("<ii")
+SOURCE_LOGIN = 3
+SOURCE_RESPONSE = 0
+BATTLEYE_PREFIX = b"BE"
+
+
+@dataclass
+class Behaviour:
+    """Configures how a stand-in server responds.
+
+    Commands of the form "size <n>" are answered with n bytes,
+    all other commands are echoed.
+    """
+
+    passwd: str = "benchmark"
+    fragment_size: int = 4096
+    latency: float = 0
+    loss: float = 0
+    seed: int = 0
+
+    def respond(self, command: bytes) -> bytes:
+        """Return the response to the given command."""
+        if command.startswith(b"size "):
+            return b"x" * int(command[5:])
+
+        return command
+
+
+class FakeSourceServer:
+    """Serves the Source RCON protocol over TCP.
+
+    Responses are split into fragments of the configured size. Like real
+    servers, an empty SERVERDATA_RESPONSE_VALUE packet is mirrored and
+    followed by a packet with the payload 0x00 0x01 0x00 0x00.
+    TCP does not lose packets, so the loss rate is ignored.
+    """
+
+    def __init__(self, behaviour: Behaviour | None = None):
+        self.behaviour = behaviour or Behaviour()
+        self.server: Server | None = None
+        self.port: int | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening."""
+        self.server = await start_server(self.handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        """Answer the requests of a client."""
+        try:
+            while True:
+                (size,) = SIZE.unpack(await reader.readexactly(SIZE.size))
+                body = await reader.readexactly(size)
+                request_id, typ = BODY.unpack_from(body)
+
+                if self.behaviour.latency:
+                    await sleep(self.behaviour.latency)
+
+                writer.write(b"".join(self.responses(request_id, typ, body[8:-2])))
+                await writer.drain()
+        except (ConnectionError, IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def responses(self, request_id: int, typ: int, payload: bytes) -> list[bytes]:
+        """Return the encoded responses to a request."""
+        if typ == SOURCE_LOGIN:
+            if payload.decode() != self.behaviour.passwd:
+                request_id = -1
+
+            return [
+                encode(request_id, SOURCE_RESPONSE, b""),
+                encode(request_id, 2, b""),
+            ]
+
+        if typ == SOURCE_RESPONSE:
+            return [
+                encode(request_id, SOURCE_RESPONSE, b""),
+                encode(request_id, SOURCE_RESPONSE, b"\x00\x01\x00\x00"),
+            ]
+
+        response = self.behaviour.respond(payload)
+        size = self.behaviour.fragment_size
+        return [
+            encode(request_id, SOURCE_RESPONSE, response[offset : offset + size])
+            for offset in range(0, len(response) or 1, size)
+        ]
+
+
+class FakeBattlEyeServer(DatagramProtocol):
+    """Serves the BattlEye RCon protocol over UDP.
+
+    Responses larger than the fragment size are sent as multipart responses.
+    Incoming datagrams are dropped at the configured loss rate.
+    """
+
+    def __init__(self, behaviour: Behaviour | None = None):
+        self.behaviour = behaviour or Behaviour()
+        self.random = Random(self.behaviour.seed)
+        self.transport: DatagramTransport | None = None
+        self.port: int | None = None
+        self.loop: AbstractEventLoop | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening."""
+        self.loop = get_running_loop()
+        await self.loop.create_datagram_endpoint(lambda: self, local_addr=(host, port))
+        self.port = self.transport.get_extra_info("sockname")[1]
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        self.transport.close()
+
+    def connection_made(self, transport: DatagramTransport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Answer a request."""
+        if self.behaviour.loss and self.random.random() < self.behaviour.loss:
+            return
+
+        if (typ := data[7]) == 0x00:
+            responses = [
+                frame(0x00, bytes((data[8:] == self.behaviour.passwd.encode(),)))
+            ]
+        elif typ == 0x01:
+            responses = self.command_responses(data[8], data[9:])
+        else:
+            return
+
+        if self.behaviour.latency:
+            self.loop.call_later(self.behaviour.latency, self.send, responses, addr)
+        else:
+            self.send(responses, addr)
+
+    def command_responses(self, seq: int, command: bytes) -> list[bytes]:
+        """Return the encoded response parts to a command."""
+        response = self.behaviour.respond(command)
+        size = self.behaviour.fragment_size
+
+        if len(response) <= size:
+            return [frame(0x01, bytes((seq,)) + response)]
+
+        parts = [
+            response[offset : offset + size] for offset in range(0, len(response), size)
+        ]
+        return [
+            frame(0x01, bytes((seq, 0x00, len(parts), index)) + part)
+            for index, part in enumerate(parts)
+        ]
+
+    def send(self, responses: list[bytes], addr: tuple[str, int]) -> None:
+        """Send the responses."""
+        for response in responses:
+            self.transport.sendto(response, addr)
+
+
+class ServerThread(Thread):
+    """Runs an event loop for stand-in servers in the background.
+
+    This allows synchronous clients to be benchmarked in the main thread.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.loop = new_event_loop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        self.call(finish_tasks())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+        self.loop.close()
+
+    def run(self) -> None:
+        """Run the event loop."""
+        self.loop.run_forever()
+
+    def call(self, coroutine: Coroutine) -> Any:
+        """Run the coroutine in the event loop and return its result."""
+        return run_coroutine_threadsafe(coroutine, self.loop).result()
+
+
+class ServerProcess(Process):
+    """Runs a stand-in server in a separate process.
+
+    This keeps the server's allocations out of memory measurements.
+    """
+
+    def __init__(self, server: FakeSourceServer | FakeBattlEyeServer):
+        super().__init__(daemon=True)
+        self.server = server
+        self.ports = SimpleQueue()
+        self.port: int | None = None
+
+    def __enter__(self):
+        self.start()
+        self.port = self.ports.get()
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        self.terminate()
+        self.join()
+
+    def run(self) -> None:
+        """Serve until terminated."""
+        run(self.serve())
+
+    async def serve(self) -> None:
+        """Start the server and report its port."""
+        await self.server.start()
+        self.ports.put(self.server.port)
+        await Event().wait()
+
+
+async def finish_tasks(timeout: float = 1) -> None:
+    """Wait for the other tasks of the running event loop
+    to finish and cancel those that do not in time.
+    """
+    if tasks := all_tasks() - {current_task()}:
+        _, pending = await wait(tasks, timeout=timeout)
+
+        for task in pending:
+            task.cancel()
+
+
+def encode(request_id: int, typ: int, payload: bytes) -> bytes:
+    """Encode a Source RCON packet."""
+    return b"".join(
+        (SIZE.pack(len(payload) + 10), BODY.pack(request_id, typ), payload, b"\x00\x00")
+    )
+
+
+def frame(typ: int, payload: bytes) -> bytes:
+    """Encode a BattlEye RCon packet."""
+    body = bytes((0xFF, typ)) + payload
+    return BATTLEYE_PREFIX + crc32(body).to_bytes(4, "little") + body
@@ -1,7 +1,16 @@
 """BattlEye RCON implementation."""
 
+from rcon.battleye.async_client import AsyncClient
 from rcon.battleye.client import Client
+from rcon.battleye.events import AsyncEventStream, EventStream, Policy
 from rcon.battleye.proto import ServerMessage
 
 
-__all__ = ["Client", "ServerMessage"]
+__all__ = [
+    "AsyncClient",
+    "AsyncEventStream",
+    "Client",
+    "EventStream",
+    "Policy",
+    "ServerMessage",
+]
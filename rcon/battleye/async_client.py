@@ -0,0 +1,327 @@
+"""Asynchronous BattlEye RCon client."""
+
+from __future__ import annotations
+from asyncio import DatagramProtocol, DatagramTransport, Future, Lock, Semaphore
+from asyncio import Task, TimeoutError as AsyncTimeoutError
+from asyncio import create_task, get_running_loop, sleep, wait_for
+from inspect import isawaitable
+from logging import getLogger
+from time import monotonic
+from typing import Awaitable, Callable
+
+from rcon.battleye.events import AsyncEventStream, Policy
+from rcon.battleye.proto import HEADER_SIZE
+from rcon.battleye.proto import RESPONSE_TYPES
+from rcon.battleye.proto import CommandRequest
+from rcon.battleye.proto import CommandResponse
+from rcon.battleye.proto import Header
+from rcon.battleye.proto import LoginRequest
+from rcon.battleye.proto import LoginResponse
+from rcon.battleye.proto import MultipartResponse
+from rcon.battleye.proto import Request
+from rcon.battleye.proto import Response
+from rcon.battleye.proto import ServerMessage
+from rcon.battleye.proto import ServerMessageAck
+from rcon.battleye.window import SequenceWindow
+from rcon.battleye.client import SESSION_TIMEOUT
+from rcon.client import AsyncBaseClient
+from rcon.exceptions import WrongPassword
+
+
+__all__ = ["AsyncClient"]
+
+
+LOGGER = getLogger(__file__)
+AsyncMessageHandler = Callable[[ServerMessage], Awaitable[None] | None]
+
+
+async def log_message(server_message: ServerMessage) -> None:
+    """Default handler, logging the server message."""
+
+    getLogger("Server message").info(server_message.message)
+
+
+class Protocol(DatagramProtocol):
+    """Passes received datagrams on to the client."""
+
+    def __init__(self, client: AsyncClient):
+        """Set the client."""
+        self.client = client
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Hand the datagram to the client."""
+        self.client.datagram_received(data)
+
+    def error_received(self, exc: Exception) -> None:
+        """Fail the client's pending requests."""
+        self.client.fail_pending(exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Fail the client's pending requests."""
+        self.client.fail_pending(exc or ConnectionResetError("Connection closed."))
+
+
+class AsyncClient(AsyncBaseClient):
+    """Asynchronous BattlEye RCon client.
+
+    A single event loop can serve many clients,
+    each of which may run multiple commands concurrently.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        timeout: float | None = None,
+        passwd: str | None = None,
+        message_handler: AsyncMessageHandler = log_message,
+        keepalive: float | None = None,
+    ):
+        """Set the connection parameters.
+
+        The message handler may be a coroutine function or a plain function.
+        If a keepalive interval in seconds is given, an empty command is sent
+        periodically, since the server drops idle sessions after SESSION_TIMEOUT.
+        """
+        super().__init__(host, port, timeout=timeout, passwd=passwd)
+        self.message_handler = message_handler
+        self.keepalive = keepalive
+        self.seq_num = 0x00
+        self._session = 0
+        self._last_command: float | None = None
+        self._keepalive: Task | None = None
+        self._transport: DatagramTransport | None = None
+        self._login: Future | None = None
+        self._login_lock = Lock()
+        self._pending: dict[int, Future] = {}
+        self._parts: dict[int, MultipartResponse] = {}
+        self._handlers: set[Task] = set()
+        self._events: AsyncEventStream | None = None
+        self._seen = SequenceWindow()
+        self._outstanding = Semaphore(0x100)
+
+    async def connect(self, login: bool = False) -> None:
+        """Create the datagram endpoint and attempt
+        a login if wanted and a password is set.
+        """
+        self._transport, _ = await get_running_loop().create_datagram_endpoint(
+            lambda: Protocol(self), remote_addr=(self.host, self.port)
+        )
+
+        if login and self.passwd is not None:
+            await self.login(self.passwd)
+
+        if self.keepalive is not None:
+            self._keepalive = create_task(self._keep_alive())
+
+    async def close(self) -> None:
+        """Close the transport and cancel pending requests."""
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            self._keepalive = None
+
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+        for future in self._pending.values():
+            future.cancel()
+
+        if self._login is not None:
+            self._login.cancel()
+
+        self._pending.clear()
+        self._parts.clear()
+
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+
+    async def login(self, passwd: str) -> bool:
+        """Log-in the user."""
+        async with self._login_lock:
+            return await self._log_in(passwd)
+
+    async def _log_in(self, passwd: str) -> bool:
+        """Log-in the user while holding the login lock."""
+        self._login = get_running_loop().create_future()
+
+        try:
+            self.send(LoginRequest(passwd))
+            response = await wait_for(self._login, timeout=self.timeout)
+        finally:
+            self._login = None
+
+        if not response.success:
+            raise WrongPassword()
+
+        self.passwd = passwd
+        self._session += 1
+        self._seen.clear()
+        self._last_command = monotonic()
+        return True
+
+    async def _log_in_again(self, session: int) -> None:
+        """Log in again, unless another coroutine did since the given session."""
+        async with self._login_lock:
+            if self._session == session:
+                await self._log_in(self.passwd)
+
+    @property
+    def session_expired(self) -> bool:
+        """Return whether the server has presumably dropped the session."""
+        return (
+            self._last_command is not None
+            and monotonic() - self._last_command >= SESSION_TIMEOUT
+        )
+
+    async def run(self, command: str, *args: str) -> str:
+        """Execute a command and return the text message.
+
+        If the session was lost, log in again before or after a timed out attempt.
+        Concurrent commands, which find the session lost, log in only once.
+        """
+        session = self._session
+
+        if self.session_expired and self.passwd is not None:
+            LOGGER.debug("Session expired. Logging in again.")
+            await self._log_in_again(session)
+            session = self._session
+
+        try:
+            return await self.communicate(command, *args)
+        except AsyncTimeoutError:
+            if self.passwd is None:
+                raise
+
+        LOGGER.debug("Command timed out. Logging in again.")
+        await self._log_in_again(session)
+        return await self.communicate(command, *args)
+
+    async def communicate(self, command: str, *args: str) -> str:
+        """Send a command request and wait for its response."""
+        async with self._outstanding:
+            while (seq := self.seq_num) in self._pending:
+                self.seq_num = seq + 1 & 0xFF
+
+            self.seq_num = seq + 1 & 0xFF
+            self._pending[seq] = future = get_running_loop().create_future()
+
+            try:
+                self.send(CommandRequest.from_command(seq, command, *args))
+                response = await wait_for(future, timeout=self.timeout)
+            finally:
+                self._pending.pop(seq, None)
+                self._parts.pop(seq, None)
+
+        self._last_command = monotonic()
+        return response
+
+    def events(
+        self, maxsize: int = 1024, policy: Policy = Policy.DROP
+    ) -> AsyncEventStream:
+        """Return the stream of server messages.
+
+        On the first call, the stream is created. From then on, server messages
+        are buffered in it instead of being passed to the message handler.
+        """
+        if self._events is None:
+            self._events = AsyncEventStream(maxsize, policy)
+
+        return self._events
+
+    async def send_keepalive(self) -> None:
+        """Send an empty command to keep the session alive."""
+        await self.run("")
+
+    def send(self, request: Request) -> None:
+        """Send a request."""
+        if self._transport is None:
+            raise RuntimeError("Not connected.")
+
+        self._transport.sendto(bytes(request))
+
+    def datagram_received(self, data: bytes) -> None:
+        """Parse and dispatch a received datagram."""
+        try:
+            header = Header.from_bytes(data[:HEADER_SIZE])
+            response = RESPONSE_TYPES[header.type].from_bytes(
+                header, data[HEADER_SIZE:]
+            )
+        except (KeyError, ValueError) as error:
+            LOGGER.warning("Discarding invalid datagram: %s", error)
+            return
+
+        self.dispatch(response)
+
+    def dispatch(self, response: Response) -> None:
+        """Handle a received response."""
+        if isinstance(response, ServerMessage):
+            self.handle_server_message(response)
+        elif isinstance(response, LoginResponse):
+            if self._login is not None and not self._login.done():
+                self._login.set_result(response)
+        elif isinstance(response, CommandResponse):
+            self.handle_command_response(response)
+
+    def handle_command_response(self, response: CommandResponse) -> None:
+        """Add the response part and resolve the command once complete."""
+        if (future := self._pending.get(response.seq)) is None:
+            LOGGER.debug("Discarding response to unknown command: %i", response.seq)
+            return
+
+        if (parts := self._parts.get(response.seq)) is None:
+            parts = self._parts[response.seq] = MultipartResponse(response.total)
+
+        try:
+            complete = parts.add(response)
+        except ValueError as error:
+            LOGGER.warning("Discarding response part: %s", error)
+            return
+
+        if complete:
+            del self._parts[response.seq]
+
+            if not future.done():
+                future.set_result(parts.message)
+
+    def handle_server_message(self, message: ServerMessage) -> None:
+        """Acknowledge the server message and pass it to
+        the event stream if there is one or to the handler otherwise.
+
+        Messages resent by the server are acknowledged again but not passed on.
+        """
+        if message.seq in self._seen:
+            LOGGER.debug("Discarding resent server message: %i", message.seq)
+            self.send(ServerMessageAck(message.seq))
+            return
+
+        if (events := self._events) is not None and not events.offer(message):
+            return
+
+        self._seen.add(message.seq)
+        self.send(ServerMessageAck(message.seq))
+
+        if events is None and isawaitable(result := self.message_handler(message)):
+            self._handlers.add(task := create_task(result))
+            task.add_done_callback(self._handlers.discard)
+
+    async def _keep_alive(self) -> None:
+        """Send keepalive packets periodically."""
+        while True:
+            await sleep(self.keepalive)
+
+            try:
+                await self.send_keepalive()
+            except Exception as error:
+                LOGGER.warning("Keepalive failed: %s", error)
+
+    def fail_pending(self, error: Exception) -> None:
+        """Fail all pending requests with the given error."""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+        if self._login is not None and not self._login.done():
+            self._login.set_exception(error)
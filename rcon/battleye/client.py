@@ -1,9 +1,15 @@
 """BattlEye RCon client."""
 
+from __future__ import annotations
 from logging import getLogger
+from queue import Empty, Queue
+from select import select
 from socket import SOCK_DGRAM
+from threading import Event, RLock, Thread, current_thread
+from time import monotonic
 from typing import Callable
 
+from rcon.battleye.events import EventStream, Policy
 from rcon.battleye.proto import HEADER_SIZE
 from rcon.battleye.proto import RESPONSE_TYPES
 from rcon.battleye.proto import CommandRequest
@@ -11,18 +17,24 @@ from rcon.battleye.proto import CommandResponse
 from rcon.battleye.proto import Header
 from rcon.battleye.proto import LoginRequest
 from rcon.battleye.proto import LoginResponse
+from rcon.battleye.proto import MultipartResponse
 from rcon.battleye.proto import Request
 from rcon.battleye.proto import Response
 from rcon.battleye.proto import ServerMessage
 from rcon.battleye.proto import ServerMessageAck
+from rcon.battleye.window import SequenceWindow
 from rcon.client import BaseClient
 from rcon.exceptions import WrongPassword
+from rcon.ratelimit import Priority
 
 
-__all__ = ["Client"]
+__all__ = ["SESSION_TIMEOUT", "Client", "Keepalive", "Receiver"]
 
 
+LOGGER = getLogger(__file__)
 MessageHandler = Callable[[ServerMessage], None]
+POLL_INTERVAL = 0.05
+SESSION_TIMEOUT = 45
 
 
 def log_message(server_message: ServerMessage) -> None:
@@ -31,8 +43,95 @@ def log_message(server_message: ServerMessage) -> None:
     getLogger("Server message").info(server_message.message)
 
 
+class Keepalive(Thread):
+    """Periodically sends empty commands to keep a session alive."""
+
+    def __init__(self, client: Client, interval: float):
+        """Set the client and the interval in seconds."""
+        super().__init__(daemon=True)
+        self.client = client
+        self.interval = interval
+        self.stopped = Event()
+
+    def run(self) -> None:
+        """Send keepalive packets until stopped."""
+        while not self.stopped.wait(self.interval):
+            try:
+                self.client.send_keepalive()
+            except Exception as error:
+                LOGGER.warning("Keepalive failed: %s", error)
+
+    def stop(self) -> None:
+        """Stop sending keepalive packets."""
+        self.stopped.set()
+
+
+class Receiver(Thread):
+    """Receives packets in the background.
+
+    Server messages are handled immediately,
+    all other responses are queued for the client.
+    The socket is polled, so that the thread can be stopped
+    without closing the socket or waiting for its timeout.
+    """
+
+    def __init__(self, client: Client):
+        """Set the client."""
+        super().__init__(daemon=True)
+        self.client = client
+        self.responses: Queue[Response | OSError] = Queue()
+        self.stopped = Event()
+        self.error: OSError | None = None
+
+    def run(self) -> None:
+        """Receive packets until stopped or the socket fails."""
+        while not self.stopped.is_set():
+            try:
+                if not self.poll():
+                    continue
+
+                response = self.client.receive()
+            except TimeoutError:
+                continue
+            except (KeyError, ValueError) as error:
+                LOGGER.warning("Discarding invalid datagram: %s", error)
+                continue
+            except OSError as error:
+                if not self.stopped.is_set():
+                    self.error = error
+                    self.responses.put(error)
+
+                break
+
+            if isinstance(response, ServerMessage):
+                self.client.handle_server_message(response)
+            else:
+                self.responses.put(response)
+
+    def poll(self) -> bool:
+        """Return whether a datagram arrived within the poll interval."""
+        if self.client.fileno() == -1:
+            raise OSError("Socket closed.")
+
+        readable, _, _ = select([self.client], [], [], POLL_INTERVAL)
+        return bool(readable)
+
+    def stop(self) -> None:
+        """Stop receiving packets and wait for the thread to finish.
+
+        Commands still waiting for a response from this receiver fail.
+        """
+        self.stopped.set()
+
+        if current_thread() is not self and self.is_alive():
+            self.join()
+
+        self.responses.put(ConnectionAbortedError("Stopped receiving packets."))
+
+
 class Client(BaseClient, socket_type=SOCK_DGRAM):
     """BattlEye RCon client."""
+
     seq_num: int = 0x00
 
     def __init__(
@@ -40,18 +139,126 @@ class Client(BaseClient, socket_type=SOCK_DGRAM):
         *args,
         max_length: int = 4096,
         message_handler: MessageHandler = log_message,
+        keepalive: float | None = None,
         **kwargs,
     ):
+        """Set the optional keepalive interval in seconds.
+
+        BattlEye servers drop sessions without a command for
+        SESSION_TIMEOUT seconds, so the interval should be shorter.
+        """
         super().__init__(*args, **kwargs)
         self.max_length = max_length
         self.message_handler = message_handler
+        self.keepalive = keepalive
+        self._lock = RLock()
+        self._last_command: float | None = None
+        self._keepalive: Keepalive | None = None
+        self._receiver: Receiver | None = None
+        self._events: EventStream | None = None
+        self._seen = SequenceWindow()
+
+    def __exit__(self, typ, value, traceback):
+        """Stop the background threads and close the socket."""
+        self.stop_keepalive()
+        self._stop_receiver()
+        return super().__exit__(typ, value, traceback)
+
+    @property
+    def session_expired(self) -> bool:
+        """Return whether the server has presumably dropped the session."""
+        return (
+            self._last_command is not None
+            and monotonic() - self._last_command >= SESSION_TIMEOUT
+        )
+
+    def connect(self, login: bool = False) -> None:
+        """Connect the socket, log in if wanted and start the keepalive thread."""
+        super().connect(login)
+
+        if self.keepalive is not None:
+            self.start_keepalive()
+
+    def close(self) -> None:
+        """Stop the background threads and close the socket."""
+        self.stop_keepalive()
+        self._stop_receiver()
+        super().close()
+
+    def events(self, maxsize: int = 1024, policy: Policy = Policy.DROP) -> EventStream:
+        """Return the stream of server messages.
+
+        On the first call, the stream is created and packets are received
+        in a background thread from then on, so that server messages are
+        acknowledged and buffered even while no command is running.
+        The messages are no longer passed to the message handler.
+        Waits for a running command to finish, so that the
+        receiver does not take packets from under it.
+        """
+        with self._lock:
+            if self._events is None:
+                self._events = EventStream(maxsize, policy)
+                self._receiver = Receiver(self)
+                self._receiver.start()
+
+            return self._events
+
+    def stop_receiver(self) -> None:
+        """Stop receiving packets in the background and end the event stream.
+
+        Waits for a running command to finish, so that no
+        response is taken by the receiver after it was stopped.
+        """
+        with self._lock:
+            self._stop_receiver()
+
+    def _stop_receiver(self) -> None:
+        """Stop the receiver without waiting for running commands."""
+        if self._receiver is not None:
+            self._receiver.stop()
+            self._receiver = None
+
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+
+    def start_keepalive(self) -> None:
+        """Start sending keepalive packets in a background thread."""
+        if self._keepalive is None:
+            self._keepalive = Keepalive(self, self.keepalive)
+            self._keepalive.start()
+
+    def stop_keepalive(self) -> None:
+        """Stop sending keepalive packets."""
+        if self._keepalive is not None:
+            self._keepalive.stop()
+            self._keepalive = None
+
+    def send_keepalive(self) -> None:
+        """Send an empty command to keep the session alive."""
+        self.run("", priority=Priority.BULK)
 
     def handle_server_message(self, message: ServerMessage) -> None:
-        """Handle the respective server message."""
-        with self._socket.makefile("wb") as file:
-            file.write(bytes(ServerMessageAck(message.seq)))
+        """Acknowledge the server message and pass it to
+        the event stream if there is one or to the handler otherwise.
+
+        Messages resent by the server are acknowledged again but not passed on.
+        """
+        ack = bytes(ServerMessageAck(message.seq))
+
+        if message.seq in self._seen:
+            LOGGER.debug("Discarding resent server message: %i", message.seq)
+            self._socket.send(ack)
+            return
+
+        if (events := self._events) is not None and not events.offer(message):
+            return
+
+        self._seen.add(message.seq)
+        self._socket.send(ack)
 
-        self.message_handler(message)
+        if events is None:
+            self.message_handler(message)
 
     def receive(self) -> Response:
         """Receive a packet."""
@@ -63,51 +270,131 @@ class Client(BaseClient, socket_type=SOCK_DGRAM):
             ).type
         ].from_bytes(header, data[HEADER_SIZE:])
 
-    def receive_transaction(self):
-        command_responses = []
-        login_response = None
+    def receive_next(self) -> Response:
+        """Receive the next packet from the socket
+        or, if receiving in the background, from the receiver.
+        """
+        if (receiver := self._receiver) is None:
+            return self.receive()
+
+        if receiver.error is not None and receiver.responses.empty():
+            raise receiver.error
+
+        try:
+            response = receiver.responses.get(timeout=self.timeout)
+        except Empty:
+            raise TimeoutError("timed out") from None
+
+        if isinstance(response, Exception):
+            raise response
+
+        return response
+
+    def drain(self) -> bool:
+        """Handle the pending packets without blocking.
+
+        Server messages are acknowledged and handled, late responses discarded.
+        Return whether the socket is still usable.
+        """
+        with self._lock:
+            if (receiver := self._receiver) is not None:
+                return receiver.error is None
+
+            try:
+                while select([self._socket], [], [], 0)[0]:
+                    try:
+                        response = self.receive()
+                    except (KeyError, ValueError) as error:
+                        LOGGER.warning("Discarding invalid datagram: %s", error)
+                        continue
+
+                    if isinstance(response, ServerMessage):
+                        self.handle_server_message(response)
+            except OSError:
+                return False
+
+            return True
+
+    def receive_transaction(self, seq: int | None = None) -> LoginResponse | str:
+        """Receive the response to a login or to the command with the
+        given sequence number, handling server messages meanwhile.
+        """
+        response_parts = None
 
         while True:
-            response = self.receive()
+            response = self.receive_next()
 
-            if isinstance(response, LoginResponse) and login_response is None:
-                login_response = response
+            if isinstance(response, ServerMessage):
+                self.handle_server_message(response)
                 continue
 
-            if isinstance(response, CommandResponse):
-                command_responses.append(response)
-                if len(command_responses) >= response.seq:
-                    break
+            if isinstance(response, LoginResponse):
+                if seq is None:
+                    return response
+
                 continue
 
-            if isinstance(response, ServerMessage):
-                self.handle_server_message(response)
+            if seq is None or response.seq != seq:
+                LOGGER.debug("Discarding response to command: %i", response.seq)
+                continue
 
-                if login_response is not None:
-                    return login_response
-                break
-        
-        return "".join(
-            command_response.message
-            for command_response in sorted(command_responses, key=lambda cr: cr.seq)
-        )
+            if response_parts is None:
+                response_parts = MultipartResponse(response.total)
+
+            try:
+                if response_parts.add(response):
+                    return response_parts.message
+            except ValueError as error:
+                LOGGER.warning("Discarding response part: %s", error)
 
     def communicate(self, request: Request) -> Response | str:
         """Send a request and receive a response."""
-        with self._socket.makefile("wb") as file:
-            file.write(bytes(request))
-
-        if isinstance(request, CommandRequest):
-            self.seq_num = self.seq_num + 1 & 0xff
+        with self._lock:
+            with self._socket.makefile("wb") as file:
+                file.write(bytes(request))
 
-        return self.receive_transaction()
+            if isinstance(request, CommandRequest):
+                self.seq_num = self.seq_num + 1 & 0xFF
+                response = self.receive_transaction(request.seq)
+            else:
+                response = self.receive_transaction()
+            self._last_command = monotonic()
+            return response
 
     def login(self, passwd: str) -> bool:
-        """Log-in the user."""
+        """Log-in the user.
+
+        The password is kept to transparently log in again on lost sessions.
+        """
         if not self.communicate(LoginRequest(passwd)).success:
             raise WrongPassword()
+
+        self.passwd = passwd
+        self._seen.clear()
         return True
 
-    def run(self, command: str, *args: str) -> str:
-        """Execute a command and return the text message."""
-        return self.communicate(CommandRequest.from_command(self.seq_num, command, *args))
+    def run(self, command: str, *args: str, priority: int = Priority.NORMAL) -> str:
+        """Execute a command and return the text message.
+
+        Concurrent commands are sent in order of their priority,
+        subject to the client's rate limit.
+        If the session was lost, log in again before or after a timed out attempt.
+        """
+        with self.scheduler.slot(priority), self._lock:
+            if self.session_expired and self.passwd is not None:
+                LOGGER.debug("Session expired. Logging in again.")
+                self.login(self.passwd)
+
+            try:
+                return self.communicate(
+                    CommandRequest.from_command(self.seq_num, command, *args)
+                )
+            except TimeoutError:
+                if self.passwd is None:
+                    raise
+
+            LOGGER.debug("Command timed out. Logging in again.")
+            self.login(self.passwd)
+            return self.communicate(
+                CommandRequest.from_command(self.seq_num, command, *args)
+            )
@@ -0,0 +1,123 @@
+"""Streams of server messages."""
+
+from __future__ import annotations
+from asyncio import Event
+from collections import deque
+from enum import Enum
+from logging import getLogger
+from threading import Condition
+from typing import AsyncIterator, Iterator
+
+from rcon.battleye.proto import ServerMessage
+
+
+__all__ = ["AsyncEventStream", "EventStream", "Policy"]
+
+
+LOGGER = getLogger(__file__)
+
+
+class Policy(Enum):
+    """Handling of server messages that arrive while the stream is full."""
+
+    # Acknowledge and discard the message.
+    DROP = "drop"
+    # Withhold the acknowledgement, so that the server resends the message later.
+    BLOCK = "block"
+
+
+class BaseEventStream:
+    """A bounded stream of server messages."""
+
+    def __init__(self, maxsize: int = 1024, policy: Policy = Policy.DROP):
+        """Set the maximum amount of buffered messages and the overflow policy."""
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.closed = False
+        self._messages: deque[ServerMessage] = deque()
+
+    def _put(self, message: ServerMessage) -> bool:
+        """Buffer the message and return whether it may be acknowledged."""
+        if self.closed:
+            return True
+
+        if len(self._messages) < self.maxsize:
+            self._messages.append(message)
+            return True
+
+        if self.policy is Policy.BLOCK:
+            LOGGER.debug("Stream full. Withholding acknowledgement: %i", message.seq)
+            return False
+
+        LOGGER.debug("Stream full. Dropping message: %i", message.seq)
+        self.dropped += 1
+        return True
+
+
+class EventStream(BaseEventStream):
+    """A bounded, thread-safe stream of server messages."""
+
+    def __init__(self, maxsize: int = 1024, policy: Policy = Policy.DROP):
+        super().__init__(maxsize, policy)
+        self._condition = Condition()
+
+    def __iter__(self) -> Iterator[ServerMessage]:
+        """Yield messages until the stream is closed."""
+        while True:
+            with self._condition:
+                while not self._messages and not self.closed:
+                    self._condition.wait()
+
+                if not self._messages:
+                    return
+
+                message = self._messages.popleft()
+
+            yield message
+
+    def offer(self, message: ServerMessage) -> bool:
+        """Buffer the message and return whether it may be acknowledged."""
+        with self._condition:
+            if accepted := self._put(message):
+                self._condition.notify()
+
+            return accepted
+
+    def close(self) -> None:
+        """End the stream after the buffered messages."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class AsyncEventStream(BaseEventStream):
+    """A bounded stream of server messages for use within an event loop."""
+
+    def __init__(self, maxsize: int = 1024, policy: Policy = Policy.DROP):
+        super().__init__(maxsize, policy)
+        self._wakeup = Event()
+
+    async def __aiter__(self) -> AsyncIterator[ServerMessage]:
+        """Yield messages until the stream is closed."""
+        while True:
+            while not self._messages and not self.closed:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            if not self._messages:
+                return
+
+            yield self._messages.popleft()
+
+    def offer(self, message: ServerMessage) -> bool:
+        """Buffer the message and return whether it may be acknowledged."""
+        if accepted := self._put(message):
+            self._wakeup.set()
+
+        return accepted
+
+    def close(self) -> None:
+        """End the stream after the buffered messages."""
+        self.closed = True
+        self._wakeup.set()
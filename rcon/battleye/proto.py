@@ -1,6 +1,7 @@
 """Low-level protocol stuff."""
 
 from __future__ import annotations
+from struct import Struct
 from typing import NamedTuple
 from zlib import crc32
 
@@ -13,6 +14,7 @@ __all__ = [
     "LoginResponse",
     "CommandRequest",
     "CommandResponse",
+    "MultipartResponse",
     "ServerMessage",
     "ServerMessageAck",
     "Request",
@@ -20,9 +22,18 @@ __all__ = [
 ]
 
 
-HEADER_SIZE = 8
-PREFIX = "BE"
+HEADER = Struct("<2sIBB")
+HEADER_SIZE = HEADER.size
+MULTIPART = 0x00
+PREFIX = b"BE"
 INFIX = 0xFF
+# CRC32 of the infix and type, which the payload's CRC32 continues.
+CRC_SEEDS = tuple(crc32(bytes((INFIX, typ))) for typ in range(0x100))
+
+
+def encode(typ: int, payload: bytes) -> bytes:
+    """Encode a packet of the given type."""
+    return HEADER.pack(PREFIX, crc32(payload, CRC_SEEDS[typ]), INFIX, typ) + payload
 
 
 class Header(NamedTuple):
@@ -32,26 +43,12 @@ class Header(NamedTuple):
     type: int
 
     def __bytes__(self):
-        return b"".join(
-            (
-                PREFIX.encode("ascii"),
-                self.crc32.to_bytes(4, "little"),
-                INFIX.to_bytes(1, "little"),
-                self.type.to_bytes(1, "little"),
-            )
-        )
+        return HEADER.pack(PREFIX, self.crc32, INFIX, self.type)
 
     @classmethod
     def create(cls, typ: int, payload: bytes) -> Header:
         """Create a header for the given payload."""
-        return cls(
-            crc32(
-                b"".join(
-                    (INFIX.to_bytes(1, "little"), typ.to_bytes(1, "little"), payload)
-                )
-            ),
-            typ,
-        )
+        return cls(crc32(payload, CRC_SEEDS[typ]), typ)
 
     @classmethod
     def from_bytes(cls, payload: bytes) -> Header:
@@ -59,23 +56,22 @@ class Header(NamedTuple):
         if (size := len(payload)) != HEADER_SIZE:
             raise ValueError("Invalid payload size", size)
 
-        if (prefix := payload[:2].decode("ascii")) != PREFIX:
+        prefix, crc, infix, typ = HEADER.unpack(payload)
+
+        if prefix != PREFIX:
             raise ValueError("Invalid prefix", prefix)
 
-        if (infix := int.from_bytes(payload[6:7], "little")) != INFIX:
+        if infix != INFIX:
             raise ValueError("Invalid infix", infix)
 
-        return cls(
-            int.from_bytes(payload[2:6], "little"),
-            int.from_bytes(payload[7:8], "little"),
-        )
+        return cls(crc, typ)
 
 
 class LoginRequest(str):
     """Login request packet."""
 
     def __bytes__(self):
-        return bytes(self.header) + self.payload
+        return encode(0x00, self.payload)
 
     @property
     def payload(self) -> bytes:
@@ -107,12 +103,15 @@ class CommandRequest(NamedTuple):
     command: str
 
     def __bytes__(self):
-        return bytes(self.header) + self.payload
+        if not self.command:
+            return KEEPALIVES[self.seq]
+
+        return encode(0x01, self.payload)
 
     @property
     def payload(self) -> bytes:
         """Return the payload."""
-        return b"".join((self.seq.to_bytes(1, "little"), self.command.encode("ascii")))
+        return self.seq.to_bytes(1, "little") + self.command.encode("ascii")
 
     @property
     def header(self) -> Header:
@@ -131,16 +130,27 @@ class CommandRequest(NamedTuple):
 
 
 class CommandResponse(NamedTuple):
-    """A command response."""
+    """A command response.
+
+    Large responses are split into multiple packets,
+    each of which carries the total amount of packets and its index.
+    """
 
     header: Header
     seq: int
     payload: bytes
+    total: int = 1
+    index: int = 0
 
     @classmethod
     def from_bytes(cls, header: Header, payload: bytes) -> CommandResponse:
         """Create a command response from the given bytes."""
-        return cls(header, int.from_bytes(payload[:1], "little"), payload[1:])
+        seq = int.from_bytes(payload[:1], "little")
+
+        if len(payload) >= 4 and payload[1] == MULTIPART:
+            return cls(header, seq, payload[4:], payload[2], payload[3])
+
+        return cls(header, seq, payload[1:])
 
     @property
     def message(self) -> str:
@@ -148,6 +158,33 @@ class CommandResponse(NamedTuple):
         return self.payload.decode("ascii")
 
 
+class MultipartResponse:
+    """Collects the parts of a command response."""
+
+    __slots__ = ("parts", "missing")
+
+    def __init__(self, total: int):
+        """Preallocate slots for the given amount of parts."""
+        self.parts: list[bytes | None] = [None] * total
+        self.missing = total
+
+    def add(self, response: CommandResponse) -> bool:
+        """Add a part and return whether the response is complete."""
+        if response.total != len(self.parts) or response.index >= response.total:
+            raise ValueError("Part does not belong to response.", response)
+
+        if self.parts[response.index] is None:
+            self.parts[response.index] = response.payload
+            self.missing -= 1
+
+        return not self.missing
+
+    @property
+    def message(self) -> str:
+        """Return the text message of the complete response."""
+        return b"".join(self.parts).decode("ascii")
+
+
 class ServerMessage(NamedTuple):
     """A message from the server."""
 
@@ -172,7 +209,7 @@ class ServerMessageAck(NamedTuple):
     seq: int
 
     def __bytes__(self):
-        return bytes(self.header) + self.payload
+        return ACKS[self.seq]
 
     @property
     def header(self) -> Header:
@@ -189,3 +226,7 @@ Request = LoginRequest | CommandRequest | ServerMessageAck
 Response = LoginResponse | CommandResponse | ServerMessage
 
 RESPONSE_TYPES = {0x00: LoginResponse, 0x01: CommandResponse, 0x02: ServerMessage}
+
+# Acknowledgements and empty keepalive commands only vary in their sequence number.
+ACKS = tuple(encode(0x02, bytes((seq,))) for seq in range(0x100))
+KEEPALIVES = tuple(encode(0x01, bytes((seq,))) for seq in range(0x100))
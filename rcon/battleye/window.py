@@ -0,0 +1,46 @@
+"""Detection of resent server messages."""
+
+__all__ = ["SequenceWindow"]
+
+
+class SequenceWindow:
+    """Remembers the most recently seen 8-bit sequence numbers.
+
+    A ring of the last seen sequence numbers evicts the oldest one
+    from a table of flags, so that lookups and insertions take constant time.
+    Since the window is smaller than the sequence number space, numbers are
+    forgotten before the server reuses them after wrapping around at 0xFF.
+    """
+
+    __slots__ = ("flags", "ring", "position")
+
+    def __init__(self, size: int = 0x80):
+        """Set the amount of sequence numbers to remember."""
+        if not 0 < size < 0x100:
+            raise ValueError("Window size must be between 1 and 255.", size)
+
+        self.flags = bytearray(0x100)
+        self.ring: list[int | None] = [None] * size
+        self.position = 0
+
+    def __contains__(self, seq: int) -> bool:
+        """Return whether the sequence number was seen recently."""
+        return bool(self.flags[seq])
+
+    def add(self, seq: int) -> None:
+        """Remember the sequence number, forgetting the oldest one."""
+        if self.flags[seq]:
+            return
+
+        if (oldest := self.ring[self.position]) is not None:
+            self.flags[oldest] = 0
+
+        self.ring[self.position] = seq
+        self.position = (self.position + 1) % len(self.ring)
+        self.flags[seq] = 1
+
+    def clear(self) -> None:
+        """Forget all sequence numbers, e.g. when a new session starts."""
+        self.flags = bytearray(0x100)
+        self.ring = [None] * len(self.ring)
+        self.position = 0
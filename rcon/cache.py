@@ -0,0 +1,167 @@
+"""Caching of responses to read-only commands."""
+
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import partial
+from threading import Lock
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable, Mapping, Protocol
+
+from rcon.singleflight import SingleFlight
+
+
+__all__ = ["ResponseCache"]
+
+
+MISSING = object()
+
+
+class Client(Protocol):
+    """A client to cache the responses of."""
+
+    host: str
+    port: int
+
+    def run(self, command: str, *args: str, **kwargs: Any) -> str | Awaitable[str]:
+        """Run a command."""
+
+
+class ResponseCache:
+    """A thread-safe cache of responses to read-only commands.
+
+    Only responses to commands with a configured time to live are cached.
+    The least recently used responses are evicted if the cache is full.
+    Concurrent identical requests for cacheable commands are coalesced,
+    so that only the first one is sent to the server.
+    """
+
+    def __init__(self, ttls: Mapping[str, float], *, max_size: int = 1024):
+        """Set the time to live in seconds per command and the maximum size."""
+        self.ttls = dict(ttls)
+        self.max_size = max_size
+        self._entries: OrderedDict[Hashable, tuple[float, str]] = OrderedDict()
+        self._lock = Lock()
+        self._futures: dict[Hashable, Future] = {}
+        self._flights = SingleFlight()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def run(self, client: Client, command: str, *args: str, **kwargs: Any) -> str:
+        """Run a command on a synchronous client, using the cache if applicable."""
+        if (ttl := self.ttls.get(command)) is None:
+            return client.run(command, *args, **kwargs)
+
+        return self.call(
+            make_key(client, command, args, kwargs),
+            ttl,
+            partial(client.run, command, *args, **kwargs),
+        )
+
+    async def arun(
+        self, client: Client, command: str, *args: str, **kwargs: Any
+    ) -> str:
+        """Run a command on an asynchronous client, using the cache if applicable."""
+        if (ttl := self.ttls.get(command)) is None:
+            return await client.run(command, *args, **kwargs)
+
+        return await self.acall(
+            make_key(client, command, args, kwargs),
+            ttl,
+            partial(client.run, command, *args, **kwargs),
+        )
+
+    def call(self, key: Hashable, ttl: float, function: Callable[[], str]) -> str:
+        """Return the cached response or call the function to get it.
+
+        Concurrent callers with the same key wait for the first one's result.
+        """
+        with self._lock:
+            if (response := self._get(key)) is not MISSING:
+                return response
+
+            if (future := self._futures.get(key)) is not None:
+                owner = False
+            else:
+                future = self._futures[key] = Future()
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            response = function()
+        except BaseException as error:
+            with self._lock:
+                del self._futures[key]
+
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            self._put(key, response, ttl)
+            del self._futures[key]
+
+        future.set_result(response)
+        return response
+
+    async def acall(
+        self, key: Hashable, ttl: float, function: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return the cached response or await the function to get it.
+
+        Concurrent callers with the same key await the same task,
+        which is not cancelled if one of them is.
+        """
+        with self._lock:
+            if (response := self._get(key)) is not MISSING:
+                return response
+
+        return await self._flights.call(key, partial(self._fetch, key, ttl, function))
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+    async def _fetch(
+        self, key: Hashable, ttl: float, function: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Await the function and cache its result."""
+        response = await function()
+
+        with self._lock:
+            self._put(key, response, ttl)
+
+        return response
+
+    def _get(self, key: Hashable) -> str | object:
+        """Return an unexpired response or MISSING while holding the lock."""
+        if (entry := self._entries.get(key)) is None:
+            return MISSING
+
+        expires, response = entry
+
+        if monotonic() >= expires:
+            del self._entries[key]
+            return MISSING
+
+        self._entries.move_to_end(key)
+        return response
+
+    def _put(self, key: Hashable, response: str, ttl: float) -> None:
+        """Cache a response while holding the lock."""
+        self._entries[key] = (monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+def make_key(
+    client: Client, command: str, args: tuple[str, ...], kwargs: dict[str, Any]
+) -> Hashable:
+    """Return the cache key of a request."""
+
+    return client.host, client.port, command, args, tuple(sorted(kwargs.items()))
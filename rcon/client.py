@@ -1,9 +1,12 @@
-"""Common base client."""
+"""Common base clients."""
 
+from abc import ABC, abstractmethod
 from socket import SocketKind, socket
 
+from rcon.ratelimit import Scheduler
 
-__all__ = ["BaseClient"]
+
+__all__ = ["AsyncBaseClient", "BaseClient"]
 
 
 class BaseClient:
@@ -15,14 +18,21 @@ class BaseClient:
         port: int,
         *,
         timeout: float | None = None,
-        passwd: str | None = None
+        passwd: str | None = None,
+        rate_limit: float | None = None,
+        burst: int = 1
     ):
-        """Initialize the base client."""
+        """Initialize the base client.
+
+        If rate_limit is set, commands are limited to that many per second
+        with bursts of up to burst commands.
+        """
         self._socket = socket(type=self._socket_type)
         self.host = host
         self.port = port
         self.timeout = timeout
         self.passwd = passwd
+        self.scheduler = Scheduler(rate_limit, burst)
 
     def __init_subclass__(cls, *, socket_type: SocketKind | None = None):
         if socket_type is not None:
@@ -48,6 +58,10 @@ class BaseClient:
         """Set the socket timeout."""
         self._socket.settimeout(timeout)
 
+    def fileno(self) -> int:
+        """Return the underlying socket's file descriptor."""
+        return self._socket.fileno()
+
     def connect(self, login: bool = False) -> None:
         """Connect the socket and attempt a
         login if wanted and a password is set.
@@ -68,3 +82,56 @@ class BaseClient:
     def run(self, command: str, *args: str) -> str:
         """Run a command."""
         raise NotImplementedError()
+
+
+class AsyncBaseClient(ABC):
+    """A common asynchronous RCON client.
+
+    Clients of different protocols can be used alike in one event loop.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        timeout: float | None = None,
+        passwd: str | None = None
+    ):
+        """Initialize the base client."""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.passwd = passwd
+
+    async def __aenter__(self):
+        """Connect and attempt an auto-login if a password is set."""
+        try:
+            await self.connect(login=True)
+        except BaseException:
+            await self.close()
+            raise
+
+        return self
+
+    async def __aexit__(self, typ, value, traceback):
+        """Close the connection."""
+        await self.close()
+
+    @abstractmethod
+    async def connect(self, login: bool = False) -> None:
+        """Connect to the server and attempt a
+        login if wanted and a password is set.
+        """
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Close the connection."""
+
+    @abstractmethod
+    async def login(self, passwd: str) -> bool:
+        """Perform a login."""
+
+    @abstractmethod
+    async def run(self, command: str, *args: str) -> str:
+        """Run a command."""
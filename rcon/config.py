@@ -12,7 +12,15 @@ from typing import Iterable, NamedTuple
 from rcon.exceptions import ConfigReadError, UserAbort
 
 
-__all__ = ["CONFIG_FILES", "LOG_FORMAT", "SERVERS", "Config", "from_args"]
+__all__ = [
+    "CONFIG_FILES",
+    "LOG_FORMAT",
+    "SERVERS",
+    "Config",
+    "from_args",
+    "load",
+    "read_passwd",
+]
 
 
 CONFIG = ConfigParser()
@@ -42,6 +50,10 @@ class Config(NamedTuple):
     host: str
     port: int
     passwd: str | None = None
+    groups: frozenset[str] = frozenset()
+    rate_limit: float | None = None
+    burst: int = 1
+    profile: str | None = None
 
     @classmethod
     def from_string(cls, string: str) -> Config:
@@ -68,7 +80,18 @@ class Config(NamedTuple):
         host = section["host"]
         port = section.getint("port")
         passwd = section.get("passwd")
-        return cls(host, port, passwd)
+        groups = frozenset(
+            group.strip() for group in section.get("groups", "").split(",")
+        )
+        return cls(
+            host,
+            port,
+            passwd,
+            groups - {""},
+            section.getfloat("rate_limit"),
+            section.getint("burst", 1),
+            section.get("profile"),
+        )
 
 
 def load(config_files: Path | Iterable[Path] = CONFIG_FILES) -> None:
@@ -85,22 +108,28 @@ def from_args(args: Namespace) -> Config:
     """Get the credentials for a server from the respective arguments."""
 
     try:
-        host, port, passwd = Config.from_string(args.server)
+        config = Config.from_string(args.server)
     except ValueError:
         load(args.config)
 
         try:
-            host, port, passwd = SERVERS[args.server]
+            config = SERVERS[args.server]
         except KeyError:
             LOGGER.error("No such server: %s.", args.server)
             raise ConfigReadError() from None
 
-    if passwd is None:
-        try:
-            passwd = getpass("Password: ")
-        except (KeyboardInterrupt, EOFError):
-            print()
-            LOGGER.error("Aborted by user.")
-            raise UserAbort() from None
+    if config.passwd is None:
+        return config._replace(passwd=read_passwd())
+
+    return config
 
-    return Config(host, port, passwd)
+
+def read_passwd() -> str:
+    """Prompt the user for a password."""
+
+    try:
+        return getpass("Password: ")
+    except (KeyboardInterrupt, EOFError):
+        print()
+        LOGGER.error("Aborted by user.")
+        raise UserAbort() from None
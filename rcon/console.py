@@ -146,16 +146,16 @@ def rconcmd(
     """Initialize the console."""
 
     try:
-        host, port, passwd = get_config(host, port, passwd)
+        config = get_config(host, port, passwd)
     except EOFError:
         print(MSG_EXIT)
         return
 
-    prompt = prompt.format(host=host, port=port)
+    prompt = prompt.format(host=config.host, port=config.port)
 
-    with client_cls(host, port, timeout=timeout) as client:
+    with client_cls(config.host, config.port, timeout=timeout) as client:
         try:
-            passwd = login(client, passwd)
+            passwd = login(client, config.passwd)
         except EOFError:
             print(MSG_LOGIN_ABORTED)
             return
@@ -1,5 +1,6 @@
 """Common errors handler."""
 
+from asyncio import TimeoutError as AsyncTimeoutError
 from logging import Logger
 from socket import timeout
 
@@ -9,14 +10,14 @@ from rcon.exceptions import UserAbort
 from rcon.exceptions import WrongPassword
 
 
-__all__ = ["ErrorHandler"]
+__all__ = ["ErrorHandler", "lookup"]
 
 
 ERRORS = {
     UserAbort: (1, None),
     ConfigReadError: (2, None),
     ConnectionRefusedError: (3, "Connection refused."),
-    (TimeoutError, timeout): (4, "Connection timed out."),
+    (TimeoutError, timeout, AsyncTimeoutError): (4, "Connection timed out."),
     WrongPassword: (5, "Wrong password."),
     SessionTimeout: (6, "Session timed out."),
 }
@@ -40,13 +41,22 @@ class ErrorHandler:
         if value is None:
             return True
 
-        for typ, (exit_code, message) in ERRORS.items():
-            if isinstance(value, typ):
-                self.exit_code = exit_code
+        if (error := lookup(value)) is None:
+            return None
 
-                if message:
-                    self.logger.error(message)
+        self.exit_code, message = error
 
-                return True
+        if message:
+            self.logger.error(message)
 
-        return None
+        return True
+
+
+def lookup(error: BaseException) -> tuple[int, str | None] | None:
+    """Return the exit code and message of a common error."""
+
+    for typ, (exit_code, message) in ERRORS.items():
+        if isinstance(error, typ):
+            return exit_code, message
+
+    return None
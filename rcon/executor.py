@@ -0,0 +1,252 @@
+"""Run commands on multiple servers in a thread pool."""
+
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from typing import Any, Iterable, Iterator, NamedTuple
+
+from rcon import battleye, source
+from rcon.config import Config
+from rcon.ratelimit import Scheduler, TokenBucket
+from rcon.source.pool import ClientPool, Key
+from rcon.source.profiles import get_profile
+
+
+__all__ = ["Executor"]
+
+
+class Job(NamedTuple):
+    """A command waiting to be run."""
+
+    future: Future
+    server: Config
+    command: str
+    args: tuple[str, ...]
+    kwargs: dict[str, Any]
+
+
+class Host:
+    """Jobs of one host."""
+
+    __slots__ = ("pending", "running")
+
+    def __init__(self):
+        """Initialize an idle host."""
+        self.pending: deque[Job] = deque()
+        self.running = 0
+
+
+def is_session_alive(client: battleye.Client) -> bool:
+    """Check whether an idle BattlEye client's session is still usable.
+
+    Server messages, which arrived while idle, are acknowledged,
+    so that the server stops resending them.
+    """
+
+    if client.fileno() == -1 or client.session_expired:
+        return False
+
+    return client.drain()
+
+
+class ServerPool(ClientPool):
+    """A pool of clients, which are created according to the servers' configurations.
+
+    The clients of a server with a rate limit share one token bucket.
+    """
+
+    def __init__(self, *, use_battleye: bool = False, **kwargs: Any):
+        """Set the pool parameters and whether to use BattlEye clients."""
+        if use_battleye:
+            kwargs.setdefault("health_check", is_session_alive)
+
+        super().__init__(**kwargs)
+        self.use_battleye = use_battleye
+        self._servers: dict[Key, Config] = {}
+        self._buckets: dict[Key, TokenBucket] = {}
+
+    def run_on(self, server: Config, command: str, *args: str, **kwargs: Any) -> str:
+        """Run a command on a pooled client of the server."""
+        with self._condition:
+            self._servers[Key(server.host, server.port, server.passwd)] = server
+
+        if not self.use_battleye:
+            kwargs = get_profile(server.profile).run_kwargs() | kwargs
+
+        return self.run(
+            command,
+            *args,
+            host=server.host,
+            port=server.port,
+            passwd=server.passwd,
+            **kwargs,
+        )
+
+    def _create(self, key: Key) -> source.Client | battleye.Client:
+        """Return a new client of the server, which is not connected yet."""
+        with self._condition:
+            server = self._servers[key]
+
+            if server.rate_limit is None:
+                bucket = None
+            else:
+                bucket = self._buckets.setdefault(
+                    key, TokenBucket(server.rate_limit, server.burst)
+                )
+
+        if self.use_battleye:
+            client = battleye.Client(
+                key.host,
+                key.port,
+                timeout=self.timeout,
+                passwd=key.passwd,
+                **self.client_args,
+            )
+        else:
+            kwargs = get_profile(server.profile).client_kwargs(key.host, key.port)
+
+            if self.timeout is not None:
+                kwargs["timeout"] = self.timeout
+
+            client = source.Client(
+                key.host, key.port, passwd=key.passwd, **kwargs | self.client_args
+            )
+
+        if bucket is not None:
+            client.scheduler = Scheduler(bucket=bucket)
+
+        return client
+
+
+class Executor:
+    """Runs commands on many servers concurrently with synchronous clients.
+
+    The workers share a pool of logged-in clients.
+    At most max_per_host commands run on the same host at once.
+    Further commands for that host wait in a queue without
+    occupying a worker, so that other hosts are not held up.
+    Servers with a rate limit share one token bucket among their clients.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        *,
+        max_per_host: int = 4,
+        idle_timeout: float | None = 60,
+        timeout: float | None = None,
+        use_battleye: bool = False,
+        **client_args: Any,
+    ):
+        """Set the executor parameters.
+
+        Clients idle for longer than idle_timeout seconds are closed.
+        Further keyword arguments are passed to the clients' constructor.
+        """
+        self.max_per_host = max_per_host
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="rcon")
+        self._pool = ServerPool(
+            max_size=max_per_host,
+            idle_timeout=idle_timeout,
+            timeout=timeout,
+            use_battleye=use_battleye,
+            **client_args,
+        )
+        self._lock = Lock()
+        self._hosts: dict[str, Host] = {}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        """Wait for running commands and close all clients."""
+        self.close()
+
+    def submit(
+        self, server: Config, command: str, *args: str, **kwargs: Any
+    ) -> Future[str]:
+        """Schedule a command on the server and return a future of its response.
+
+        Keyword arguments are passed to the client's run() method.
+        """
+        future = Future()
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Executor is closed.")
+
+            host = self._hosts.setdefault(server.host, Host())
+            host.pending.append(Job(future, server, command, args, kwargs))
+            self._dispatch(host)
+
+        return future
+
+    def map(
+        self,
+        servers: Iterable[Config],
+        command: str,
+        *args: str,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> Iterator[str]:
+        """Run the command on all servers and yield the responses in order.
+
+        The first error is raised when its response is reached.
+        If timeout is set, it limits the total time to wait for the responses.
+        """
+        futures = [self.submit(server, command, *args, **kwargs) for server in servers]
+        deadline = None if timeout is None else monotonic() + timeout
+
+        def results() -> Iterator[str]:
+            try:
+                for future in futures:
+                    yield future.result(
+                        None if deadline is None else deadline - monotonic()
+                    )
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        return results()
+
+    def close(self) -> None:
+        """Cancel queued commands, wait for running ones and close all clients."""
+        with self._lock:
+            self._closed = True
+
+            for host in self._hosts.values():
+                for job in host.pending:
+                    job.future.cancel()
+
+                host.pending.clear()
+
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+
+    def _dispatch(self, host: Host) -> None:
+        """Start queued jobs of the host while holding the lock."""
+        while host.pending and host.running < self.max_per_host:
+            host.running += 1
+            self._executor.submit(self._work, host, host.pending.popleft())
+
+    def _work(self, host: Host, job: Job) -> None:
+        """Run a job in a worker thread and start the host's next one."""
+        try:
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    response = self._run(job)
+                except BaseException as error:
+                    job.future.set_exception(error)
+                else:
+                    job.future.set_result(response)
+        finally:
+            with self._lock:
+                host.running -= 1
+                self._dispatch(host)
+
+    def _run(self, job: Job) -> str:
+        """Run the job's command on a pooled client of its server."""
+        return self._pool.run_on(job.server, job.command, *job.args, **job.kwargs)
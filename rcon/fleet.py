@@ -0,0 +1,123 @@
+"""Run commands on multiple servers concurrently."""
+
+from __future__ import annotations
+from asyncio import Semaphore, as_completed, wait_for
+from typing import AsyncIterator, Mapping, NamedTuple
+
+from rcon import battleye, source
+from rcon.client import AsyncBaseClient
+from rcon.config import Config
+from rcon.errorhandler import lookup
+from rcon.source.profiles import get_profile
+
+
+__all__ = ["UNKNOWN_ERROR", "Result", "broadcast"]
+
+
+UNKNOWN_ERROR = 255
+
+
+class Result(NamedTuple):
+    """The result of a command on one server."""
+
+    server: str
+    response: str | None = None
+    error: Exception | None = None
+
+    @property
+    def exit_code(self) -> int:
+        """Return the exit code, representing the error if any."""
+        if self.error is None:
+            return 0
+
+        if (error := lookup(self.error)) is None:
+            return UNKNOWN_ERROR
+
+        return error[0]
+
+    @property
+    def message(self) -> str:
+        """Return a human-readable error message."""
+        if (error := lookup(self.error)) is not None and error[1]:
+            return error[1]
+
+        return str(self.error) or type(self.error).__name__
+
+
+async def run_client(client: AsyncBaseClient, command: str, *args: str) -> str:
+    """Run a command with an asynchronous client of any protocol."""
+
+    async with client:
+        return await client.run(command, *args)
+
+
+async def run(
+    name: str,
+    config: Config,
+    command: str,
+    *args: str,
+    semaphore: Semaphore,
+    timeout: float | None = None,
+    use_battleye: bool = False,
+) -> Result:
+    """Run a command on one server while holding the semaphore."""
+
+    async with semaphore:
+        try:
+            if use_battleye:
+                coro = run_client(
+                    battleye.AsyncClient(
+                        config.host, config.port, timeout=timeout, passwd=config.passwd
+                    ),
+                    command,
+                    *args,
+                )
+            else:
+                profile = get_profile(config.profile)
+                timeout = profile.timeout if timeout is None else timeout
+                coro = source.rcon(
+                    command,
+                    *args,
+                    host=config.host,
+                    port=config.port,
+                    passwd=config.passwd,
+                    **profile.rcon_kwargs(config.host, config.port)
+                    | {"timeout": timeout},
+                )
+
+            return Result(name, await wait_for(coro, timeout=timeout))
+        except Exception as error:
+            return Result(name, error=error)
+
+
+async def broadcast(
+    servers: Mapping[str, Config],
+    command: str,
+    *args: str,
+    concurrency: int = 32,
+    timeout: float | None = None,
+    use_battleye: bool = False,
+) -> AsyncIterator[Result]:
+    """Run a command on the given servers and yield the results as they finish.
+
+    At most concurrency servers are contacted at the same time.
+    The timeout applies to each server separately.
+    """
+
+    semaphore = Semaphore(concurrency)
+
+    for result in as_completed(
+        [
+            run(
+                name,
+                config,
+                command,
+                *args,
+                semaphore=semaphore,
+                timeout=timeout,
+                use_battleye=use_battleye,
+            )
+            for name, config in servers.items()
+        ]
+    ):
+        yield await result
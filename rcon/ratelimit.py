@@ -0,0 +1,179 @@
+"""Rate limiting and prioritization of commands."""
+
+from __future__ import annotations
+from contextlib import contextmanager
+from enum import IntEnum
+from heapq import heapify, heappop, heappush
+from itertools import count
+from threading import Condition, Lock, get_ident
+from time import monotonic
+from typing import Iterator
+
+
+__all__ = ["Priority", "Scheduler", "TokenBucket"]
+
+
+class Priority(IntEnum):
+    """Command priorities. Lower values are served first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class TokenBucket:
+    """A thread-safe token bucket.
+
+    The bucket holds up to burst tokens and is refilled
+    with rate tokens per second. Each command takes a token.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """Set the rate in tokens per second and the bucket size."""
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive: {rate}")
+
+        if burst < 1:
+            raise ValueError(f"Burst must be at least 1: {burst}")
+
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._updated = monotonic()
+        self._lock = Lock()
+
+    def delay(self, tokens: int = 1) -> float:
+        """Return the seconds until the tokens may be taken.
+
+        Requests for more tokens than the bucket
+        holds only wait for a full bucket.
+        """
+        with self._lock:
+            return self._delay(tokens)
+
+    def take(self, tokens: int = 1) -> None:
+        """Take the tokens, possibly overdrawing the bucket."""
+        with self._lock:
+            self._refill()
+            self.tokens -= tokens
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Take the tokens if they may be taken and return
+        the seconds until they may be taken otherwise.
+        """
+        with self._lock:
+            if (delay := self._delay(tokens)) == 0:
+                self.tokens -= tokens
+
+            return delay
+
+    def _delay(self, tokens: int) -> float:
+        """Return the seconds until the tokens may be taken while holding the lock."""
+        self._refill()
+        return max(min(tokens, self.burst) - self.tokens, 0) / self.rate
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update."""
+        now = monotonic()
+        self.tokens = min(self.tokens + (now - self._updated) * self.rate, self.burst)
+        self._updated = now
+
+
+class Scheduler:
+    """Grants exclusive access to a connection by priority.
+
+    Waiting callers are served in order of their priority and, within
+    the same priority, in order of arrival. If a rate is set, each grant
+    is additionally subject to a token bucket. Callers of higher priority
+    overtake a caller which is waiting for tokens.
+    The thread holding the slot may enter it again without waiting.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int = 1,
+        *,
+        bucket: TokenBucket | None = None,
+    ):
+        """Set the optional rate limit in commands per second and burst size.
+
+        Schedulers given the same bucket share its rate limit.
+        """
+        if bucket is None and rate is not None:
+            bucket = TokenBucket(rate, burst)
+
+        self.bucket = bucket
+        self._condition = Condition()
+        self._waiting: list[tuple[int, int]] = []
+        self._tickets = count()
+        self._owner: int | None = None
+        self._reentrant = True
+
+    @contextmanager
+    def slot(
+        self,
+        priority: int = Priority.NORMAL,
+        tokens: int = 1,
+        *,
+        reentrant: bool = True,
+    ) -> Iterator[None]:
+        """Wait for and hold exclusive access, taking the amount of tokens.
+
+        Entering the slot again from the thread holding it takes the
+        tokens without waiting. If the slot is held with reentrant=False,
+        since the connection is in the middle of a response, doing so
+        raises RuntimeError instead.
+        """
+        with self._condition:
+            if self._owner == get_ident():
+                if not self._reentrant:
+                    raise RuntimeError("Slot is held by an unfinished command.")
+
+                if self.bucket is not None:
+                    self.bucket.take(tokens)
+
+                nested = True
+            else:
+                self._acquire(priority, tokens)
+                self._reentrant = reentrant
+                nested = False
+
+        try:
+            yield
+        finally:
+            if not nested:
+                with self._condition:
+                    self._owner = None
+                    self._condition.notify_all()
+
+    def _acquire(self, priority: int, tokens: int) -> None:
+        """Wait for the slot and take the tokens while holding the lock."""
+        ticket = (priority, next(self._tickets))
+        heappush(self._waiting, ticket)
+
+        try:
+            while (delay := self._delay(ticket, tokens)) != 0:
+                self._condition.wait(delay)
+        except BaseException:
+            self._waiting.remove(ticket)
+            heapify(self._waiting)
+            self._condition.notify_all()
+            raise
+
+        heappop(self._waiting)
+        self._owner = get_ident()
+
+    def _delay(self, ticket: tuple[int, int], tokens: int) -> float | None:
+        """Return the seconds to wait for the ticket's turn while holding the lock.
+
+        None means waiting until notified.
+        Zero means that the tokens have been taken.
+        """
+        if self._owner is not None or self._waiting[0] != ticket:
+            return None
+
+        if self.bucket is None:
+            return 0
+
+        return self.bucket.reserve(tokens)
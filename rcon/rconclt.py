@@ -1,12 +1,21 @@
 """RCON client CLI."""
 
 from argparse import ArgumentParser, Namespace
+from asyncio import run as run_async
+from functools import partial
 from logging import DEBUG, INFO, basicConfig, getLogger
 from pathlib import Path
+from typing import Any, Callable
 
 from rcon import battleye, source
-from rcon.config import CONFIG_FILES, LOG_FORMAT, from_args
+from rcon.client import BaseClient
+from rcon.config import CONFIG_FILES, LOG_FORMAT, SERVERS, Config
+from rcon.config import from_args, load, read_passwd
 from rcon.errorhandler import ErrorHandler
+from rcon.exceptions import ConfigReadError
+from rcon.fleet import broadcast
+from rcon.source.profiles import PROFILES, Profile, get_profile
+from rcon.watch import changes, diff, poll
 
 
 __all__ = ["main"]
@@ -15,11 +24,25 @@ __all__ = ["main"]
 LOGGER = getLogger("rconclt")
 
 
-def get_args() -> Namespace:
+def get_args(argv: list[str] | None = None) -> Namespace:
     """Parse and return the command line arguments."""
 
     parser = ArgumentParser(description="A Minecraft RCON client.")
-    parser.add_argument("server", help="the server to connect to")
+    parser.add_argument(
+        "server", help="the server to connect to (omitted with --all or --group)"
+    )
+    parser.add_argument(
+        "-a",
+        "--all",
+        action="store_true",
+        help="run the command on all configured servers",
+    )
+    parser.add_argument(
+        "-g",
+        "--group",
+        metavar="name",
+        help="run the command on all configured servers of the group",
+    )
     parser.add_argument(
         "-B",
         "--battleye",
@@ -37,6 +60,20 @@ def get_args() -> Namespace:
     parser.add_argument(
         "-d", "--debug", action="store_true", help="print additional debug information"
     )
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=32,
+        metavar="n",
+        help="maximum amount of servers to contact at once",
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        choices=sorted(PROFILES),
+        help="game profile with tuned protocol parameters (Source RCON only)",
+    )
     parser.add_argument(
         "-t",
         "--timeout",
@@ -44,32 +81,194 @@ def get_args() -> Namespace:
         metavar="seconds",
         help="connection timeout in seconds",
     )
-    parser.add_argument("command", help="command to execute on the server")
     parser.add_argument(
-        "argument", nargs="*", default=(), help="arguments for the command"
+        "-w",
+        "--watch",
+        type=float,
+        metavar="seconds",
+        help="rerun the command at this interval and print changed responses",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="print changes as a unified diff when watching",
+    )
+    parser.add_argument("command", nargs="?", help="command to execute on the server")
+    parser.add_argument(
+        "argument", nargs="*", default=[], help="arguments for the command"
+    )
+    args = parser.parse_args(argv)
+
+    if args.all or args.group:
+        # Without a server, the positional arguments shift to the left.
+        if args.command is not None:
+            args.argument.insert(0, args.command)
+
+        args.server, args.command = None, args.server
+    elif args.command is None:
+        parser.error("the following arguments are required: command")
+
+    if args.watch is not None and (args.all or args.group):
+        parser.error("--watch cannot be used with --all or --group")
+
+    if args.watch is not None and args.watch <= 0:
+        parser.error("--watch interval must be positive")
+
+    return args
+
+
+def get_servers(args: Namespace) -> dict[str, Config]:
+    """Return the configured servers selected by the arguments."""
+
+    load(args.config)
+    servers = {
+        name: config
+        for name, config in SERVERS.items()
+        if args.all or args.group in config.groups
+    }
+
+    if not servers:
+        LOGGER.error("No servers selected.")
+        raise ConfigReadError()
+
+    if args.profile is not None:
+        servers = {
+            name: config._replace(profile=args.profile)
+            for name, config in servers.items()
+        }
+    elif not args.battleye:
+        for config in servers.values():
+            select_profile(config.profile)
+
+    if any(config.passwd is None for config in servers.values()):
+        passwd = read_passwd()
+        servers = {
+            name: (
+                config if config.passwd is not None else config._replace(passwd=passwd)
+            )
+            for name, config in servers.items()
+        }
+
+    return servers
+
+
+def select_profile(name: str | None) -> Profile:
+    """Return the profile with the given name or the default profile."""
+
+    try:
+        return get_profile(name)
+    except KeyError:
+        LOGGER.error("No such profile: %s.", name)
+        raise ConfigReadError() from None
+
+
+async def run_many(args: Namespace) -> int:
+    """Run the command on multiple servers and return the highest exit code."""
+
+    exit_code = 0
+
+    async for result in broadcast(
+        get_servers(args),
+        args.command,
+        *args.argument,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        use_battleye=args.battleye,
+    ):
+        if result.error is not None:
+            LOGGER.error("%s: %s", result.server, result.message)
+            exit_code = max(exit_code, result.exit_code)
+        elif result.response:
+            print(f"{result.server}: {result.response}", flush=True)
+
+    return exit_code
+
+
+def watch(
+    args: Namespace,
+    client_factory: Callable[[], BaseClient],
+    run_kwargs: dict[str, Any],
+) -> int:
+    """Rerun the command and print its response whenever it changes."""
+
+    responses = poll(
+        client_factory,
+        args.command,
+        *args.argument,
+        interval=args.watch,
+        **run_kwargs,
     )
-    return parser.parse_args()
+
+    try:
+        for previous, current in changes(responses):
+            if args.diff and previous is not None:
+                print(diff(previous, current), flush=True)
+            else:
+                print(current, flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        responses.close()
+
+    return 0
 
 
-def run() -> None:
+def run() -> int:
     """Run the RCON client."""
 
     args = get_args()
     basicConfig(format=LOG_FORMAT, level=DEBUG if args.debug else INFO)
-    host, port, passwd = from_args(args)
-    client_cls = battleye.Client if args.battleye else source.Client
 
-    with client_cls(host, port, timeout=args.timeout) as client:
-        client.login(passwd)
+    if args.all or args.group:
+        return run_async(run_many(args))
 
-        if text := client.run(args.command, *args.argument):
+    config = from_args(args)
+
+    if args.battleye:
+        client_cls, kwargs, run_kwargs = battleye.Client, {}, {}
+    else:
+        profile = select_profile(args.profile or config.profile)
+        client_cls = source.Client
+        kwargs = profile.client_kwargs(config.host, config.port)
+        run_kwargs = profile.run_kwargs()
+
+    if args.timeout is not None:
+        kwargs["timeout"] = args.timeout
+
+    if args.watch is not None:
+        return watch(
+            args,
+            partial(
+                client_cls,
+                config.host,
+                config.port,
+                passwd=config.passwd,
+                rate_limit=config.rate_limit,
+                burst=config.burst,
+                **kwargs,
+            ),
+            run_kwargs,
+        )
+
+    with client_cls(
+        config.host,
+        config.port,
+        rate_limit=config.rate_limit,
+        burst=config.burst,
+        **kwargs,
+    ) as client:
+        client.login(config.passwd)
+
+        if text := client.run(args.command, *args.argument, **run_kwargs):
             print(text, flush=True)
 
+    return 0
+
 
 def main() -> int:
     """Run the main script with exceptions handled."""
 
     with ErrorHandler(LOGGER) as handler:
-        run()
+        handler.exit_code = run()
 
     return handler.exit_code
@@ -0,0 +1,122 @@
+"""An RCON proxy, sharing one upstream session among many clients."""
+
+from argparse import ArgumentParser, Namespace
+from asyncio import run as run_async
+from logging import DEBUG, INFO, basicConfig, getLogger
+from pathlib import Path
+
+from rcon.config import CONFIG_FILES, LOG_FORMAT, from_args
+from rcon.errorhandler import ErrorHandler
+from rcon.source.proxy import Proxy
+
+
+__all__ = ["main"]
+
+
+LOGGER = getLogger("rconproxy")
+
+
+def get_args() -> Namespace:
+    """Parse and return the command line arguments."""
+
+    parser = ArgumentParser(
+        description="An RCON proxy, sharing one upstream session among many clients."
+    )
+    parser.add_argument("server", help="the upstream server")
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=Path,
+        metavar="file",
+        default=CONFIG_FILES,
+        help="the configuration file",
+    )
+    parser.add_argument(
+        "-H", "--host", default="127.0.0.1", help="the address to listen on"
+    )
+    parser.add_argument(
+        "-P", "--port", type=int, default=27015, help="the port to listen on"
+    )
+    parser.add_argument(
+        "-p",
+        "--passwd",
+        help="the password required to log in to the proxy "
+        "(defaults to the upstream password)",
+    )
+    parser.add_argument(
+        "-C",
+        "--cache",
+        action="append",
+        default=[],
+        metavar="command",
+        help="cache the responses to this read-only command",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=1,
+        metavar="seconds",
+        help="time to cache responses for",
+    )
+    parser.add_argument(
+        "-d", "--debug", action="store_true", help="print additional debug information"
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        metavar="seconds",
+        help="upstream connection timeout in seconds",
+    )
+    return parser.parse_args()
+
+
+async def serve(proxy: Proxy) -> None:
+    """Start the proxy and serve until cancelled."""
+
+    await proxy.start()
+    LOGGER.info(
+        "Relaying %s:%i to %s:%i.",
+        proxy.host,
+        proxy.port,
+        proxy.upstream.host,
+        proxy.upstream.port,
+    )
+
+    try:
+        await proxy.serve_forever()
+    finally:
+        await proxy.close()
+
+
+def run() -> None:
+    """Run the RCON proxy."""
+
+    args = get_args()
+    basicConfig(format=LOG_FORMAT, level=DEBUG if args.debug else INFO)
+    config = from_args(args)
+    proxy = Proxy(
+        config.host,
+        config.port,
+        config.passwd,
+        timeout=args.timeout,
+        cache=args.cache,
+        cache_ttl=args.cache_ttl,
+        host=args.host,
+        port=args.port,
+        passwd=args.passwd,
+    )
+
+    try:
+        run_async(serve(proxy))
+    except KeyboardInterrupt:
+        LOGGER.info("Stopped.")
+
+
+def main() -> int:
+    """Run the main script with exceptions handled."""
+
+    with ErrorHandler(LOGGER) as handler:
+        run()
+
+    return handler.exit_code
@@ -0,0 +1,64 @@
+"""A Source RCON server for testing."""
+
+from argparse import ArgumentParser, Namespace
+from asyncio import run as run_async
+from logging import DEBUG, INFO, basicConfig, getLogger
+
+from rcon.config import LOG_FORMAT
+from rcon.errorhandler import ErrorHandler
+from rcon.source.server import Server, echo
+
+
+__all__ = ["main"]
+
+
+LOGGER = getLogger("rconserver")
+
+
+def get_args() -> Namespace:
+    """Parse and return the command line arguments."""
+
+    parser = ArgumentParser(
+        description="A Source RCON server, which echoes all commands."
+    )
+    parser.add_argument(
+        "-H", "--host", default="127.0.0.1", help="the address to listen on"
+    )
+    parser.add_argument(
+        "-P", "--port", type=int, default=27015, help="the port to listen on"
+    )
+    parser.add_argument("-p", "--passwd", help="the password required to log in")
+    parser.add_argument(
+        "-d", "--debug", action="store_true", help="print additional debug information"
+    )
+    return parser.parse_args()
+
+
+async def serve(server: Server) -> None:
+    """Start the server and serve until cancelled."""
+
+    await server.start()
+    LOGGER.info("Listening on %s:%i.", server.host, server.port)
+    await server.serve_forever()
+
+
+def run() -> None:
+    """Run the RCON server."""
+
+    args = get_args()
+    basicConfig(format=LOG_FORMAT, level=DEBUG if args.debug else INFO)
+    server = Server(args.host, args.port, passwd=args.passwd, default=echo)
+
+    try:
+        run_async(serve(server))
+    except KeyboardInterrupt:
+        LOGGER.info("Stopped.")
+
+
+def main() -> int:
+    """Run the main script with exceptions handled."""
+
+    with ErrorHandler(LOGGER) as handler:
+        run()
+
+    return handler.exit_code
@@ -57,7 +57,8 @@ def run() -> None:
     client_cls = battleye.Client if args.battleye else source.Client
 
     if args.server:
-        host, port, passwd = from_args(args)
+        config = from_args(args)
+        host, port, passwd = config.host, config.port, config.passwd
     else:
         host = port = passwd = None
 
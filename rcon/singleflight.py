@@ -0,0 +1,46 @@
+"""Coalescing of concurrent identical requests."""
+
+from __future__ import annotations
+from asyncio import Task, create_task, shield
+from functools import partial
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+
+__all__ = ["SingleFlight"]
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Lets concurrent calls with the same key share one in-flight coroutine.
+
+    All callers get its result or exception.
+    Nothing is kept once the coroutine has finished.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def call(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """Await the function or join an in-flight call with the same key.
+
+        The shared task is not cancelled if one of the callers is.
+        """
+        if (task := self._tasks.get(key)) is None:
+            task = self._tasks[key] = create_task(function())
+            task.add_done_callback(partial(self._forget, key))
+
+        return await shield(task)
+
+    def _forget(self, key: Hashable, task: Task) -> None:
+        """Remove a finished task."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+        if not task.cancelled():
+            # Mark the exception as retrieved, in case all callers were cancelled.
+            task.exception()
@@ -1,7 +1,10 @@
 """Source RCON implementation."""
 
+from rcon.source.async_client import AsyncClient
 from rcon.source.async_rcon import rcon
 from rcon.source.client import Client
+from rcon.source.pool import AsyncClientPool, ClientPool
+from rcon.source.server import Server
 
 
-__all__ = ["Client", "rcon"]
+__all__ = ["AsyncClient", "AsyncClientPool", "Client", "ClientPool", "Server", "rcon"]
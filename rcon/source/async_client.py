@@ -0,0 +1,477 @@
+"""Persistent asynchronous client."""
+
+from __future__ import annotations
+from asyncio import CancelledError, Event, Future, Queue, StreamReader, StreamWriter
+from asyncio import Task, TimeoutError as AsyncTimeoutError, TimerHandle
+from asyncio import create_task, gather, get_running_loop, open_connection, wait_for
+from codecs import getincrementaldecoder
+from logging import getLogger
+from typing import AsyncIterator, Iterable, Sequence
+
+from rcon.client import AsyncBaseClient
+from rcon.exceptions import EmptyResponse, WrongPassword
+from rcon.source.framing import Framing, Termination
+from rcon.source.proto import Packet, Type, make_batch, pack, random_request_id
+
+
+__all__ = ["AsyncClient"]
+
+
+LOGGER = getLogger(__file__)
+STREAM_BUFFER = 16
+
+
+class PendingResponse:
+    """A response, which is still being received."""
+
+    __slots__ = ("future", "fragments", "sentinel", "timer")
+
+    def __init__(self):
+        """Create the future to resolve."""
+        self.future: Future = get_running_loop().create_future()
+        self.fragments = []
+        self.sentinel = None
+        self.timer: TimerHandle | None = None
+
+    @property
+    def sizes(self) -> list[int]:
+        """Return the payload sizes of the received fragments."""
+        return [len(fragment.payload) for fragment in self.fragments]
+
+    def add(self, fragment: Packet) -> None:
+        """Add a received fragment."""
+        self.fragments.append(fragment)
+
+    def finish(self) -> None:
+        """Resolve the future with the reassembled packet."""
+        if not self.future.done():
+            self.future.set_result(Packet.join(self.fragments))
+
+    def fail(self, error: Exception) -> None:
+        """Fail the future with the given error."""
+        if not self.future.done():
+            self.future.set_exception(error)
+
+    def cancel(self) -> None:
+        """Cancel the future."""
+        self.future.cancel()
+
+
+class PendingStream:
+    """A response, whose fragments are consumed as they arrive.
+
+    At most buffer fragments are queued for the consumer.
+    """
+
+    __slots__ = ("queue", "buffer", "space", "closed", "sentinel", "timer", "sizes")
+
+    def __init__(self, buffer: int = STREAM_BUFFER):
+        """Create the queue of fragments."""
+        self.queue: Queue[Packet | BaseException | None] = Queue()
+        self.buffer = buffer
+        self.space = Event()
+        self.closed = False
+        self.sentinel = None
+        self.timer: TimerHandle | None = None
+        self.sizes: list[int] = []
+
+    @property
+    def full(self) -> bool:
+        """Return whether the consumer has to catch up first."""
+        return self.queue.qsize() >= self.buffer and not self.closed
+
+    async def get(self) -> Packet | BaseException | None:
+        """Return the next fragment, the end of the response or an error."""
+        item = await self.queue.get()
+        self.space.set()
+        return item
+
+    async def writable(self) -> None:
+        """Wait until the consumer made room for another fragment."""
+        while self.full:
+            self.space.clear()
+            await self.space.wait()
+
+    def close(self) -> None:
+        """Stop buffering, since the consumer is gone."""
+        self.closed = True
+        self.space.set()
+
+    def add(self, fragment: Packet) -> None:
+        """Add a received fragment."""
+        self.queue.put_nowait(fragment)
+        self.sizes.append(len(fragment.payload))
+
+    def finish(self) -> None:
+        """Signal the end of the response."""
+        self.queue.put_nowait(None)
+
+    def fail(self, error: Exception) -> None:
+        """Pass the given error to the consumer."""
+        self.queue.put_nowait(error)
+
+    def cancel(self) -> None:
+        """Cancel the consumer."""
+        self.queue.put_nowait(CancelledError())
+
+
+class AsyncClient(AsyncBaseClient):
+    """An asynchronous RCON client with a persistent connection.
+
+    Multiple coroutines may run commands concurrently.
+    Responses are matched to their requests by the packet ID.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        timeout: float | None = None,
+        passwd: str | None = None,
+        frag_threshold: int = 4096,
+        frag_detect_cmd: str = "",
+        raise_unexpected_terminator: bool = False,
+        framing: Framing | None = None,
+        pipelining: bool = True,
+    ):
+        """Set the connection parameters.
+
+        Without a framing, fragmented responses are ended by a sentinel.
+        Without pipelining, run_many() sends one command after another.
+        For details on fragmentation see: https://wiki.vg/RCON#Fragmentation
+        """
+        super().__init__(host, port, timeout=timeout, passwd=passwd)
+        self.frag_threshold = frag_threshold
+        self.frag_detect_cmd = frag_detect_cmd
+        self.raise_unexpected_terminator = raise_unexpected_terminator
+        self.framing = Framing() if framing is None else framing
+        self.pipelining = pipelining
+        self._reader: StreamReader | None = None
+        self._writer: StreamWriter | None = None
+        self._receiver: Task | None = None
+        self._login: Future | None = None
+        self._pending: dict[int, PendingResponse | PendingStream] = {}
+        self._sentinels: dict[int, int] = {}
+
+    @property
+    def connected(self) -> bool:
+        """Return whether the client is connected and receiving packets."""
+        return self._receiver is not None and not self._receiver.done()
+
+    async def connect(self, login: bool = False) -> None:
+        """Connect to the server, start receiving packets
+        and attempt a login if wanted and a password is set.
+        """
+        self._reader, self._writer = await wait_for(
+            open_connection(self.host, self.port), timeout=self.timeout
+        )
+        self._receiver = create_task(self._receive())
+
+        if login and self.passwd is not None:
+            await self.login(self.passwd)
+
+    async def close(self) -> None:
+        """Close the connection and cancel pending requests."""
+        if self._receiver is not None:
+            self._receiver.cancel()
+            self._receiver = None
+
+        self._cancel_pending()
+
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+    async def login(self, passwd: str, *, encoding: str = "utf-8") -> bool:
+        """Perform a login."""
+        self._login = get_running_loop().create_future()
+
+        try:
+            await self._send(Packet.make_login(passwd, encoding=encoding))
+            response = await wait_for(self._login, timeout=self.timeout)
+        finally:
+            self._login = None
+
+        if response.id == -1:
+            raise WrongPassword()
+
+        return True
+
+    async def communicate(self, packet: Packet) -> Packet:
+        """Send a packet and wait for the respective response."""
+        packet, pending = self._expect(packet, PendingResponse())
+
+        try:
+            await self._send(packet)
+            return await wait_for(pending.future, timeout=self.timeout)
+        except AsyncTimeoutError:
+            if pending.sentinel is not None:
+                self.framing.no_echo()
+
+            raise
+        finally:
+            self._forget(packet.id, pending)
+
+    async def run(self, command: str, *args: str, encoding: str = "utf-8") -> str:
+        """Run a command."""
+        request = Packet.make_command(command, *args, encoding=encoding)
+        response = await self.communicate(request)
+        return response.payload.decode(encoding)
+
+    async def run_many(
+        self,
+        commands: Iterable[str | Sequence[str]],
+        *,
+        encoding: str = "utf-8",
+        timeout: float | None = None,
+    ) -> list[str]:
+        """Run multiple commands at once and return their responses in order.
+
+        With pipelining, all commands are sent in one write.
+        If timeout is set, it overrides the client's timeout for each command.
+        """
+        if not self.pipelining:
+            return [
+                await self._run_one(packet, encoding, timeout)
+                for packet in make_batch(commands, encoding=encoding)
+            ]
+
+        expected = [
+            self._expect(packet, PendingResponse())
+            for packet in make_batch(commands, encoding=encoding)
+        ]
+
+        try:
+            await self._send(*(packet for packet, _ in expected))
+            responses = await gather(
+                *(
+                    wait_for(
+                        pending.future,
+                        timeout=self.timeout if timeout is None else timeout,
+                    )
+                    for _, pending in expected
+                )
+            )
+        finally:
+            for packet, pending in expected:
+                self._forget(packet.id, pending)
+
+        return [response.payload.decode(encoding) for response in responses]
+
+    async def stream(
+        self,
+        command: str,
+        *args: str,
+        encoding: str = "utf-8",
+        buffer: int = STREAM_BUFFER,
+    ) -> AsyncIterator[str]:
+        """Run a command and yield the response text as it arrives.
+
+        The timeout applies to each fragment. At most buffer fragments
+        are held in memory. While the consumer lags behind, no packets
+        are received on the connection, which also delays the
+        responses to other commands running concurrently.
+        """
+        request, pending = self._expect(
+            Packet.make_command(command, *args, encoding=encoding),
+            PendingStream(buffer),
+        )
+        decoder = getincrementaldecoder(encoding)()
+
+        try:
+            await self._send(request)
+
+            while (
+                fragment := await wait_for(pending.get(), timeout=self.timeout)
+            ) is not None:
+                if isinstance(fragment, BaseException):
+                    raise fragment
+
+                if text := decoder.decode(fragment.payload):
+                    yield text
+
+            if text := decoder.decode(b"", final=True):
+                yield text
+        except AsyncTimeoutError:
+            if pending.sentinel is not None:
+                self.framing.no_echo()
+
+            raise
+        finally:
+            pending.close()
+            self._forget(request.id, pending)
+
+    async def _run_one(
+        self, packet: Packet, encoding: str, timeout: float | None
+    ) -> str:
+        """Send a command and wait for its response, using the given timeout."""
+        packet, pending = self._expect(packet, PendingResponse())
+
+        try:
+            await self._send(packet)
+            response = await wait_for(
+                pending.future, timeout=self.timeout if timeout is None else timeout
+            )
+        finally:
+            self._forget(packet.id, pending)
+
+        return response.payload.decode(encoding)
+
+    def _expect(
+        self, packet: Packet, pending: PendingResponse | PendingStream
+    ) -> tuple[Packet, PendingResponse | PendingStream]:
+        """Register a pending response to the given packet.
+
+        The packet's ID is replaced if it is already in use.
+        """
+        while packet.id in self._pending or packet.id in self._sentinels:
+            packet = packet._replace(id=random_request_id())
+
+        self._pending[packet.id] = pending
+        return packet, pending
+
+    def _forget(
+        self, request_id: int, pending: PendingResponse | PendingStream
+    ) -> None:
+        """Unregister a pending response."""
+        self._pending.pop(request_id, None)
+
+        if pending.sentinel is not None:
+            self._sentinels.pop(pending.sentinel, None)
+
+        if pending.timer is not None:
+            pending.timer.cancel()
+
+    async def _send(self, *packets: Packet) -> None:
+        """Send packets to the server."""
+        if self._receiver is None:
+            raise RuntimeError("Not connected.")
+
+        if self._receiver.done():
+            raise EmptyResponse()
+
+        self._writer.write(pack(packets))
+        await self._writer.drain()
+
+    async def _receive(self) -> None:
+        """Receive packets and dispatch them to the pending requests."""
+        try:
+            while True:
+                packet = await Packet.aread(
+                    self._reader, self.raise_unexpected_terminator
+                )
+
+                if isinstance(pending := self._pending.get(packet.id), PendingStream):
+                    await self._throttle(pending)
+
+                self._dispatch(packet)
+        except Exception as error:
+            LOGGER.debug("Stopped receiving packets: %s", error)
+            self._fail_pending(error)
+
+    async def _throttle(self, pending: PendingStream) -> None:
+        """Wait for a lagging consumer of a stream before adding a fragment."""
+        if not pending.full:
+            return
+
+        # The response is not over, since another fragment already arrived.
+        if pending.timer is not None:
+            pending.timer.cancel()
+            pending.timer = None
+
+        await pending.writable()
+
+    def _dispatch(self, packet: Packet) -> None:
+        """Handle a received packet."""
+        if packet.type == Type.SERVERDATA_AUTH_RESPONSE and self._login is not None:
+            if not self._login.done():
+                self._login.set_result(packet)
+
+            return
+
+        if (request_id := self._sentinels.pop(packet.id, None)) is not None:
+            # The response to the sentinel marks the end of a fragmented response.
+            if (pending := self._pending.pop(request_id, None)) is not None:
+                self.framing.observe(pending.sizes)
+                pending.finish()
+
+            return
+
+        if (pending := self._pending.get(packet.id)) is None:
+            LOGGER.debug("Discarding packet with unknown ID: %i", packet.id)
+            return
+
+        pending.add(packet)
+
+        if pending.sentinel is not None:
+            return
+
+        if pending.timer is not None:
+            pending.timer.cancel()
+        elif len(packet.payload) < self.framing.threshold(self.frag_threshold):
+            del self._pending[packet.id]
+            pending.finish()
+            return
+        elif self.framing.termination is Termination.SENTINEL:
+            self._send_sentinel(packet.id, pending)
+            return
+
+        if self.framing.is_last(len(packet.payload)):
+            del self._pending[packet.id]
+            pending.finish()
+            return
+
+        pending.timer = get_running_loop().call_later(
+            self.framing.idle_gap, self._finish, packet.id
+        )
+
+    def _send_sentinel(
+        self, request_id: int, pending: PendingResponse | PendingStream
+    ) -> None:
+        """Send a sentinel, whose response marks the end of the given one."""
+        sentinel = Packet.make_command(self.frag_detect_cmd)
+        pending.sentinel = sentinel.id
+        self._sentinels[sentinel.id] = request_id
+        self._writer.write(bytes(sentinel))
+
+    def _finish(self, request_id: int) -> None:
+        """Finish a response after an idle gap.
+
+        If the idle gap follows a fragment of the known fragment size,
+        a sentinel is sent to detect the end of the response instead.
+        """
+        if (pending := self._pending.get(request_id)) is None:
+            return
+
+        pending.timer = None
+
+        if self.framing.termination is Termination.SIZE:
+            self._send_sentinel(request_id, pending)
+            return
+
+        del self._pending[request_id]
+        pending.finish()
+
+    def _cancel_pending(self) -> None:
+        """Cancel all pending requests."""
+        for pending in self._pending.values():
+            pending.cancel()
+
+        if self._login is not None:
+            self._login.cancel()
+
+        self._pending.clear()
+        self._sentinels.clear()
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail all pending requests with the given error."""
+        for pending in self._pending.values():
+            pending.fail(error)
+
+        if self._login is not None and not self._login.done():
+            self._login.set_exception(error)
+
+        self._pending.clear()
+        self._sentinels.clear()
@@ -1,14 +1,23 @@
 """Asynchronous RCON."""
 
-from asyncio import StreamReader, StreamWriter, open_connection, wait_for
+from asyncio import StreamReader, StreamWriter, TimeoutError as AsyncTimeoutError
+from asyncio import create_task, open_connection, shield, wait_for
+from functools import partial
+from typing import Callable
 
+from rcon.cache import ResponseCache
 from rcon.exceptions import SessionTimeout, WrongPassword
+from rcon.singleflight import SingleFlight
+from rcon.source.framing import Framing, Termination
 from rcon.source.proto import Packet, Type
 
 
 __all__ = ["rcon"]
 
 
+SINGLEFLIGHT = SingleFlight()
+
+
 async def close(writer: StreamWriter) -> None:
     """Close socket asynchronously."""
 
@@ -16,6 +25,13 @@ async def close(writer: StreamWriter) -> None:
     await writer.wait_closed()
 
 
+async def send_sentinel(writer: StreamWriter, frag_detect_cmd: str) -> None:
+    """Send a command, whose response marks the end of a fragmented one."""
+
+    writer.write(bytes(Packet.make_command(frag_detect_cmd)))
+    await writer.drain()
+
+
 async def communicate(
     reader: StreamReader,
     writer: StreamWriter,
@@ -24,25 +40,61 @@ async def communicate(
     frag_threshold: int = 4096,
     frag_detect_cmd: str = "",
     raise_unexpected_terminator: bool = False,
+    fragment_handler: Callable[[Packet], None] | None = None,
+    framing: Framing | None = None,
 ) -> Packet:
-    """Make an asynchronous request."""
+    """Make an asynchronous request.
+
+    If a fragment handler is given, it is called with each fragment on arrival.
+    Without a framing, fragmented responses are ended by a sentinel.
+    If the idle gap follows a fragment of the known fragment size,
+    the remaining fragments are read until the response to a sentinel.
+    """
 
     writer.write(bytes(packet))
     await writer.drain()
     response = await Packet.aread(reader, raise_unexpected_terminator)
 
-    if len(response.payload) < frag_threshold:
+    if fragment_handler is not None:
+        fragment_handler(response)
+
+    if framing is None:
+        framing = Framing()
+
+    if len(response.payload) < framing.threshold(frag_threshold):
         return response
 
-    writer.write(bytes(Packet.make_command(frag_detect_cmd)))
-    await writer.drain()
+    fragments = [response]
+
+    if sentinel := framing.termination is Termination.SENTINEL:
+        await send_sentinel(writer, frag_detect_cmd)
+
+    while sentinel or not framing.is_last(len(fragments[-1].payload)):
+        read = create_task(Packet.aread(reader, raise_unexpected_terminator))
+
+        if not sentinel:
+            try:
+                await wait_for(shield(read), timeout=framing.idle_gap)
+            except AsyncTimeoutError:
+                if framing.termination is not Termination.SIZE:
+                    read.cancel()
+                    break
+
+                await send_sentinel(writer, frag_detect_cmd)
+                sentinel = True
 
-    while (
-        successor := await Packet.aread(reader, raise_unexpected_terminator)
-    ).id == response.id:
-        response += successor
+        if (successor := await read).id != response.id:
+            break
 
-    return response
+        if fragment_handler is not None:
+            fragment_handler(successor)
+
+        fragments.append(successor)
+
+    if framing.termination is Termination.SENTINEL:
+        framing.observe([len(fragment.payload) for fragment in fragments])
+
+    return Packet.join(fragments)
 
 
 async def rcon(
@@ -57,32 +109,81 @@ async def rcon(
     timeout: int | None = None,
     enforce_id: bool = True,
     raise_unexpected_terminator: bool = False,
+    fragment_handler: Callable[[Packet], None] | None = None,
+    singleflight: bool = False,
+    cache: ResponseCache | None = None,
+    framing: Framing | None = None,
 ) -> str:
-    """Run a command asynchronously."""
+    """Run a command asynchronously.
+
+    If singleflight is True, concurrent calls with the same server,
+    password, command and arguments share one connection and response.
+    If a cache is given, responses to the commands it allows are cached.
+    Without a framing, fragmented responses are ended by a sentinel.
+    """
+
+    if singleflight or cache is not None:
+        if fragment_handler is not None:
+            raise ValueError("Cannot share responses, which are handled by fragment.")
+
+        key = (host, port, passwd, command, arguments, encoding)
+        function = partial(
+            rcon,
+            command,
+            *arguments,
+            host=host,
+            port=port,
+            passwd=passwd,
+            encoding=encoding,
+            frag_threshold=frag_threshold,
+            frag_detect_cmd=frag_detect_cmd,
+            timeout=timeout,
+            enforce_id=enforce_id,
+            raise_unexpected_terminator=raise_unexpected_terminator,
+            framing=framing,
+        )
+
+        if cache is not None and (ttl := cache.ttls.get(command)) is not None:
+            return await cache.acall(key, ttl, function)
+
+        if singleflight:
+            return await SINGLEFLIGHT.call(key, function)
+
+        return await function()
 
     reader, writer = await wait_for(open_connection(host, port), timeout=timeout)
-    response = await communicate(
-        reader,
-        writer,
-        Packet.make_login(passwd, encoding=encoding),
-        frag_threshold=frag_threshold,
-        frag_detect_cmd=frag_detect_cmd,
-    )
-
-    # Wait for SERVERDATA_AUTH_RESPONSE according to:
-    # https://developer.valvesoftware.com/wiki/Source_RCON_Protocol
-    while response.type != Type.SERVERDATA_AUTH_RESPONSE:
-        response = await Packet.aread(reader, raise_unexpected_terminator)
-
-    if response.id == -1:
-        await close(writer)
-        raise WrongPassword()
 
-    request = Packet.make_command(command, *arguments, encoding=encoding)
-    response = await communicate(
-        reader, writer, request, raise_unexpected_terminator=raise_unexpected_terminator
-    )
-    await close(writer)
+    # Close the connection even if cancelled, e.g. by a timeout of the caller.
+    try:
+        response = await communicate(
+            reader,
+            writer,
+            Packet.make_login(passwd, encoding=encoding),
+            frag_threshold=frag_threshold,
+            frag_detect_cmd=frag_detect_cmd,
+        )
+
+        # Wait for SERVERDATA_AUTH_RESPONSE according to:
+        # https://developer.valvesoftware.com/wiki/Source_RCON_Protocol
+        while response.type != Type.SERVERDATA_AUTH_RESPONSE:
+            response = await Packet.aread(reader, raise_unexpected_terminator)
+
+        if response.id == -1:
+            raise WrongPassword()
+
+        request = Packet.make_command(command, *arguments, encoding=encoding)
+        response = await communicate(
+            reader,
+            writer,
+            request,
+            frag_threshold=frag_threshold,
+            frag_detect_cmd=frag_detect_cmd,
+            raise_unexpected_terminator=raise_unexpected_terminator,
+            fragment_handler=fragment_handler,
+            framing=framing,
+        )
+    finally:
+        await close(writer)
 
     if enforce_id and response.id != request.id:
         raise SessionTimeout()
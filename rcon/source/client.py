@@ -1,25 +1,50 @@
 """Synchronous client."""
 
+from codecs import getincrementaldecoder
+from collections import deque
+from select import select
 from socket import SOCK_STREAM
+from typing import Iterable, Iterator, Sequence
 
 from rcon.client import BaseClient
-from rcon.exceptions import SessionTimeout, WrongPassword
-from rcon.source.proto import Packet, Type
+from rcon.exceptions import EmptyResponse, SessionTimeout, WrongPassword
+from rcon.ratelimit import Priority
+from rcon.source.framing import Framing, Termination
+from rcon.source.proto import Decoder, Packet, Type, make_batch, pack
 
 __all__ = ["Client"]
 
 
+RECV_SIZE = 65_536
+
+
 class Client(BaseClient, socket_type=SOCK_STREAM):
     """An RCON client."""
 
-    def __init__(self, *args, frag_threshold: int = 4096, **kwargs):
-        """Set an optional fragmentation threshold and
-        command in order to detect fragmented packets.
+    def __init__(
+        self,
+        *args,
+        frag_threshold: int = 4096,
+        framing: Framing | None = None,
+        read_size: int = RECV_SIZE,
+        pipelining: bool = True,
+        **kwargs,
+    ):
+        """Set an optional fragmentation threshold and the
+        strategy to detect the end of fragmented responses.
 
+        Without a framing, fragmented responses are ended by a sentinel.
+        Without pipelining, run_many() sends one command after another.
         For details see: https://wiki.vg/RCON#Fragmentation
         """
         super().__init__(*args, **kwargs)
         self.frag_threshold = frag_threshold
+        self.framing = Framing() if framing is None else framing
+        self.pipelining = pipelining
+        self._chunk = bytearray(read_size)
+        self._decoder = Decoder()
+        self._packets = deque()
+        self._trailing = None
 
     def communicate(
         self, packet: Packet, raise_unexpected_terminator: bool = False
@@ -30,23 +55,120 @@ class Client(BaseClient, socket_type=SOCK_STREAM):
 
     def send(self, packet: Packet) -> None:
         """Send a packet to the server."""
-        with self._socket.makefile("wb") as file:
-            file.write(bytes(packet))
+        self._socket.sendall(bytes(packet))
+
+    def receive(self, raise_unexpected_terminator: bool = False) -> Packet:
+        """Return the next packet, receiving data from the server as needed."""
+        self._decoder.raise_unexpected_terminator = raise_unexpected_terminator
+
+        while not self._packets:
+            if not (size := self._socket.recv_into(self._chunk)):
+                raise EmptyResponse()
+
+            with memoryview(self._chunk) as view:
+                self._decoder.feed(view[:size])
+
+            self._packets.extend(self._decoder.decode())
+
+        return self._packets.popleft()
 
     def read(self, raise_unexpected_terminator: bool = False) -> Packet:
         """Read a packet from the server."""
-        with self._socket.makefile("rb") as file:
-            response = Packet.read(file, raise_unexpected_terminator)
+        return Packet.join(self.fragments(raise_unexpected_terminator))
 
-            if len(response.payload) < self.frag_threshold:
-                return response
+    def fragments(self, raise_unexpected_terminator: bool = False) -> Iterator[Packet]:
+        """Yield the fragments of the next response as they arrive."""
+        # Skip trailing packets of a previous response or sentinel.
+        while (
+            response := self.receive(raise_unexpected_terminator)
+        ).id == self._trailing:
+            pass
+
+        yield response
+
+        if len(response.payload) < self.framing.threshold(self.frag_threshold):
+            return
+
+        if self.framing.termination is Termination.SENTINEL:
+            yield from self._fragments_until_sentinel(response)
+        else:
+            yield from self._fragments_until_idle(response)
 
-            self.send(Packet.make_empty_response())
+    def _fragments_until_sentinel(self, response: Packet) -> Iterator[Packet]:
+        """Yield the remaining fragments until the echo of a sentinel."""
+        self.send(sentinel := Packet.make_empty_response())
+        self._trailing = sentinel.id
+        sizes = [len(response.payload)]
 
-            while (successor := Packet.read(file)).id == response.id:
-                response += successor
+        try:
+            while (successor := self.receive()).id == response.id:
+                sizes.append(len(successor.payload))
+                yield successor
+        except TimeoutError:
+            self.framing.no_echo()
+            raise
+
+        self.framing.observe(sizes)
+
+    def _fragments_until_idle(self, response: Packet) -> Iterator[Packet]:
+        """Yield the remaining fragments until the last one or an idle gap.
+
+        If the idle gap follows a fragment of the known fragment size,
+        the remaining fragments are read until the echo of a sentinel.
+        """
+        self._trailing = response.id
+        fragment = response
 
-        return response
+        while not self.framing.is_last(len(fragment.payload)):
+            if (fragment := self._receive_within(self.framing.idle_gap)) is None:
+                if self.framing.termination is Termination.SIZE:
+                    yield from self._fragments_until_sentinel(response)
+
+                return
+
+            if fragment.id != response.id:
+                self._packets.appendleft(fragment)
+                return
+
+            yield fragment
+
+    def _receive_within(self, timeout: float) -> Packet | None:
+        """Return the next packet or None if none arrives in time."""
+        if self._packets:
+            return self._packets.popleft()
+
+        previous_timeout = self.timeout
+        self.timeout = timeout
+
+        try:
+            return self.receive()
+        except TimeoutError:
+            return None
+        finally:
+            self.timeout = previous_timeout
+
+    def drain(self) -> bool:
+        """Receive the pending data without blocking and
+        discard trailing packets of the previous response.
+
+        Return whether the connection is still open and no other packets arrived.
+        """
+        try:
+            while select([self._socket], [], [], 0)[0]:
+                if not (size := self._socket.recv_into(self._chunk)):
+                    return False
+
+                with memoryview(self._chunk) as view:
+                    self._decoder.feed(view[:size])
+
+                self._packets.extend(self._decoder.decode())
+        except OSError:
+            return False
+
+        while self._packets and self._packets[0].id == self._trailing:
+            self._packets.popleft()
+
+        return not self._packets
 
     def login(self, passwd: str, *, encoding: str = "utf-8") -> bool:
         """Perform a login."""
@@ -69,12 +191,123 @@ class Client(BaseClient, socket_type=SOCK_STREAM):
         encoding: str = "utf-8",
         enforce_id: bool = True,
         raise_unexpected_terminator: bool = False,
+        priority: int = Priority.NORMAL,
     ) -> str:
-        """Run a command."""
+        """Run a command.
+
+        Concurrent commands are sent in order of their priority,
+        subject to the client's rate limit.
+        """
         request = Packet.make_command(command, *args, encoding=encoding)
-        response = self.communicate(request, raise_unexpected_terminator)
+
+        with self.scheduler.slot(priority):
+            response = self.communicate(request, raise_unexpected_terminator)
 
         if enforce_id and response.id != request.id:
             raise SessionTimeout("packet ID mismatch")
 
         return response.payload.decode(encoding)
+
+    def run_iter(
+        self,
+        command: str,
+        *args: str,
+        encoding: str = "utf-8",
+        enforce_id: bool = True,
+        raise_unexpected_terminator: bool = False,
+        priority: int = Priority.NORMAL,
+    ) -> Iterator[str]:
+        """Run a command and yield the response text as it arrives.
+
+        The connection is held until the iterator is exhausted or closed.
+        If the iterator is closed early, the remaining
+        fragments are received and discarded.
+        Running other commands on the client while iterating
+        raises RuntimeError in the iterating thread and
+        waits for the iterator in other threads.
+        """
+        request = Packet.make_command(command, *args, encoding=encoding)
+
+        with self.scheduler.slot(priority, reentrant=False):
+            self.send(request)
+            decoder = getincrementaldecoder(encoding)()
+            fragments = self.fragments(raise_unexpected_terminator)
+
+            try:
+                for fragment in fragments:
+                    if enforce_id and fragment.id != request.id:
+                        raise SessionTimeout("packet ID mismatch")
+
+                    if text := decoder.decode(fragment.payload):
+                        yield text
+
+                if text := decoder.decode(b"", final=True):
+                    yield text
+            finally:
+                # Keep the stream in sync for subsequent commands.
+                for _ in fragments:
+                    pass
+
+    def run_many(
+        self,
+        commands: Iterable[str | Sequence[str]],
+        *,
+        encoding: str = "utf-8",
+        enforce_id: bool = True,
+        timeout: float | None = None,
+        raise_unexpected_terminator: bool = False,
+        priority: int = Priority.NORMAL,
+    ) -> list[str]:
+        """Run multiple commands at once and return their responses in order.
+
+        With pipelining, all commands are sent in one write, followed by an
+        empty response packet, whose echo marks the end of all preceding
+        responses. Each command counts against the client's rate limit.
+        If timeout is set, it limits the time to wait for each response packet.
+        """
+        if not (requests := make_batch(commands, encoding=encoding)):
+            return []
+
+        fragments = {request.id: [] for request in requests}
+
+        with self.scheduler.slot(priority, len(requests)):
+            previous_timeout = self.timeout
+
+            if timeout is not None:
+                self.timeout = timeout
+
+            try:
+                if self.pipelining:
+                    self._pipeline(requests, fragments, raise_unexpected_terminator)
+                else:
+                    for request in requests:
+                        if (
+                            response := self.communicate(
+                                request, raise_unexpected_terminator
+                            )
+                        ).id == request.id:
+                            fragments[request.id].append(response.payload)
+            finally:
+                self.timeout = previous_timeout
+
+        if enforce_id and not all(fragments.values()):
+            raise SessionTimeout("missing responses")
+
+        return [
+            b"".join(fragments[request.id]).decode(encoding) for request in requests
+        ]
+
+    def _pipeline(
+        self,
+        requests: list[Packet],
+        fragments: dict[int, list[bytes]],
+        raise_unexpected_terminator: bool,
+    ) -> None:
+        """Send all requests at once and collect the payloads of the responses."""
+        sentinel = Packet.make_empty_response()
+        self._socket.sendall(pack([*requests, sentinel]))
+        self._trailing = sentinel.id
+
+        while (response := self.receive(raise_unexpected_terminator)).id != sentinel.id:
+            if (payloads := fragments.get(response.id)) is not None:
+                payloads.append(response.payload)
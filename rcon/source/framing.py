@@ -0,0 +1,113 @@
+"""Detection of the end of fragmented responses."""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from enum import Enum
+from logging import getLogger
+from typing import Sequence
+
+
+__all__ = ["IDLE_GAP", "LEARNED", "Framing", "Termination", "learned"]
+
+
+IDLE_GAP = 0.05
+LEARN_AFTER = 3
+LOGGER = getLogger(__file__)
+
+
+class Termination(Enum):
+    """Strategies to detect the end of a fragmented response."""
+
+    SENTINEL = "sentinel"  # Send a sentinel packet and read until its echo.
+    IDLE = "idle"  # Read until no fragment arrives for the idle gap.
+    SIZE = "size"  # Fragments shorter than the known fragment size are the last.
+
+
+@dataclass
+class Framing:
+    """How the end of fragmented responses is detected on a server.
+
+    Sentinels cost an extra round trip per fragmented response,
+    but work with all servers, which echo empty responses.
+    Idle gaps work with servers, which do not echo them, but cut
+    responses short, which pause longer than the gap between fragments.
+    Known fragment sizes end responses without waiting, unless their
+    size is a multiple of the fragment size. If no fragment follows
+    a full one within the idle gap, a sentinel detects the end.
+
+    If learning, the framing starts with sentinels and switches to the
+    fragment size, once fragmented responses were consistently split at it,
+    or to idle gaps, if the server repeatedly does not echo the sentinel.
+    """
+
+    termination: Termination = Termination.SENTINEL
+    frag_size: int | None = None
+    idle_gap: float = IDLE_GAP
+    learn: bool = False
+    _candidate: int | None = field(default=None, repr=False)
+    _observations: int = field(default=0, repr=False)
+    _misses: int = field(default=0, repr=False)
+
+    def threshold(self, frag_threshold: int) -> int:
+        """Return the payload size from which on a response may be fragmented."""
+        if self.termination is Termination.SIZE and self.frag_size is not None:
+            return self.frag_size
+
+        return frag_threshold
+
+    def is_last(self, size: int) -> bool:
+        """Check whether a fragment of the given size ends the response."""
+        return (
+            self.termination is Termination.SIZE
+            and self.frag_size is not None
+            and size < self.frag_size
+        )
+
+    def observe(self, sizes: Sequence[int]) -> None:
+        """Learn from the fragment sizes of a response ended by a sentinel."""
+        self._misses = 0
+
+        if not self.learn or len(sizes) < 2:
+            return
+
+        *full, last = sizes
+
+        if len(set(full)) != 1 or last > full[0]:
+            LOGGER.debug("Irregular fragment sizes: %s", sizes)
+            self.learn = False
+            return
+
+        if self._candidate != full[0]:
+            self._candidate, self._observations = full[0], 0
+
+        self._observations += 1
+
+        if self._observations >= LEARN_AFTER:
+            LOGGER.info("Learned fragment size: %i", self._candidate)
+            self.termination = Termination.SIZE
+            self.frag_size = self._candidate
+            self.learn = False
+
+    def no_echo(self) -> None:
+        """Learn that the server did not echo a sentinel."""
+        if not self.learn:
+            return
+
+        self._misses += 1
+
+        if self._misses >= LEARN_AFTER:
+            LOGGER.info("Server does not echo sentinels. Using idle gaps.")
+            self.termination = Termination.IDLE
+            self.learn = False
+
+
+LEARNED: dict[tuple[str, int], Framing] = {}
+
+
+def learned(host: str, port: int) -> Framing:
+    """Return the framing learned for the server, shared by all clients.
+
+    Clients only learn, if they are given this framing explicitly.
+    """
+
+    return LEARNED.setdefault((host, port), Framing(learn=True))
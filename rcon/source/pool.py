@@ -0,0 +1,436 @@
+"""Pools of logged-in clients."""
+
+from __future__ import annotations
+from asyncio import Condition as AsyncCondition
+from contextlib import asynccontextmanager, contextmanager
+from logging import getLogger
+from select import select
+from threading import Condition
+from time import monotonic
+from typing import Any, AsyncIterator, Callable, Iterator, NamedTuple
+
+from rcon.exceptions import EmptyResponse, SessionTimeout
+from rcon.source.async_client import AsyncClient
+from rcon.source.client import Client
+
+
+__all__ = ["AsyncClientPool", "ClientPool", "is_alive", "is_connected"]
+
+
+LOGGER = getLogger(__file__)
+RECOVERABLE = (ConnectionError, EmptyResponse, SessionTimeout)
+
+
+class Key(NamedTuple):
+    """Identifies a server and the credentials to log in with."""
+
+    host: str
+    port: int
+    passwd: str | None
+
+
+class IdleClient(NamedTuple):
+    """A client returned to the pool."""
+
+    client: Client | AsyncClient
+    since: float
+
+
+class Slot:
+    """Clients of one server."""
+
+    __slots__ = ("idle", "size")
+
+    def __init__(self):
+        """Initialize an empty slot."""
+        self.idle: list[IdleClient] = []
+        self.size = 0
+
+    def expire(self, deadline: float) -> list[Client | AsyncClient]:
+        """Remove and return clients that have been idle since before the deadline."""
+        expired = [idle.client for idle in self.idle if idle.since < deadline]
+
+        if expired:
+            self.idle = [idle for idle in self.idle if idle.since >= deadline]
+            self.size -= len(expired)
+
+        return expired
+
+
+class Slots:
+    """Bookkeeping of the clients of all servers in a pool.
+
+    The methods do not block and must be called while holding the pool's lock.
+    """
+
+    __slots__ = ("closed", "_slots")
+
+    def __init__(self):
+        """Initialize empty bookkeeping."""
+        self.closed = False
+        self._slots: dict[Key, Slot] = {}
+
+    def available(self, key: Key, max_size: int) -> bool:
+        """Check whether a client of the server can be checked out."""
+        if self.closed:
+            raise RuntimeError("Pool is closed.")
+
+        slot = self._slots.setdefault(key, Slot())
+        return bool(slot.idle) or slot.size < max_size
+
+    def checkout(self, key: Key) -> Client | AsyncClient | None:
+        """Return an idle client or None after reserving room for a new one."""
+        slot = self._slots[key]
+
+        if slot.idle:
+            return slot.idle.pop().client
+
+        slot.size += 1
+        return None
+
+    def checkin(self, key: Key, client: Client | AsyncClient, discard: bool) -> bool:
+        """Return a checked out client and whether it needs to be closed."""
+        if discard or self.closed:
+            if (slot := self._slots.get(key)) is not None:
+                slot.size -= 1
+
+            return True
+
+        self._slots[key].idle.append(IdleClient(client, monotonic()))
+        return False
+
+    def expire(self, idle_timeout: float | None) -> list[Client | AsyncClient]:
+        """Remove and return clients that exceeded the idle timeout."""
+        if idle_timeout is None:
+            return []
+
+        deadline = monotonic() - idle_timeout
+        return [
+            client for slot in self._slots.values() for client in slot.expire(deadline)
+        ]
+
+    def close(self) -> list[Client | AsyncClient]:
+        """Mark the pool as closed and return all idle clients."""
+        self.closed = True
+        idle = [idle.client for slot in self._slots.values() for idle in slot.idle]
+        self._slots.clear()
+        return idle
+
+
+def is_alive(client: Client) -> bool:
+    """Check whether an idle client's connection is still usable.
+
+    An idle connection only receives the trailing packets of the last response,
+    such as a late echo of a sentinel. If it receives anything else,
+    the server either closed it or sent unsolicited data.
+    """
+
+    if client.fileno() == -1:
+        return False
+
+    readable, _, _ = select([client], [], [], 0)
+    return not readable or client.drain()
+
+
+def is_connected(client: AsyncClient) -> bool:
+    """Check whether an idle asynchronous client is still connected."""
+
+    return client.connected
+
+
+class ClientPool:
+    """A thread-safe pool of logged-in clients."""
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 4,
+        idle_timeout: float | None = 60,
+        timeout: float | None = None,
+        health_check: Callable[[Client], bool] = is_alive,
+        **client_args: Any,
+    ):
+        """Set the pool parameters.
+
+        max_size limits the amount of clients per server.
+        Clients idle for longer than idle_timeout seconds are closed.
+        Further keyword arguments are passed to the clients' constructor.
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.health_check = health_check
+        self.client_args = client_args
+        self._slots = Slots()
+        self._condition = Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, typ, value, traceback):
+        """Close the pool."""
+        self.close()
+
+    @contextmanager
+    def client(
+        self, host: str, port: int, passwd: str | None = None
+    ) -> Iterator[Client]:
+        """Check out a logged-in client.
+
+        The client is returned to the pool on exit, unless an error occurred.
+        """
+        key = Key(host, port, passwd)
+        client = self._acquire(key)
+
+        try:
+            yield client
+        except BaseException:
+            self._release(key, client, discard=True)
+            raise
+
+        self._release(key, client)
+
+    def run(
+        self,
+        command: str,
+        *args: str,
+        host: str,
+        port: int,
+        passwd: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """Run a command on a pooled client.
+
+        If the session timed out or the server closed the connection,
+        the command is retried once on a freshly logged-in client.
+        """
+        try:
+            with self.client(host, port, passwd) as client:
+                return client.run(command, *args, **kwargs)
+        except RECOVERABLE as error:
+            LOGGER.debug("Retrying on a new connection due to: %r", error)
+
+        with self.client(host, port, passwd) as client:
+            return client.run(command, *args, **kwargs)
+
+    def evict(self) -> None:
+        """Close clients that exceeded the idle timeout."""
+        with self._condition:
+            expired = self._slots.expire(self.idle_timeout)
+            self._condition.notify_all()
+
+        for client in expired:
+            client.close()
+
+    def close(self) -> None:
+        """Close all idle clients.
+
+        Checked out clients are closed when they are returned.
+        """
+        with self._condition:
+            idle = self._slots.close()
+            self._condition.notify_all()
+
+        for client in idle:
+            client.close()
+
+    def _acquire(self, key: Key) -> Client:
+        """Return a healthy idle client or a newly connected one."""
+        while True:
+            with self._condition:
+                expired = self._slots.expire(self.idle_timeout)
+                self._condition.wait_for(
+                    lambda: self._slots.available(key, self.max_size)
+                )
+                client = self._slots.checkout(key)
+
+            for expired_client in expired:
+                expired_client.close()
+
+            if client is None:
+                return self._connect(key)
+
+            if self.health_check(client):
+                return client
+
+            LOGGER.debug("Discarding unhealthy client for %s:%i.", key.host, key.port)
+            self._release(key, client, discard=True)
+
+    def _connect(self, key: Key) -> Client:
+        """Create a new logged-in client for a reserved slot."""
+        client = self._create(key)
+
+        try:
+            client.connect(login=True)
+        except BaseException:
+            self._release(key, client, discard=True)
+            raise
+
+        return client
+
+    def _create(self, key: Key) -> Client:
+        """Return a new client of the server, which is not connected yet."""
+        return Client(
+            key.host,
+            key.port,
+            timeout=self.timeout,
+            passwd=key.passwd,
+            **self.client_args,
+        )
+
+    def _release(self, key: Key, client: Client, *, discard: bool = False) -> None:
+        """Return a client to the pool."""
+        with self._condition:
+            close = self._slots.checkin(key, client, discard)
+            self._condition.notify_all()
+
+        if close:
+            client.close()
+
+
+class AsyncClientPool:
+    """A pool of logged-in asynchronous clients."""
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 4,
+        idle_timeout: float | None = 60,
+        timeout: float | None = None,
+        health_check: Callable[[AsyncClient], bool] = is_connected,
+        **client_args: Any,
+    ):
+        """Set the pool parameters.
+
+        max_size limits the amount of clients per server.
+        Clients idle for longer than idle_timeout seconds are closed.
+        Further keyword arguments are passed to the clients' constructor.
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.health_check = health_check
+        self.client_args = client_args
+        self._slots = Slots()
+        self._condition = AsyncCondition()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, typ, value, traceback):
+        """Close the pool."""
+        await self.close()
+
+    @asynccontextmanager
+    async def client(
+        self, host: str, port: int, passwd: str | None = None
+    ) -> AsyncIterator[AsyncClient]:
+        """Check out a logged-in client.
+
+        The client is returned to the pool on exit, unless an error occurred.
+        """
+        key = Key(host, port, passwd)
+        client = await self._acquire(key)
+
+        try:
+            yield client
+        except BaseException:
+            await self._release(key, client, discard=True)
+            raise
+
+        await self._release(key, client)
+
+    async def run(
+        self,
+        command: str,
+        *args: str,
+        host: str,
+        port: int,
+        passwd: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """Run a command on a pooled client.
+
+        If the session timed out or the server closed the connection,
+        the command is retried once on a freshly logged-in client.
+        """
+        try:
+            async with self.client(host, port, passwd) as client:
+                return await client.run(command, *args, **kwargs)
+        except RECOVERABLE as error:
+            LOGGER.debug("Retrying on a new connection due to: %r", error)
+
+        async with self.client(host, port, passwd) as client:
+            return await client.run(command, *args, **kwargs)
+
+    async def evict(self) -> None:
+        """Close clients that exceeded the idle timeout."""
+        async with self._condition:
+            expired = self._slots.expire(self.idle_timeout)
+            self._condition.notify_all()
+
+        for client in expired:
+            await client.close()
+
+    async def close(self) -> None:
+        """Close all idle clients.
+
+        Checked out clients are closed when they are returned.
+        """
+        async with self._condition:
+            idle = self._slots.close()
+            self._condition.notify_all()
+
+        for client in idle:
+            await client.close()
+
+    async def _acquire(self, key: Key) -> AsyncClient:
+        """Return a healthy idle client or a newly connected one."""
+        while True:
+            async with self._condition:
+                expired = self._slots.expire(self.idle_timeout)
+                await self._condition.wait_for(
+                    lambda: self._slots.available(key, self.max_size)
+                )
+                client = self._slots.checkout(key)
+
+            for expired_client in expired:
+                await expired_client.close()
+
+            if client is None:
+                return await self._connect(key)
+
+            if self.health_check(client):
+                return client
+
+            LOGGER.debug("Discarding unhealthy client for %s:%i.", key.host, key.port)
+            await self._release(key, client, discard=True)
+
+    async def _connect(self, key: Key) -> AsyncClient:
+        """Create a new logged-in client for a reserved slot."""
+        client = AsyncClient(
+            key.host,
+            key.port,
+            timeout=self.timeout,
+            passwd=key.passwd,
+            **self.client_args,
+        )
+
+        try:
+            await client.connect(login=True)
+        except BaseException:
+            await self._release(key, client, discard=True)
+            raise
+
+        return client
+
+    async def _release(
+        self, key: Key, client: AsyncClient, *, discard: bool = False
+    ) -> None:
+        """Return a client to the pool."""
+        async with self._condition:
+            close = self._slots.checkin(key, client, discard)
+            self._condition.notify_all()
+
+        if close:
+            await client.close()
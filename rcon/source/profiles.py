@@ -0,0 +1,137 @@
+"""Protocol parameters tuned for specific games."""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from sys import maxsize
+from typing import Any
+
+from rcon.source.framing import Framing, Termination, learned
+
+
+__all__ = ["PROFILES", "UNFRAGMENTED", "Profile", "get_profile", "register"]
+
+
+# Threshold for servers, which send responses of any size in one packet.
+UNFRAGMENTED = maxsize
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Protocol parameters of a game's RCON implementation.
+
+    If learning, the framing is learned per server, starting with sentinels.
+    Servers without pipelining get multiple commands one after another.
+    """
+
+    name: str
+    frag_threshold: int = 4096
+    termination: Termination = Termination.SENTINEL
+    frag_size: int | None = None
+    learn: bool = False
+    frag_detect_cmd: str = ""
+    read_size: int = 65_536
+    encoding: str = "utf-8"
+    timeout: float | None = None
+    enforce_id: bool = True
+    raise_unexpected_terminator: bool = False
+    pipelining: bool = True
+
+    def framing(self, host: str, port: int) -> Framing:
+        """Return the framing to use for the server."""
+        if self.learn:
+            return learned(host, port)
+
+        return Framing(self.termination, frag_size=self.frag_size)
+
+    def client_kwargs(self, host: str, port: int) -> dict[str, Any]:
+        """Return the keyword arguments for rcon.source.Client."""
+        return {
+            "timeout": self.timeout,
+            "frag_threshold": self.frag_threshold,
+            "framing": self.framing(host, port),
+            "read_size": self.read_size,
+            "pipelining": self.pipelining,
+        }
+
+    def async_client_kwargs(self, host: str, port: int) -> dict[str, Any]:
+        """Return the keyword arguments for rcon.source.AsyncClient."""
+        return {
+            "timeout": self.timeout,
+            "frag_threshold": self.frag_threshold,
+            "frag_detect_cmd": self.frag_detect_cmd,
+            "raise_unexpected_terminator": self.raise_unexpected_terminator,
+            "framing": self.framing(host, port),
+            "pipelining": self.pipelining,
+        }
+
+    def run_kwargs(self) -> dict[str, Any]:
+        """Return the keyword arguments for rcon.source.Client.run()."""
+        return {
+            "encoding": self.encoding,
+            "enforce_id": self.enforce_id,
+            "raise_unexpected_terminator": self.raise_unexpected_terminator,
+        }
+
+    def rcon_kwargs(self, host: str, port: int) -> dict[str, Any]:
+        """Return the keyword arguments for rcon.source.rcon()."""
+        return {
+            **self.run_kwargs(),
+            "timeout": self.timeout,
+            "frag_threshold": self.frag_threshold,
+            "frag_detect_cmd": self.frag_detect_cmd,
+            "framing": self.framing(host, port),
+        }
+
+
+PROFILES: dict[str, Profile] = {}
+
+
+def register(profile: Profile) -> Profile:
+    """Register a profile under its name."""
+
+    PROFILES[profile.name] = profile
+    return profile
+
+
+def get_profile(name: str | None) -> Profile:
+    """Return the registered profile or, if name is None, the default profile."""
+
+    return PROFILES["default" if name is None else name]
+
+
+# The library's defaults, ending fragmented responses by sentinels.
+register(Profile("default"))
+# Source engine games echo empty responses, so their framing can be learned.
+register(Profile("source", learn=True))
+# Minecraft splits responses into fragments of 4096 characters.
+register(
+    Profile(
+        "minecraft",
+        termination=Termination.SIZE,
+        frag_size=4096,
+        read_size=16_384,
+    )
+)
+# Rust and ARK do not reliably echo empty responses or handle pipelined commands.
+# Their fragment size spares sentinels, unless the last fragment is a full one.
+# Idle gaps would cut short responses, which the server is slow to produce.
+register(
+    Profile(
+        "rust",
+        termination=Termination.SIZE,
+        frag_size=4096,
+        timeout=10,
+        pipelining=False,
+    )
+)
+register(
+    Profile(
+        "ark",
+        termination=Termination.SIZE,
+        frag_size=4096,
+        timeout=10,
+        pipelining=False,
+    )
+)
+# Factorio sends responses of any size in one packet.
+register(Profile("factorio", frag_threshold=UNFRAGMENTED, read_size=262_144))
@@ -1,21 +1,35 @@
 """Low-level protocol stuff."""
 
 from __future__ import annotations
-from asyncio import StreamReader
+from asyncio import IncompleteReadError, StreamReader
 from enum import Enum
 from functools import partial
-from logging import getLogger
+from logging import DEBUG, getLogger
 from random import randint
-from typing import IO, NamedTuple
+from struct import Struct
+from typing import IO, Iterable, NamedTuple, Sequence
 
 from rcon.exceptions import EmptyResponse, UnexpectedTerminator
 
 
-__all__ = ["LittleEndianSignedInt32", "Type", "Packet", "random_request_id"]
+__all__ = [
+    "LittleEndianSignedInt32",
+    "Type",
+    "Decoder",
+    "Packet",
+    "make_batch",
+    "pack",
+    "random_request_id",
+]
 
 
+BODY = Struct("<ii")
+HEADER = Struct("<iii")
 LOGGER = getLogger(__file__)
+SIZE = Struct("<i")
 TERMINATOR = b"\x00\x00"
+# Size of a packet with an empty payload, excluding the size field itself.
+MIN_SIZE = BODY.size + len(TERMINATOR)
 
 
 class LittleEndianSignedInt32(int):
@@ -38,7 +52,7 @@ class LittleEndianSignedInt32(int):
     @classmethod
     async def aread(cls, reader: StreamReader) -> LittleEndianSignedInt32:
         """Read the integer from an asynchronous file-like object."""
-        return cls.from_bytes(await reader.read(4), "little", signed=True)
+        return cls.from_bytes(await reader.readexactly(4), "little", signed=True)
 
     @classmethod
     def read(cls, file: IO) -> LittleEndianSignedInt32:
@@ -79,6 +93,9 @@ class Type(LittleEndianSignedInt32, Enum):
         return cls(value)
 
 
+TYPES = {int(typ): typ for typ in Type}
+
+
 class Packet(NamedTuple):
     """An RCON packet."""
 
@@ -91,16 +108,7 @@ class Packet(NamedTuple):
         if other is None:
             return self
 
-        if other.id != self.id:
-            raise ValueError("Can only add packages with same id.")
-
-        if other.type != self.type:
-            raise ValueError("Can only add packages of same type.")
-
-        if other.terminator != self.terminator:
-            raise ValueError("Can only add packages with same terminator.")
-
-        return Packet(self.id, self.type, self.payload + other.payload, self.terminator)
+        return Packet.join((self, other))
 
     def __radd__(self, other: Packet | None) -> Packet:
         if other is None:
@@ -110,66 +118,135 @@ class Packet(NamedTuple):
 
     def __bytes__(self):
         """Return the packet as bytes with prepended length."""
-        payload = bytes(self.id)
-        payload += bytes(self.type)
-        payload += self.payload
-        payload += self.terminator
-        size = bytes(LittleEndianSignedInt32(len(payload)))
-        return size + payload
+        return b"".join(self.frame())
+
+    def frame(self) -> tuple[bytes, bytes, bytes]:
+        """Return the header, payload and terminator of the packet."""
+        return (
+            HEADER.pack(
+                len(self.payload) + len(self.terminator) + 8, self.id, self.type
+            ),
+            self.payload,
+            self.terminator,
+        )
+
+    @classmethod
+    def join(cls, fragments: Iterable[Packet]) -> Packet:
+        """Join the fragments of a response.
+
+        The payloads are copied only once, regardless of the amount of fragments.
+        """
+        first, *others = fragments
+
+        for other in others:
+            if other.id != first.id:
+                raise ValueError("Can only add packages with same id.")
+
+            if other.type != first.type:
+                raise ValueError("Can only add packages of same type.")
+
+            if other.terminator != first.terminator:
+                raise ValueError("Can only add packages with same terminator.")
+
+        if not others:
+            return first
+
+        return cls(
+            first.id,
+            first.type,
+            b"".join([first.payload, *(other.payload for other in others)]),
+            first.terminator,
+        )
 
     @classmethod
     async def aread(
-        cls, reader: StreamReader, raise_unexpected_terminator: bool = False
+        cls,
+        reader: StreamReader,
+        raise_unexpected_terminator: bool = False,
+        *,
+        max_size: int | None = None,
     ) -> Packet:
-        """Read a packet from an asynchronous file-like object."""
-        LOGGER.debug("Reading packet asynchronously.")
-        size = await LittleEndianSignedInt32.aread(reader)
-        LOGGER.debug("  => size: %i", size)
+        """Read a packet from an asynchronous file-like object.
 
-        if not size:
+        If max_size is set, larger packets are rejected before reading their body.
+        """
+        try:
+            size = await reader.readexactly(4)
+        except IncompleteReadError:
+            raise EmptyResponse() from None
+
+        if not (size := int.from_bytes(size, "little", signed=True)):
             raise EmptyResponse()
 
-        id_ = await LittleEndianSignedInt32.aread(reader)
-        LOGGER.debug("  => id: %i", id_)
-        type_ = await Type.aread(reader, prefix="  ")
-        LOGGER.debug("  => type: %i", type_)
-        payload = await reader.read(size - 10)
-        LOGGER.debug("  => payload: %s", payload)
-        terminator = await reader.read(2)
-        LOGGER.debug("  => terminator: %s", terminator)
+        if size < MIN_SIZE or max_size is not None and size > max_size:
+            raise ValueError("Invalid packet size.", size)
 
-        if terminator != TERMINATOR:
-            if raise_unexpected_terminator:
-                raise UnexpectedTerminator(terminator)
-            LOGGER.warning("Unexpected terminator: %s", terminator)
-
-        return cls(id_, type_, payload, terminator)
+        return cls.decode_body(
+            await reader.readexactly(size), raise_unexpected_terminator
+        )
 
     @classmethod
     def read(cls, file: IO, raise_unexpected_terminator: bool = False) -> Packet:
         """Read a packet from a file-like object."""
-        LOGGER.debug("Reading packet.")
-        size = LittleEndianSignedInt32.read(file)
-        LOGGER.debug("  => size: %i", size)
+        if not (size := int.from_bytes(file.read(4), "little", signed=True)):
+            raise EmptyResponse()
 
-        if not size:
+        return cls.decode_body(file.read(size), raise_unexpected_terminator)
+
+    @classmethod
+    def decode(
+        cls,
+        buffer: bytes | bytearray | memoryview,
+        raise_unexpected_terminator: bool = False,
+        *,
+        offset: int = 0,
+    ) -> Packet:
+        """Decode a complete packet from a buffer at the given offset."""
+        if not (size := SIZE.unpack_from(buffer, offset)[0]):
             raise EmptyResponse()
 
-        id_ = LittleEndianSignedInt32.read(file)
-        LOGGER.debug("  => id: %i", id_)
-        type_ = Type.read(file, prefix="  ")
-        LOGGER.debug("  => type: %i", type_)
-        payload = file.read(size - 10)
-        LOGGER.debug("  => payload: %s", payload)
-        terminator = file.read(2)
-        LOGGER.debug("  => terminator: %s", terminator)
+        if offset + size + 4 > len(buffer):
+            raise ValueError("Incomplete packet.", size)
+
+        with memoryview(buffer) as view:
+            return cls.decode_body(
+                view[offset + 4 : offset + size + 4], raise_unexpected_terminator
+            )
+
+    @classmethod
+    def decode_body(
+        cls,
+        body: bytes | bytearray | memoryview,
+        raise_unexpected_terminator: bool = False,
+    ) -> Packet:
+        """Decode a packet from its body, i.e. the bytes following the size."""
+        if len(body) < MIN_SIZE:
+            raise ValueError("Packet too short.", len(body))
+
+        id_, type_ = BODY.unpack_from(body)
+        payload = bytes(body[8:-2])
+        terminator = bytes(body[-2:])
+
+        if LOGGER.isEnabledFor(DEBUG):
+            LOGGER.debug(
+                "Decoded packet: size=%i, id=%i, type=%i, payload=%s, terminator=%s",
+                len(body),
+                id_,
+                type_,
+                payload,
+                terminator,
+            )
 
         if terminator != TERMINATOR:
             if raise_unexpected_terminator:
                 raise UnexpectedTerminator(terminator)
             LOGGER.warning("Unexpected terminator: %s", terminator)
 
-        return cls(id_, type_, payload, terminator)
+        if (typ := TYPES.get(type_)) is None:
+            typ = Type(type_)
+
+        # Unpacking as signed int32 already guarantees the boundaries.
+        return cls(int.__new__(LittleEndianSignedInt32, id_), typ, payload, terminator)
 
     @classmethod
     def make_command(cls, *args: str, encoding: str = "utf-8") -> Packet:
@@ -191,6 +268,75 @@ class Packet(NamedTuple):
         return cls(random_request_id(), Type.SERVERDATA_AUTH, passwd.encode(encoding))
 
 
+class Decoder:
+    """Incrementally decodes packets from a stream of bytes."""
+
+    __slots__ = ("buffer", "raise_unexpected_terminator")
+
+    def __init__(self, raise_unexpected_terminator: bool = False):
+        """Initialize an empty buffer."""
+        self.buffer = bytearray()
+        self.raise_unexpected_terminator = raise_unexpected_terminator
+
+    def feed(self, data: bytes | bytearray | memoryview) -> None:
+        """Append received data to the buffer."""
+        self.buffer += data
+
+    def decode(self) -> list[Packet]:
+        """Decode and remove all complete packets from the buffer."""
+        packets = []
+        offset = 0
+        available = len(self.buffer)
+
+        while available - offset >= 4:
+            size = SIZE.unpack_from(self.buffer, offset)[0]
+
+            if size and offset + size + 4 > available:
+                break
+
+            packets.append(
+                Packet.decode(
+                    self.buffer, self.raise_unexpected_terminator, offset=offset
+                )
+            )
+            offset += size + 4
+
+        del self.buffer[:offset]
+        return packets
+
+
+def make_batch(
+    commands: Iterable[str | Sequence[str]], *, encoding: str = "utf-8"
+) -> list[Packet]:
+    """Create command packets with distinct request IDs.
+
+    Each command is either a string or a sequence of a command and its arguments.
+    """
+
+    packets = []
+    ids = set()
+
+    for command in commands:
+        if isinstance(command, str):
+            command = (command,)
+
+        packet = Packet.make_command(*command, encoding=encoding)
+
+        while packet.id in ids:
+            packet = packet._replace(id=random_request_id())
+
+        ids.add(packet.id)
+        packets.append(packet)
+
+    return packets
+
+
+def pack(packets: Iterable[Packet]) -> bytes:
+    """Return multiple packets as one buffer."""
+
+    return b"".join(part for packet in packets for part in packet.frame())
+
+
 def random_request_id() -> LittleEndianSignedInt32:
     """Generate a random request ID."""
 
@@ -0,0 +1,105 @@
+"""Proxy multiplexing many RCON clients onto one upstream session."""
+
+from __future__ import annotations
+from asyncio import Lock
+from functools import partial
+from logging import getLogger
+from typing import Any, Iterable
+
+from rcon.cache import ResponseCache
+from rcon.exceptions import EmptyResponse
+from rcon.source.async_client import AsyncClient
+from rcon.source.server import Server
+
+
+__all__ = ["Proxy"]
+
+
+LOGGER = getLogger(__file__)
+
+
+class Proxy(Server):
+    """An RCON server relaying commands to an upstream server.
+
+    Downstream clients authenticate against the proxy.
+    Their commands are sent over one persistent, logged-in upstream
+    connection, on which each request gets its own ID, while responses
+    are returned with the respective downstream request's ID.
+    """
+
+    def __init__(
+        self,
+        upstream_host: str,
+        upstream_port: int,
+        upstream_passwd: str | None = None,
+        *,
+        timeout: float | None = None,
+        cache: Iterable[str] = (),
+        cache_ttl: float = 1,
+        **kwargs: Any,
+    ):
+        """Set the upstream server and optional caching.
+
+        Responses to the commands named in cache are cached for
+        cache_ttl seconds and concurrent identical requests of them
+        are coalesced. Only read-only commands should be cached.
+        Further keyword arguments are passed to Server. Without a password
+        or an authenticator for downstream clients, they have to log in
+        with the upstream password, so that the proxy is never open.
+        """
+        if kwargs.get("passwd") is None and kwargs.get("authenticate") is None:
+            if upstream_passwd is None:
+                raise ValueError("A password for downstream clients is required.")
+
+            kwargs["passwd"] = upstream_passwd
+
+        super().__init__(**kwargs)
+        self.upstream = AsyncClient(
+            upstream_host, upstream_port, timeout=timeout, passwd=upstream_passwd
+        )
+        self.cache = ResponseCache(dict.fromkeys(cache, cache_ttl))
+        self._connecting = Lock()
+
+    async def close(self) -> None:
+        """Stop listening and close the upstream connection."""
+        await super().close()
+        await self.upstream.close()
+
+    async def execute(self, command: str) -> str:
+        """Relay the command upstream or return a cached response."""
+        name, *_ = command.split() or [""]
+
+        if (ttl := self.cache.ttls.get(name)) is None:
+            return await self.relay(command)
+
+        return await self.cache.acall(command, ttl, partial(self.relay, command))
+
+    async def relay(self, command: str) -> str:
+        """Run the command upstream, reconnecting once if the connection broke."""
+        try:
+            return await (await self.connect_upstream()).run(
+                command, encoding=self.encoding
+            )
+        except (ConnectionError, EmptyResponse) as error:
+            LOGGER.warning("Upstream connection lost: %r", error)
+
+        return await (await self.connect_upstream()).run(
+            command, encoding=self.encoding
+        )
+
+    async def connect_upstream(self) -> AsyncClient:
+        """Return the upstream client, connecting and logging in if necessary."""
+        async with self._connecting:
+            if not self.upstream.connected:
+                LOGGER.debug(
+                    "Connecting to %s:%i.", self.upstream.host, self.upstream.port
+                )
+                await self.upstream.close()
+
+                try:
+                    await self.upstream.connect(login=True)
+                except BaseException:
+                    await self.upstream.close()
+                    raise
+
+        return self.upstream
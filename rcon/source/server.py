@@ -0,0 +1,205 @@
+"""Asynchronous RCON server."""
+
+from __future__ import annotations
+from asyncio import IncompleteReadError, Server as AsyncServer
+from asyncio import StreamReader, StreamWriter, start_server
+from hmac import compare_digest
+from inspect import isawaitable
+from logging import getLogger
+from typing import Awaitable, Callable
+
+from rcon.exceptions import EmptyResponse
+from rcon.source.proto import MIN_SIZE, LittleEndianSignedInt32, Packet, Type, pack
+
+
+__all__ = ["Authenticator", "Handler", "Server", "echo"]
+
+
+LOGGER = getLogger(__file__)
+FRAGMENT_SIZE = 4096
+# Requests carry at most 4096 bytes of payload.
+MAX_REQUEST_SIZE = MIN_SIZE + 4096
+# Payload of the packet, that real servers send after mirroring an empty response.
+MIRROR_TERMINATOR = b"\x00\x01\x00\x00"
+WRONG_PASSWORD = LittleEndianSignedInt32(-1)
+Authenticator = Callable[[str], bool]
+Handler = Callable[..., str | Awaitable[str]]
+
+
+def echo(*args: str) -> str:
+    """Return the arguments."""
+
+    return " ".join(args)
+
+
+class Server:
+    """An asynchronous RCON server.
+
+    Commands are dispatched by their first word to the registered
+    handlers, which are called with the remaining words as arguments
+    and may be coroutine functions.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        passwd: str | None = None,
+        authenticate: Authenticator | None = None,
+        default: Handler | None = None,
+        frag_size: int = FRAGMENT_SIZE,
+        encoding: str = "utf-8",
+        backlog: int = 1024,
+    ):
+        """Set the address to listen on and the server's behaviour.
+
+        Clients log in if the authenticator accepts their password or,
+        without an authenticator, if it matches passwd or passwd is None.
+        The default handler is called with all words of unknown commands.
+        If port is 0, a free port is chosen, which is available after start().
+        """
+        self.host = host
+        self.port = port
+        self.passwd = passwd
+        self.authenticate = authenticate
+        self.default = default
+        self.frag_size = frag_size
+        self.encoding = encoding
+        self.backlog = backlog
+        self.handlers: dict[str, Handler] = {}
+        self._server: AsyncServer | None = None
+        self._writers: set[StreamWriter] = set()
+
+    async def __aenter__(self):
+        """Start listening."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, typ, value, traceback):
+        """Stop listening."""
+        await self.close()
+
+    def command(self, name: str) -> Callable[[Handler], Handler]:
+        """Return a decorator, which registers a handler for the command."""
+
+        def decorator(handler: Handler) -> Handler:
+            self.handlers[name] = handler
+            return handler
+
+        return decorator
+
+    async def start(self) -> None:
+        """Start listening for connections."""
+        self._server = await start_server(
+            self.handle, self.host, self.port, backlog=self.backlog
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """Stop listening for connections and close the open ones."""
+        if self._server is not None:
+            self._server.close()
+
+            # Since Python 3.12, wait_closed() waits for all connections.
+            for writer in self._writers:
+                writer.close()
+
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        """Start listening and serve connections until cancelled."""
+        if self._server is None:
+            await self.start()
+
+        await self._server.serve_forever()
+
+    def check_passwd(self, passwd: str) -> bool:
+        """Check whether the password is valid."""
+        if self.authenticate is not None:
+            return self.authenticate(passwd)
+
+        if self.passwd is None:
+            return True
+
+        return compare_digest(passwd.encode(), self.passwd.encode())
+
+    async def execute(self, command: str) -> str:
+        """Execute a command and return the response text."""
+        name, *args = command.split() or [""]
+
+        if (handler := self.handlers.get(name)) is None:
+            if self.default is None:
+                return f"Unknown command: {name}"
+
+            handler, args = self.default, [name, *args]
+
+        if isawaitable(response := handler(*args)):
+            response = await response
+
+        return response
+
+    def fragment(self, request_id: int, payload: bytes) -> list[Packet]:
+        """Split the payload of a response into fragments."""
+        return [
+            Packet(request_id, Type.SERVERDATA_RESPONSE_VALUE, chunk)
+            for chunk in (
+                payload[offset : offset + self.frag_size]
+                for offset in range(0, len(payload) or 1, self.frag_size)
+            )
+        ]
+
+    async def respond(self, request: Packet) -> list[Packet]:
+        """Return the responses to an authenticated request."""
+        if request.type == Type.SERVERDATA_RESPONSE_VALUE:
+            # Mirror empty responses, which clients use to detect fragmentation.
+            return [
+                Packet(request.id, Type.SERVERDATA_RESPONSE_VALUE, b""),
+                Packet(request.id, Type.SERVERDATA_RESPONSE_VALUE, MIRROR_TERMINATOR),
+            ]
+
+        try:
+            response = await self.execute(request.payload.decode(self.encoding))
+        except Exception:
+            LOGGER.exception("Command failed: %s", request.payload)
+            response = ""
+
+        return self.fragment(request.id, response.encode(self.encoding))
+
+    async def handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        """Serve a connection."""
+        authenticated = False
+        self._writers.add(writer)
+
+        try:
+            while True:
+                request = await Packet.aread(reader, max_size=MAX_REQUEST_SIZE)
+
+                if request.type == Type.SERVERDATA_AUTH:
+                    authenticated = self.check_passwd(
+                        request.payload.decode(self.encoding)
+                    )
+                    responses = [
+                        Packet(request.id, Type.SERVERDATA_RESPONSE_VALUE, b""),
+                        Packet(
+                            request.id if authenticated else WRONG_PASSWORD,
+                            Type.SERVERDATA_AUTH_RESPONSE,
+                            b"",
+                        ),
+                    ]
+                elif authenticated:
+                    responses = await self.respond(request)
+                else:
+                    LOGGER.debug("Closing unauthenticated connection.")
+                    break
+
+                writer.write(pack(responses))
+                await writer.drain()
+        except (ConnectionError, EmptyResponse, IncompleteReadError):
+            pass
+        except ValueError as error:
+            LOGGER.debug("Closing connection due to invalid packet: %s", error)
+        finally:
+            self._writers.discard(writer)
+            writer.close()
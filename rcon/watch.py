@@ -0,0 +1,102 @@
+"""Run commands repeatedly over a persistent connection."""
+
+from __future__ import annotations
+from difflib import unified_diff
+from logging import getLogger
+from math import floor
+from time import monotonic, sleep
+from typing import Any, Callable, Iterable, Iterator
+
+from rcon.client import BaseClient
+from rcon.exceptions import EmptyResponse, SessionTimeout
+
+
+__all__ = ["changes", "diff", "poll"]
+
+
+LOGGER = getLogger(__file__)
+RECOVERABLE = (OSError, EmptyResponse, SessionTimeout)
+
+
+def poll(
+    client_factory: Callable[[], BaseClient],
+    command: str,
+    *args: str,
+    interval: float,
+    backoff: float = 1,
+    max_backoff: float = 60,
+    **kwargs: Any,
+) -> Iterator[str]:
+    """Run the command on a schedule and yield the responses.
+
+    The command is run every interval seconds, counted from the first run,
+    so that the schedule does not drift. Runs, which would have been due
+    while the previous one was still running, are skipped.
+    The connection is kept open between runs. If it breaks, a new client
+    is created and logged in, waiting backoff seconds before each attempt,
+    which is doubled after each failure up to max_backoff.
+    Keyword arguments are passed to the client's run() method.
+    """
+
+    client = None
+    delay = backoff
+    start = monotonic()
+
+    try:
+        while True:
+            try:
+                if client is None:
+                    client = client_factory()
+                    client.connect(login=True)
+
+                response = client.run(command, *args, **kwargs)
+            except RECOVERABLE as error:
+                LOGGER.warning(
+                    "Connection failed: %s. Retrying in %.1f seconds.",
+                    str(error) or type(error).__name__,
+                    delay,
+                )
+
+                if client is not None:
+                    client.close()
+                    client = None
+
+                sleep(delay)
+                delay = min(delay * 2, max_backoff)
+                continue
+
+            delay = backoff
+            yield response
+            now = monotonic()
+            sleep(start + (floor((now - start) / interval) + 1) * interval - now)
+    finally:
+        if client is not None:
+            client.close()
+
+
+def changes(responses: Iterable[str]) -> Iterator[tuple[str | None, str]]:
+    """Yield the previous and the current response whenever the response changes.
+
+    The previous response is None for the first one.
+    """
+
+    previous = None
+
+    for response in responses:
+        if response != previous:
+            yield previous, response
+            previous = response
+
+
+def diff(previous: str, current: str) -> str:
+    """Return a unified diff of two responses."""
+
+    return "\n".join(
+        unified_diff(
+            previous.splitlines(),
+            current.splitlines(),
+            "previous",
+            "current",
+            lineterm="",
+        )
+    )
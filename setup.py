@@ -17,6 +17,8 @@ setup(
         "console_scripts": [
             "rcongui = rcon.gui:main",
             "rconclt = rcon.rconclt:main",
+            "rconproxy = rcon.rconproxy:main",
+            "rconserver = rcon.rconserver:main",
             "rconshell = rcon.rconshell:main",
         ],
     },
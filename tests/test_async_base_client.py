@@ -0,0 +1,58 @@
+"""Test the common asynchronous client interface."""
+
+from unittest import IsolatedAsyncioTestCase
+
+from rcon import battleye, source
+from rcon.client import AsyncBaseClient
+from rcon.fleet import run_client
+from rcon.source.server import Server, echo
+
+
+class FailingClient(AsyncBaseClient):
+    """A client, whose connection attempts fail."""
+
+    closed = False
+
+    async def connect(self, login: bool = False) -> None:
+        raise ConnectionRefusedError()
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def login(self, passwd: str) -> bool:
+        return True
+
+    async def run(self, command: str, *args: str) -> str:
+        return command
+
+
+class TestAsyncBaseClient(IsolatedAsyncioTestCase):
+    """Test the asynchronous base client."""
+
+    def test_abstract(self):
+        """Tests that the base client is abstract and implemented by both protocols."""
+        self.assertRaises(TypeError, AsyncBaseClient, "127.0.0.1", 27015)
+        self.assertTrue(issubclass(source.AsyncClient, AsyncBaseClient))
+        self.assertTrue(issubclass(battleye.AsyncClient, AsyncBaseClient))
+
+    async def test_failed_connect(self):
+        """Tests that the client is closed if connecting fails."""
+        client = FailingClient("127.0.0.1", 27015)
+
+        with self.assertRaises(ConnectionRefusedError):
+            async with client:
+                pass
+
+        self.assertTrue(client.closed)
+
+    async def test_run_client(self):
+        """Tests running a command through the common interface."""
+        server = Server(passwd="secret")
+        server.command("echo")(echo)
+
+        async with server:
+            client = source.AsyncClient(
+                "127.0.0.1", server.port, timeout=2, passwd="secret"
+            )
+            self.assertEqual(await run_client(client, "echo", "hello"), "hello")
+            self.assertFalse(client.connected)
@@ -0,0 +1,162 @@
+"""Test the asynchronous BattlEye RCon client."""
+
+from asyncio import Event, gather, sleep, wait_for
+from unittest import IsolatedAsyncioTestCase
+
+from benchmarks.servers import Behaviour, FakeBattlEyeServer, frame
+from rcon.battleye import AsyncClient
+from rcon.battleye.proto import ServerMessage
+from rcon.exceptions import WrongPassword
+
+PASSWD = "secret"
+
+
+class BattlEyeServer(FakeBattlEyeServer):
+    """A stand-in server, which keeps a session and records the requests."""
+
+    def __init__(self, *, fragment_size: int = 4096, reverse: bool = False):
+        super().__init__(Behaviour(passwd=PASSWD, fragment_size=fragment_size))
+        self.reverse = reverse
+        self.logged_in = False
+        self.logins = 0
+        self.commands: list[tuple[int, bytes]] = []
+        self.acks: list[int] = []
+        self.client: tuple[str, int] | None = None
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Record the request and answer it if the session is alive."""
+        self.client = addr
+
+        if (typ := data[7]) == 0x00:
+            self.logins += 1
+            self.logged_in = data[8:] == PASSWD.encode()
+        elif typ == 0x01:
+            self.commands.append((data[8], data[9:]))
+
+            if not self.logged_in:
+                return
+        elif typ == 0x02:
+            self.acks.append(data[8])
+            return
+
+        super().datagram_received(data, addr)
+
+    def command_responses(self, seq: int, command: bytes) -> list[bytes]:
+        """Optionally send the parts of multipart responses in reverse order."""
+        responses = super().command_responses(seq, command)
+        return responses[::-1] if self.reverse else responses
+
+    def message(self, seq: int, text: str) -> None:
+        """Send a server message to the client."""
+        self.transport.sendto(frame(0x02, bytes((seq,)) + text.encode()), self.client)
+
+
+class BattlEyeTestCase(IsolatedAsyncioTestCase):
+    """Run a stand-in BattlEye server."""
+
+    server_args = {}
+
+    async def asyncSetUp(self):
+        self.server = BattlEyeServer(**self.server_args)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    def client(self, **kwargs) -> AsyncClient:
+        """Return a client for the server."""
+        return AsyncClient(
+            "127.0.0.1", self.server.port, **{"timeout": 2, "passwd": PASSWD} | kwargs
+        )
+
+
+class TestAsyncClient(BattlEyeTestCase):
+    """Test running commands and receiving server messages."""
+
+    async def test_run(self):
+        """Tests running commands with increasing sequence numbers."""
+        async with self.client() as client:
+            self.assertEqual(await client.run("say", "hello"), "say hello")
+            self.assertEqual(await client.run("players"), "players")
+
+        self.assertEqual(self.server.commands, [(0, b"say hello"), (1, b"players")])
+
+    async def test_concurrent(self):
+        """Tests that concurrent commands are matched by their sequence numbers."""
+        async with self.client() as client:
+            client.seq_num = 0xF0
+            responses = await gather(*(client.run(f"echo {i}") for i in range(32)))
+
+        self.assertEqual(responses, [f"echo {i}" for i in range(32)])
+        self.assertEqual(
+            [seq for seq, _ in self.server.commands],
+            [0xF0 + i & 0xFF for i in range(32)],
+        )
+
+    async def test_wrong_password(self):
+        """Tests that wrong passwords are rejected."""
+        with self.assertRaises(WrongPassword):
+            async with self.client(passwd="wrong"):
+                pass
+
+    async def test_server_messages(self):
+        """Tests that server messages are acknowledged and handled once."""
+        received = Event()
+        messages = []
+
+        async def handle(message: ServerMessage) -> None:
+            await sleep(0)
+            messages.append(message.message)
+            received.set()
+
+        async with self.client(message_handler=handle) as client:
+            self.server.message(7, "player joined")
+            await wait_for(received.wait(), 2)
+            # The server resends messages, whose acknowledgement got lost.
+            self.server.message(7, "player joined")
+            self.assertEqual(await client.run("players"), "players")
+
+        self.assertEqual(messages, ["player joined"])
+        self.assertEqual(self.server.acks, [7, 7])
+
+    async def test_plain_handler(self):
+        """Tests that plain functions can handle server messages."""
+        messages = []
+
+        async with self.client(message_handler=messages.append) as client:
+            self.server.message(0, "hello")
+            self.assertEqual(await client.run("players"), "players")
+
+        self.assertEqual([message.message for message in messages], ["hello"])
+
+    async def test_events(self):
+        """Tests that the event stream replaces the handler."""
+        async with self.client(message_handler=self.fail) as client:
+            events = client.events()
+            self.server.message(0, "hello")
+            self.server.message(1, "world")
+            messages = []
+
+            async for message in events:
+                messages.append(message.message)
+
+                if len(messages) == 2:
+                    break
+
+            self.assertEqual(await client.run("players"), "players")
+
+        self.assertEqual(messages, ["hello", "world"])
+        self.assertEqual(self.server.acks, [0, 1])
+
+
+class TestMultipart(BattlEyeTestCase):
+    """Test reassembling multipart responses."""
+
+    server_args = {"fragment_size": 10, "reverse": True}
+
+    async def test_reassembly(self):
+        """Tests that parts are reassembled by their index."""
+        async with self.client() as client:
+            responses = await gather(client.run("size 35"), client.run("size 10"))
+
+        self.assertEqual(responses, ["x" * 35, "x" * 10])
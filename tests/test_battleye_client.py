@@ -0,0 +1,82 @@
+"""Test the synchronous BattlEye RCon client."""
+
+from asyncio import to_thread
+from threading import Thread
+
+from rcon.battleye import Client
+from tests.test_battleye_async_client import PASSWD, BattlEyeTestCase
+
+
+class TestReceiver(BattlEyeTestCase):
+    """Test receiving packets in the background."""
+
+    def sync_client(self) -> Client:
+        """Return a synchronous client for the server."""
+        return Client("127.0.0.1", self.server.port, timeout=2, passwd=PASSWD)
+
+    async def test_events(self):
+        """Tests that server messages are streamed while commands run."""
+
+        def run() -> tuple[list[str], str]:
+            with self.sync_client() as client:
+                events = client.events()
+                self.server.message(0, "hello")
+                response = client.run("players")
+                client.stop_receiver()
+                return [message.message for message in events], response
+
+        self.assertEqual(await to_thread(run), (["hello"], "players"))
+        self.assertEqual(self.server.acks, [0])
+
+    async def test_events_wait_for_command(self):
+        """Tests that the receiver is not started while a command is running."""
+
+        def run() -> str:
+            with self.sync_client() as client:
+                thread = Thread(target=client.events)
+
+                # Holding the lock stands in for a running command.
+                with client._lock:
+                    thread.start()
+                    thread.join(0.1)
+                    self.assertTrue(thread.is_alive())
+                    self.assertIsNone(client._receiver)
+
+                thread.join()
+                self.assertTrue(client._receiver.is_alive())
+                response = client.run("players")
+                client.stop_receiver()
+                return response
+
+        self.assertEqual(await to_thread(run), "players")
+
+    async def test_stop_receiver(self):
+        """Tests that the receiver stops and no longer takes responses."""
+
+        def run() -> list[str]:
+            responses = []
+
+            with self.sync_client() as client:
+                for index in range(3):
+                    client.events()
+                    receiver = client._receiver
+                    client.stop_receiver()
+                    self.assertFalse(receiver.is_alive())
+                    responses.append(client.run(f"echo {index}"))
+
+            return responses
+
+        self.assertEqual(await to_thread(run), ["echo 0", "echo 1", "echo 2"])
+
+    async def test_close(self):
+        """Tests that closing the client stops the receiver."""
+
+        def run() -> None:
+            client = self.sync_client()
+            client.connect(login=True)
+            client.events()
+            receiver = client._receiver
+            client.close()
+            self.assertFalse(receiver.is_alive())
+
+        await to_thread(run)
@@ -0,0 +1,52 @@
+"""Test the streams of BattlEye server messages."""
+
+from asyncio import run
+from unittest import TestCase
+
+from rcon.battleye.events import AsyncEventStream, EventStream, Policy
+from rcon.battleye.proto import Header, ServerMessage
+
+MESSAGES = [
+    ServerMessage(Header(0, 0x02), seq, f"message {seq}".encode()) for seq in range(4)
+]
+
+
+class TestEventStream(TestCase):
+    """Test the thread-safe event stream."""
+
+    def test_drop(self):
+        """Tests that messages exceeding the size are acknowledged and dropped."""
+        stream = EventStream(maxsize=2, policy=Policy.DROP)
+        self.assertEqual([stream.offer(message) for message in MESSAGES], [True] * 4)
+        self.assertEqual(stream.dropped, 2)
+        stream.close()
+        self.assertEqual(list(stream), MESSAGES[:2])
+
+    def test_block(self):
+        """Tests that messages exceeding the size are not acknowledged."""
+        stream = EventStream(maxsize=2, policy=Policy.BLOCK)
+        self.assertEqual(
+            [stream.offer(message) for message in MESSAGES],
+            [True, True, False, False],
+        )
+        self.assertEqual(stream.dropped, 0)
+        stream.close()
+        self.assertEqual(list(stream), MESSAGES[:2])
+
+
+class TestAsyncEventStream(TestCase):
+    """Test the asynchronous event stream."""
+
+    def test_iteration(self):
+        """Tests that buffered messages are yielded until the stream is closed."""
+
+        async def consume():
+            stream = AsyncEventStream(maxsize=3)
+
+            for message in MESSAGES:
+                stream.offer(message)
+
+            stream.close()
+            return [message async for message in stream]
+
+        self.assertEqual(run(consume()), MESSAGES[:3])
@@ -1,9 +1,13 @@
 """Test the BattlEye protocol."""
 
 from unittest import TestCase
+from zlib import crc32
 
+from rcon.battleye.proto import CommandRequest
+from rcon.battleye.proto import CommandResponse
 from rcon.battleye.proto import Header
-
+from rcon.battleye.proto import MultipartResponse
+from rcon.battleye.proto import ServerMessageAck
 
 HEADER = Header(920575337, 0x00)
 BYTES = b"BEi\xdd\xde6\xff\x00"
@@ -19,3 +23,77 @@ class TestHeader(TestCase):
     def test_header_to_bytes(self):
         """Tests header object parsing."""
         self.assertEqual(bytes(HEADER), BYTES)
+
+
+class TestRequests(TestCase):
+    """Test request encoding."""
+
+    def assertValidFrame(self, frame: bytes, typ: int, payload: bytes):
+        """Assert that the frame carries the payload and a valid checksum."""
+        header = Header.from_bytes(frame[:8])
+        self.assertEqual(header.type, typ)
+        self.assertEqual(header.crc32, crc32(frame[6:]))
+        self.assertEqual(frame[8:], payload)
+
+    def test_command_request(self):
+        """Tests encoding a command request."""
+        self.assertValidFrame(bytes(CommandRequest(3, "players")), 0x01, b"\x03players")
+
+    def test_keepalive(self):
+        """Tests encoding of the cached empty command requests."""
+        for seq in range(0x100):
+            self.assertValidFrame(bytes(CommandRequest(seq, "")), 0x01, bytes((seq,)))
+
+    def test_server_message_ack(self):
+        """Tests encoding of the cached acknowledgements."""
+        for seq in range(0x100):
+            self.assertValidFrame(bytes(ServerMessageAck(seq)), 0x02, bytes((seq,)))
+
+
+class TestCommandResponse(TestCase):
+    """Test command response parsing."""
+
+    def test_single_part(self):
+        """Tests parsing a response that fits into one packet."""
+        response = CommandResponse.from_bytes(HEADER, b"\x07players")
+        self.assertEqual(response.seq, 7)
+        self.assertEqual(response.message, "players")
+        self.assertEqual((response.total, response.index), (1, 0))
+
+    def test_multipart(self):
+        """Tests parsing a part of a multipart response."""
+        response = CommandResponse.from_bytes(HEADER, b"\x07\x00\x03\x01players")
+        self.assertEqual(response.seq, 7)
+        self.assertEqual(response.message, "players")
+        self.assertEqual((response.total, response.index), (3, 1))
+
+
+class TestMultipartResponse(TestCase):
+    """Test multipart response reassembly."""
+
+    def setUp(self):
+        self.parts = [
+            CommandResponse(HEADER, 7, payload, 3, index)
+            for index, payload in enumerate([b"foo", b"bar", b"baz"])
+        ]
+
+    def test_out_of_order(self):
+        """Tests that parts are ordered by their index."""
+        response = MultipartResponse(3)
+        self.assertFalse(response.add(self.parts[2]))
+        self.assertFalse(response.add(self.parts[0]))
+        self.assertTrue(response.add(self.parts[1]))
+        self.assertEqual(response.message, "foobarbaz")
+
+    def test_duplicate(self):
+        """Tests that duplicate parts are not counted twice."""
+        response = MultipartResponse(3)
+        self.assertFalse(response.add(self.parts[0]))
+        self.assertFalse(response.add(self.parts[0]))
+        self.assertFalse(response.add(self.parts[1]))
+        self.assertTrue(response.add(self.parts[2]))
+
+    def test_mismatch(self):
+        """Tests that parts of a different response are rejected."""
+        response = MultipartResponse(2)
+        self.assertRaises(ValueError, response.add, self.parts[0])
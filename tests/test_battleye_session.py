@@ -0,0 +1,103 @@
+"""Test keeping BattlEye sessions alive and logging in again."""
+
+from asyncio import gather, sleep, to_thread
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep as sync_sleep
+
+from rcon.battleye import Client
+from rcon.battleye.client import SESSION_TIMEOUT
+from tests.test_battleye_async_client import PASSWD, BattlEyeTestCase
+
+KEEPALIVE = b""
+
+
+class TestAsyncSession(BattlEyeTestCase):
+    """Test the sessions of the asynchronous client."""
+
+    def keepalives(self) -> int:
+        """Return the amount of received keepalive commands."""
+        return sum(command == KEEPALIVE for _, command in self.server.commands)
+
+    async def test_keepalive(self):
+        """Tests that empty commands are sent periodically."""
+        async with self.client(keepalive=0.02):
+            await sleep(0.1)
+
+        self.assertGreaterEqual(self.keepalives(), 2)
+
+    async def test_expired(self):
+        """Tests that concurrent commands log in once after the session expired."""
+        async with self.client() as client:
+            self.server.logged_in = False
+            client._last_command -= SESSION_TIMEOUT
+            responses = await gather(client.run("a"), client.run("b"))
+
+        self.assertEqual(responses, ["a", "b"])
+        self.assertEqual(self.server.logins, 2)
+
+    async def test_timeout(self):
+        """Tests that concurrent commands log in once after timing out."""
+        async with self.client(timeout=0.2) as client:
+            self.server.logged_in = False
+            responses = await gather(client.run("a"), client.run("b"))
+
+        self.assertEqual(responses, ["a", "b"])
+        self.assertEqual(self.server.logins, 2)
+
+    async def test_keepalive_expired(self):
+        """Tests that the keepalive task logs in again along with commands."""
+        async with self.client(keepalive=0.01) as client:
+            self.server.logged_in = False
+            client._last_command -= SESSION_TIMEOUT
+            self.assertEqual(await client.run("a"), "a")
+            await sleep(0.05)
+
+        self.assertEqual(self.server.logins, 2)
+        self.assertGreaterEqual(self.keepalives(), 1)
+
+
+class TestSession(BattlEyeTestCase):
+    """Test the sessions of the synchronous client."""
+
+    def sync_client(self, **kwargs) -> Client:
+        """Return a synchronous client for the server."""
+        return Client(
+            "127.0.0.1", self.server.port, **{"timeout": 2, "passwd": PASSWD} | kwargs
+        )
+
+    async def test_keepalive(self):
+        """Tests that empty commands are sent periodically."""
+
+        def run() -> None:
+            with self.sync_client(keepalive=0.02):
+                sync_sleep(0.1)
+
+        await to_thread(run)
+        self.assertGreaterEqual(
+            sum(command == KEEPALIVE for _, command in self.server.commands), 2
+        )
+
+    async def test_expired(self):
+        """Tests that concurrent commands log in once after the session expired."""
+
+        def run() -> list[str]:
+            with self.sync_client() as client:
+                self.server.logged_in = False
+                client._last_command -= SESSION_TIMEOUT
+
+                with ThreadPoolExecutor(2) as executor:
+                    return list(executor.map(client.run, ["a", "b"]))
+
+        self.assertEqual(await to_thread(run), ["a", "b"])
+        self.assertEqual(self.server.logins, 2)
+
+    async def test_timeout(self):
+        """Tests that commands log in again after timing out."""
+
+        def run() -> str:
+            with self.sync_client(timeout=0.2) as client:
+                self.server.logged_in = False
+                return client.run("a")
+
+        self.assertEqual(await to_thread(run), "a")
+        self.assertEqual(self.server.logins, 2)
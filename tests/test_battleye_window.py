@@ -0,0 +1,49 @@
+"""Test the detection of resent BattlEye server messages."""
+
+from unittest import TestCase
+
+from rcon.battleye.window import SequenceWindow
+
+
+class TestSequenceWindow(TestCase):
+    """Test the window of recently seen sequence numbers."""
+
+    def test_duplicate(self):
+        """Tests that seen sequence numbers are recognized."""
+        window = SequenceWindow()
+        self.assertNotIn(42, window)
+        window.add(42)
+        self.assertIn(42, window)
+
+    def test_eviction(self):
+        """Tests that the oldest sequence number is forgotten."""
+        window = SequenceWindow(4)
+
+        for seq in range(5):
+            window.add(seq)
+
+        self.assertNotIn(0, window)
+        self.assertTrue(all(seq in window for seq in range(1, 5)))
+
+    def test_wraparound(self):
+        """Tests that sequence numbers can be reused after wrapping around."""
+        window = SequenceWindow()
+
+        for seq in range(0x100):
+            window.add(seq)
+
+        self.assertNotIn(0x00, window)
+        self.assertNotIn(0x7F, window)
+        self.assertIn(0x80, window)
+        self.assertIn(0xFF, window)
+
+    def test_clear(self):
+        """Tests that clearing forgets all sequence numbers."""
+        window = SequenceWindow()
+        window.add(1)
+        window.clear()
+        self.assertNotIn(1, window)
+
+    def test_invalid_size(self):
+        """Tests that the window must be smaller than the sequence number space."""
+        self.assertRaises(ValueError, SequenceWindow, 0x100)
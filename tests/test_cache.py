@@ -0,0 +1,134 @@
+"""Test the response cache."""
+
+from asyncio import gather, run, sleep as async_sleep
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+from unittest import TestCase
+
+from rcon.cache import ResponseCache
+
+
+class FakeClient:
+    """Counts the commands run."""
+
+    def __init__(self, port: int = 25575, delay: float = 0):
+        self.host = "127.0.0.1"
+        self.port = port
+        self.delay = delay
+        self.calls = 0
+
+    def run(self, command: str, *args: str) -> str:
+        """Return the command and the amount of calls so far."""
+        self.calls += 1
+        sleep(self.delay)
+
+        if command == "fail":
+            raise ConnectionError()
+
+        return " ".join([command, *args, str(self.calls)])
+
+
+class FakeAsyncClient(FakeClient):
+    """Counts the commands run asynchronously."""
+
+    async def run(self, command: str, *args: str) -> str:
+        self.calls += 1
+        await async_sleep(self.delay)
+
+        if command == "fail":
+            raise ConnectionError()
+
+        return " ".join([command, *args, str(self.calls)])
+
+
+class TestResponseCache(TestCase):
+    """Test caching and coalescing of responses."""
+
+    def test_allowlist(self):
+        """Tests that only commands with a time to live are cached."""
+        cache = ResponseCache({"list": 60})
+        client = FakeClient()
+        self.assertEqual(cache.run(client, "list"), "list 1")
+        self.assertEqual(cache.run(client, "list"), "list 1")
+        self.assertEqual(cache.run(client, "kick", "foo"), "kick foo 2")
+        self.assertEqual(cache.run(client, "kick", "foo"), "kick foo 3")
+
+    def test_key(self):
+        """Tests that responses are cached per server and arguments."""
+        cache = ResponseCache({"list": 60})
+        client, other = FakeClient(), FakeClient(port=25576)
+        self.assertEqual(cache.run(client, "list"), "list 1")
+        self.assertEqual(cache.run(client, "list", "uuids"), "list uuids 2")
+        self.assertEqual(cache.run(other, "list"), "list 1")
+
+    def test_expiry(self):
+        """Tests that responses expire after their time to live."""
+        cache = ResponseCache({"list": 0.01})
+        client = FakeClient()
+        self.assertEqual(cache.run(client, "list"), "list 1")
+        sleep(0.02)
+        self.assertEqual(cache.run(client, "list"), "list 2")
+
+    def test_eviction(self):
+        """Tests that the least recently used response is evicted."""
+        cache = ResponseCache({"list": 60}, max_size=2)
+        client = FakeClient()
+        cache.run(client, "list", "a")
+        cache.run(client, "list", "b")
+        cache.run(client, "list", "a")
+        cache.run(client, "list", "c")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.run(client, "list", "a"), "list a 1")
+        self.assertEqual(cache.run(client, "list", "b"), "list b 4")
+
+    def test_coalescing(self):
+        """Tests that concurrent identical requests share one call."""
+        cache = ResponseCache({"list": 60})
+        client = FakeClient(delay=0.05)
+
+        with ThreadPoolExecutor(10) as executor:
+            responses = list(
+                executor.map(lambda _: cache.run(client, "list"), range(10))
+            )
+
+        self.assertEqual(responses, ["list 1"] * 10)
+        self.assertEqual(client.calls, 1)
+
+    def test_errors(self):
+        """Tests that errors are passed on but not cached."""
+        cache = ResponseCache({"fail": 60})
+        client = FakeClient()
+        self.assertRaises(ConnectionError, cache.run, client, "fail")
+        self.assertRaises(ConnectionError, cache.run, client, "fail")
+        self.assertEqual(client.calls, 2)
+
+
+class TestAsyncResponseCache(TestCase):
+    """Test caching and coalescing of asynchronous responses."""
+
+    def test_coalescing(self):
+        """Tests that concurrent identical requests share one call."""
+        cache = ResponseCache({"list": 60})
+        client = FakeAsyncClient(delay=0.01)
+
+        async def run_commands():
+            return await gather(*(cache.arun(client, "list") for _ in range(10)))
+
+        self.assertEqual(run(run_commands()), ["list 1"] * 10)
+        self.assertEqual(client.calls, 1)
+
+    def test_errors(self):
+        """Tests that errors are passed to all callers but not cached."""
+        cache = ResponseCache({"fail": 60})
+        client = FakeAsyncClient(delay=0.01)
+
+        async def run_commands():
+            return await gather(
+                *(cache.arun(client, "fail") for _ in range(3)), return_exceptions=True
+            )
+
+        self.assertTrue(
+            all(isinstance(error, ConnectionError) for error in run(run_commands()))
+        )
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(len(cache), 0)
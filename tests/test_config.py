@@ -1,5 +1,6 @@
 """Tests the configuration file parsing."""
 
+from configparser import ConfigParser
 from itertools import product
 from random import shuffle
 from string import printable
@@ -50,3 +51,42 @@ class TestConfig(TestCase):
         for host, port in self._sockets:
             self._test_from_string_with_password(host, port)
             self._test_from_string_without_password(host, port)
+
+    def test_from_config_section_groups(self):
+        """Tests reading groups from a config section."""
+        parser = ConfigParser()
+        parser.read_string(
+            "[grouped]\nhost = localhost\nport = 25575\ngroups = eu, survival,\n"
+            "[ungrouped]\nhost = localhost\nport = 25575\n"
+        )
+        self.assertEqual(
+            Config.from_config_section(parser["grouped"]).groups,
+            {"eu", "survival"},
+        )
+        self.assertEqual(Config.from_config_section(parser["ungrouped"]).groups, set())
+
+    def test_from_config_section_rate_limit(self):
+        """Tests reading the rate limit from a config section."""
+        parser = ConfigParser()
+        parser.read_string(
+            "[limited]\nhost = localhost\nport = 25575\nrate_limit = 2.5\nburst = 4\n"
+            "[unlimited]\nhost = localhost\nport = 25575\n"
+        )
+        limited = Config.from_config_section(parser["limited"])
+        self.assertEqual(limited.rate_limit, 2.5)
+        self.assertEqual(limited.burst, 4)
+        unlimited = Config.from_config_section(parser["unlimited"])
+        self.assertIsNone(unlimited.rate_limit)
+        self.assertEqual(unlimited.burst, 1)
+
+    def test_from_config_section_profile(self):
+        """Tests reading the game profile from a config section."""
+        parser = ConfigParser()
+        parser.read_string(
+            "[minecraft]\nhost = localhost\nport = 25575\nprofile = minecraft\n"
+            "[unprofiled]\nhost = localhost\nport = 25575\n"
+        )
+        self.assertEqual(
+            Config.from_config_section(parser["minecraft"]).profile, "minecraft"
+        )
+        self.assertIsNone(Config.from_config_section(parser["unprofiled"]).profile)
@@ -0,0 +1,149 @@
+"""Test running commands on multiple servers in a thread pool."""
+
+from asyncio import sleep, to_thread
+from time import monotonic
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.battleye import Client
+from rcon.battleye.client import SESSION_TIMEOUT
+from rcon.config import Config
+from rcon.exceptions import WrongPassword
+from rcon.executor import Executor, is_session_alive
+from rcon.source.server import Server
+from tests.test_battleye_async_client import BattlEyeTestCase
+
+PASSWD = "secret"
+
+
+class TestExecutor(IsolatedAsyncioTestCase):
+    """Test the executor against local servers."""
+
+    async def asyncSetUp(self):
+        self.logins = 0
+        self.running = 0
+        self.max_running = 0
+        self.servers = []
+
+        for index in range(3):
+            server = Server(authenticate=self.authenticate)
+            server.command("name")(lambda index=index: f"server {index}")
+            server.command("slow")(self.slow)
+            await server.start()
+            self.servers.append(server)
+
+    async def asyncTearDown(self):
+        for server in self.servers:
+            await server.close()
+
+    def authenticate(self, passwd: str) -> bool:
+        """Count the logins."""
+        self.logins += 1
+        return passwd == PASSWD
+
+    async def slow(self) -> str:
+        """Count the concurrently running commands."""
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await sleep(0.02)
+        self.running -= 1
+        return "done"
+
+    def configs(self, passwd: str = PASSWD) -> list[Config]:
+        """Return the configurations of the servers."""
+        return [Config("127.0.0.1", server.port, passwd) for server in self.servers]
+
+    async def test_map(self):
+        """Tests that responses are returned in the order of the servers."""
+
+        def run() -> list[str]:
+            with Executor(4, timeout=2) as executor:
+                return list(executor.map(self.configs() * 3, "name"))
+
+        self.assertEqual(await to_thread(run), ["server 0", "server 1", "server 2"] * 3)
+
+    async def test_client_reuse(self):
+        """Tests that each worker keeps one client per server."""
+
+        def run() -> list[str]:
+            with Executor(2, timeout=2) as executor:
+                return list(executor.map(self.configs()[:1] * 20, "name"))
+
+        self.assertEqual(await to_thread(run), ["server 0"] * 20)
+        self.assertLessEqual(self.logins, 2)
+
+    async def test_max_per_host(self):
+        """Tests that concurrency per host is bounded."""
+
+        def run() -> list[str]:
+            with Executor(8, max_per_host=2, timeout=2) as executor:
+                futures = [
+                    executor.submit(config, "slow") for config in self.configs() * 4
+                ]
+                return [future.result() for future in futures]
+
+        self.assertEqual(await to_thread(run), ["done"] * 12)
+        self.assertEqual(self.max_running, 2)
+
+    async def test_rate_limit(self):
+        """Tests that rate limited servers run commands on multiple clients."""
+        config = self.configs()[0]._replace(rate_limit=100, burst=2)
+
+        def run() -> tuple[list[str], float]:
+            started = monotonic()
+
+            with Executor(4, max_per_host=2, timeout=2) as executor:
+                futures = [executor.submit(config, "slow") for _ in range(8)]
+                return [future.result() for future in futures], monotonic() - started
+
+        responses, elapsed = await to_thread(run)
+        self.assertEqual(responses, ["done"] * 8)
+        self.assertEqual(self.max_running, 2)
+        self.assertGreaterEqual(elapsed, 0.06)
+
+    async def test_error(self):
+        """Tests that errors are passed on through the futures."""
+
+        def run() -> None:
+            with Executor(timeout=2) as executor:
+                executor.submit(self.configs("wrong")[0], "name").result()
+
+        with self.assertRaises(WrongPassword):
+            await to_thread(run)
+
+
+class TestBattlEyeExecutor(BattlEyeTestCase):
+    """Test the executor against a stand-in BattlEye server."""
+
+    async def test_server_messages(self):
+        """Tests that server messages are acknowledged
+        and do not cause idle clients to be replaced.
+        """
+        config = Config("127.0.0.1", self.server.port, PASSWD)
+
+        with Executor(1, timeout=2, use_battleye=True) as executor:
+            for seq in range(4):
+                response = await to_thread(executor.submit(config, "players").result)
+                self.assertEqual(response, "players")
+                self.server.message(seq, f"message {seq}")
+                await sleep(0.02)
+
+            await to_thread(executor.submit(config, "players").result)
+
+        self.assertEqual(self.server.logins, 1)
+        self.assertEqual(self.server.acks, [0, 1, 2, 3])
+
+    async def test_health_check(self):
+        """Tests that only closed sockets and expired sessions are unhealthy."""
+
+        def run() -> list[bool]:
+            with Client(
+                "127.0.0.1", self.server.port, timeout=2, passwd=PASSWD
+            ) as client:
+                client.run("players")
+                alive = is_session_alive(client)
+                client._last_command -= SESSION_TIMEOUT
+                expired = is_session_alive(client)
+
+            return [alive, expired, is_session_alive(client)]
+
+        self.assertEqual(await to_thread(run), [True, False, False])
@@ -0,0 +1,118 @@
+"""Test running commands on many servers."""
+
+from asyncio import TimeoutError as AsyncTimeoutError, sleep
+from contextlib import redirect_stderr
+from io import StringIO
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from rcon.config import Config
+from rcon.exceptions import WrongPassword
+from rcon.fleet import UNKNOWN_ERROR, Result, broadcast
+from rcon.rconclt import get_args
+from rcon.source.server import Server
+
+PASSWD = "secret"
+
+
+class TestBroadcast(IsolatedAsyncioTestCase):
+    """Test broadcasting commands to local servers."""
+
+    async def asyncSetUp(self):
+        self.servers = []
+
+        for delay in (0.1, 0):
+            server = Server(passwd=PASSWD)
+            server.command("wait")(self.waiter(delay))
+            await server.start()
+            self.servers.append(server)
+
+    async def asyncTearDown(self):
+        for server in self.servers:
+            await server.close()
+
+    @staticmethod
+    def waiter(delay: float):
+        """Return a handler, which responds after the delay."""
+
+        async def wait() -> str:
+            await sleep(delay)
+            return f"waited {delay}"
+
+        return wait
+
+    def config(self, index: int, passwd: str = PASSWD) -> Config:
+        """Return the configuration of a server."""
+        return Config("127.0.0.1", self.servers[index].port, passwd)
+
+    async def test_completion_order(self):
+        """Tests that results are yielded as the servers respond."""
+        results = [
+            result
+            async for result in broadcast(
+                {"slow": self.config(0), "fast": self.config(1)}, "wait", timeout=2
+            )
+        ]
+        self.assertEqual(
+            results, [Result("fast", "waited 0"), Result("slow", "waited 0.1")]
+        )
+        self.assertEqual([result.exit_code for result in results], [0, 0])
+
+    async def test_errors(self):
+        """Tests that errors are tagged with the server and an exit code."""
+        results = {
+            result.server: result
+            async for result in broadcast(
+                {
+                    "wrong": self.config(1, "wrong"),
+                    "slow": self.config(0),
+                },
+                "wait",
+                timeout=0.05,
+            )
+        }
+        self.assertIsInstance(results["wrong"].error, WrongPassword)
+        self.assertEqual(results["wrong"].exit_code, 5)
+        self.assertEqual(results["wrong"].message, "Wrong password.")
+        self.assertIsInstance(results["slow"].error, AsyncTimeoutError)
+        self.assertEqual(results["slow"].exit_code, 4)
+        self.assertIsNone(results["slow"].response)
+
+    def test_unknown_error(self):
+        """Tests the exit code and message of unknown errors."""
+        result = Result("server", error=ValueError("invalid"))
+        self.assertEqual(result.exit_code, UNKNOWN_ERROR)
+        self.assertEqual(result.message, "invalid")
+
+
+class TestArguments(TestCase):
+    """Test parsing the command line arguments."""
+
+    def test_single_server(self):
+        """Tests the arguments for a single server."""
+        args = get_args(["server", "say", "hello", "world"])
+        self.assertEqual(args.server, "server")
+        self.assertEqual(args.command, "say")
+        self.assertEqual(args.argument, ["hello", "world"])
+
+    def test_all(self):
+        """Tests that the positional arguments shift without a server."""
+        for argv in (["--all"], ["--group", "lobby"]):
+            with self.subTest(argv=argv):
+                args = get_args([*argv, "say", "hello", "world"])
+                self.assertIsNone(args.server)
+                self.assertEqual(args.command, "say")
+                self.assertEqual(args.argument, ["hello", "world"])
+
+                args = get_args([*argv, "list"])
+                self.assertEqual(args.command, "list")
+                self.assertEqual(args.argument, [])
+
+    def test_missing_command(self):
+        """Tests that a command is required for a single server."""
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            get_args(["server"])
+
+    def test_watch_all(self):
+        """Tests that watching multiple servers is rejected."""
+        with redirect_stderr(StringIO()), self.assertRaises(SystemExit):
+            get_args(["--all", "--watch", "1", "list"])
@@ -0,0 +1,121 @@
+"""Test rate limiting and prioritization of commands."""
+
+from threading import Thread
+from time import monotonic, sleep
+from unittest import TestCase
+
+from rcon.ratelimit import Priority, Scheduler, TokenBucket
+
+
+class TestTokenBucket(TestCase):
+    """Test the token bucket."""
+
+    def test_burst(self):
+        """Tests that a full bucket allows a burst without delay."""
+        bucket = TokenBucket(10, 3)
+
+        for _ in range(3):
+            self.assertEqual(bucket.delay(), 0)
+            bucket.take()
+
+        self.assertAlmostEqual(bucket.delay(), 0.1, delta=0.01)
+
+    def test_overdraw(self):
+        """Tests that requests beyond the burst wait for a full bucket only."""
+        bucket = TokenBucket(10, 2)
+        self.assertEqual(bucket.delay(5), 0)
+        bucket.take(5)
+        self.assertAlmostEqual(bucket.delay(), 0.4, delta=0.01)
+
+    def test_invalid(self):
+        """Tests that invalid parameters are rejected."""
+        self.assertRaises(ValueError, TokenBucket, 0)
+        self.assertRaises(ValueError, TokenBucket, 1, 0)
+
+
+class TestScheduler(TestCase):
+    """Test the scheduler."""
+
+    def test_rate_limit(self):
+        """Tests that slots are granted at the configured rate."""
+        scheduler = Scheduler(50, 2)
+        started = monotonic()
+
+        for _ in range(6):
+            with scheduler.slot():
+                pass
+
+        self.assertGreaterEqual(monotonic() - started, 0.07)
+
+    def test_priority(self):
+        """Tests that waiting callers are served by priority, then by arrival."""
+        scheduler = Scheduler()
+        order = []
+
+        def wait(name: str, priority: Priority) -> None:
+            with scheduler.slot(priority):
+                order.append(name)
+
+        threads = []
+
+        with scheduler.slot():
+            for name, priority in [
+                ("bulk 1", Priority.BULK),
+                ("normal", Priority.NORMAL),
+                ("bulk 2", Priority.BULK),
+                ("interactive", Priority.INTERACTIVE),
+            ]:
+                threads.append(thread := Thread(target=wait, args=(name, priority)))
+                thread.start()
+
+                while len(scheduler._waiting) < len(threads):
+                    sleep(0.001)
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, ["interactive", "normal", "bulk 1", "bulk 2"])
+
+    def test_overtaking(self):
+        """Tests that callers of higher priority overtake one waiting for tokens."""
+        scheduler = Scheduler(5)
+        order = []
+
+        with scheduler.slot():
+            pass
+
+        def wait(name: str, priority: Priority) -> None:
+            with scheduler.slot(priority):
+                order.append(name)
+
+        bulk = Thread(target=wait, args=("bulk", Priority.BULK))
+        bulk.start()
+        sleep(0.05)
+        interactive = Thread(target=wait, args=("interactive", Priority.INTERACTIVE))
+        interactive.start()
+        bulk.join()
+        interactive.join()
+        self.assertEqual(order, ["interactive", "bulk"])
+
+    def test_reentrant(self):
+        """Tests that the thread holding the slot may enter it again."""
+        scheduler = Scheduler(1)
+
+        with scheduler.slot():
+            with scheduler.slot():
+                pass
+
+            self.assertLess(scheduler.bucket.tokens, 0)
+
+        with scheduler.slot(Priority.INTERACTIVE, 0):
+            pass
+
+    def test_not_reentrant(self):
+        """Tests that entering a non-reentrant slot again raises."""
+        scheduler = Scheduler()
+
+        with scheduler.slot(reentrant=False):
+            self.assertRaises(RuntimeError, scheduler.slot().__enter__)
+
+        with scheduler.slot():
+            pass
@@ -0,0 +1,100 @@
+"""Test the coalescing of concurrent identical requests."""
+
+from asyncio import create_task, gather, sleep
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.singleflight import SingleFlight
+from rcon.source import rcon
+from rcon.source.server import Server
+
+
+class TestSingleFlight(IsolatedAsyncioTestCase):
+    """Test the single flight."""
+
+    async def asyncSetUp(self):
+        self.calls = 0
+
+    async def function(self, fail: bool = False) -> int:
+        """Count the calls."""
+        self.calls += 1
+        await sleep(0.01)
+
+        if fail:
+            raise ConnectionError()
+
+        return self.calls
+
+    async def test_coalescing(self):
+        """Tests that concurrent calls with the same key share one call."""
+        flight = SingleFlight()
+        results = await gather(*(flight.call("key", self.function) for _ in range(30)))
+        self.assertEqual(results, [1] * 30)
+        self.assertEqual(len(flight), 0)
+        self.assertEqual(await flight.call("key", self.function), 2)
+
+    async def test_keys(self):
+        """Tests that calls with different keys are not coalesced."""
+        flight = SingleFlight()
+        results = await gather(
+            flight.call(1, self.function), flight.call(2, self.function)
+        )
+        self.assertEqual(sorted(results), [2, 2])
+
+    async def test_errors(self):
+        """Tests that all callers get the exception."""
+        flight = SingleFlight()
+        results = await gather(
+            *(flight.call("key", lambda: self.function(fail=True)) for _ in range(3)),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+        self.assertEqual(self.calls, 1)
+
+    async def test_cancellation(self):
+        """Tests that cancelling one caller does not affect the others."""
+        flight = SingleFlight()
+        first = create_task(flight.call("key", self.function))
+        second = create_task(flight.call("key", self.function))
+        await sleep(0)
+        first.cancel()
+        self.assertEqual(await second, 1)
+
+
+class TestRcon(IsolatedAsyncioTestCase):
+    """Test coalescing of rcon() calls."""
+
+    async def asyncSetUp(self):
+        self.logins = 0
+        self.server = Server(authenticate=self.authenticate)
+
+        @self.server.command("list")
+        async def list_players() -> str:
+            await sleep(0.01)
+            return "There are 0 players online."
+
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def authenticate(self, passwd: str) -> bool:
+        """Count the logins."""
+        self.logins += 1
+        return True
+
+    async def test_singleflight(self):
+        """Tests that concurrent identical calls share one connection."""
+        responses = await gather(
+            *(
+                rcon(
+                    "list",
+                    host="127.0.0.1",
+                    port=self.server.port,
+                    passwd="secret",
+                    singleflight=True,
+                )
+                for _ in range(30)
+            )
+        )
+        self.assertEqual(responses, ["There are 0 players online."] * 30)
+        self.assertEqual(self.logins, 1)
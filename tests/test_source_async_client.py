@@ -0,0 +1,92 @@
+"""Test the persistent asynchronous client."""
+
+from asyncio import IncompleteReadError, StreamReader, StreamWriter, Task
+from asyncio import create_task, gather, sleep
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.source import AsyncClient
+from rcon.source.proto import Packet, Type, pack
+from rcon.source.server import Server
+
+PASSWD = "secret"
+FRAGMENT_SIZE = 100
+
+
+class ConcurrentServer(Server):
+    """A server, which answers the commands of a connection concurrently.
+
+    Responses are therefore sent in the order the commands complete.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.completed: list[str] = []
+        self.tasks: set[Task] = set()
+
+    async def handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        try:
+            while True:
+                request = await Packet.aread(reader)
+
+                if request.type == Type.SERVERDATA_AUTH:
+                    writer.write(
+                        pack(
+                            [
+                                Packet(request.id, Type.SERVERDATA_RESPONSE_VALUE, b""),
+                                Packet(request.id, Type.SERVERDATA_AUTH_RESPONSE, b""),
+                            ]
+                        )
+                    )
+                    continue
+
+                self.tasks.add(task := create_task(self.answer(request, writer)))
+                task.add_done_callback(self.tasks.discard)
+        except IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    async def answer(self, request: Packet, writer: StreamWriter) -> None:
+        """Send all fragments of the response at once, once it is complete."""
+        writer.write(pack(await self.respond(request)))
+
+
+class TestConcurrentRun(IsolatedAsyncioTestCase):
+    """Test running commands concurrently on one connection."""
+
+    async def asyncSetUp(self):
+        self.server = ConcurrentServer(passwd=PASSWD, frag_size=FRAGMENT_SIZE)
+        self.server.command("after")(self.after)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def after(self, delay: str, text: str, count: str) -> str:
+        """Return the repeated text after the delay."""
+        await sleep(float(delay))
+        self.server.completed.append(text)
+        return text * int(count)
+
+    def client(self) -> AsyncClient:
+        """Return a client for the server."""
+        return AsyncClient(
+            "127.0.0.1",
+            self.server.port,
+            timeout=2,
+            passwd=PASSWD,
+            frag_threshold=FRAGMENT_SIZE,
+        )
+
+    async def test_out_of_order(self):
+        """Tests that responses are matched to the commands by their packet ID."""
+        async with self.client() as client:
+            responses = await gather(
+                client.run("after", "0.2", "a", "1"),
+                client.run("after", "0.1", "b", "250"),
+                client.run("after", "0", "c", "300"),
+                client.run("after", "0.05", "d", "2"),
+            )
+
+        self.assertEqual(responses, ["a", "b" * 250, "c" * 300, "dd"])
+        self.assertEqual(self.server.completed, ["c", "d", "b", "a"])
@@ -0,0 +1,111 @@
+"""Test running multiple commands at once."""
+
+from asyncio import TimeoutError as AsyncTimeoutError, sleep, to_thread
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.exceptions import SessionTimeout
+from rcon.source import AsyncClient, Client
+from rcon.source.proto import Packet
+from rcon.source.server import Server, echo
+
+PASSWD = "secret"
+
+
+class IgnoringServer(Server):
+    """A server, which does not answer ignored commands."""
+
+    async def respond(self, request: Packet) -> list[Packet]:
+        if request.payload == b"ignored":
+            return []
+
+        return await super().respond(request)
+
+
+class TestRunMany(IsolatedAsyncioTestCase):
+    """Test batches with the synchronous and asynchronous clients."""
+
+    async def asyncSetUp(self):
+        self.server = IgnoringServer(passwd=PASSWD)
+        self.server.command("echo")(echo)
+        self.server.command("slow")(self.slow)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    @staticmethod
+    async def slow() -> str:
+        """Respond after a while."""
+        await sleep(0.3)
+        return "slow"
+
+    def client(self, cls=AsyncClient, **kwargs):
+        """Return a client for the server."""
+        return cls("127.0.0.1", self.server.port, timeout=2, passwd=PASSWD, **kwargs)
+
+    async def test_run_many(self):
+        """Tests that responses are returned in the order of the commands."""
+
+        def run() -> list[str]:
+            with self.client(Client) as client:
+                return client.run_many(["echo a", ("echo", "b"), "echo c"])
+
+        expected = ["a", "b", "c"]
+        self.assertEqual(await to_thread(run), expected)
+
+        for pipelining in (True, False):
+            with self.subTest(pipelining=pipelining):
+                async with self.client(pipelining=pipelining) as client:
+                    self.assertEqual(
+                        await client.run_many(["echo a", ("echo", "b"), "echo c"]),
+                        expected,
+                    )
+
+    async def test_empty(self):
+        """Tests that an empty batch sends nothing and returns no responses."""
+
+        def run() -> tuple[list[str], str]:
+            with self.client(Client) as client:
+                return client.run_many([]), client.run("echo", "done")
+
+        self.assertEqual(await to_thread(run), ([], "done"))
+
+        async with self.client() as client:
+            self.assertEqual(await client.run_many([]), [])
+            self.assertEqual(await client.run("echo", "done"), "done")
+
+    async def test_timeout(self):
+        """Tests that the timeout applies to each response."""
+
+        def run() -> float:
+            with self.client(Client) as client:
+                self.assertRaises(
+                    TimeoutError, client.run_many, ["echo a", "slow"], timeout=0.1
+                )
+                return client.timeout
+
+        self.assertEqual(await to_thread(run), 2)
+
+        for pipelining in (True, False):
+            with self.subTest(pipelining=pipelining):
+                async with self.client(pipelining=pipelining) as client:
+                    with self.assertRaises(AsyncTimeoutError):
+                        await client.run_many(["echo a", "slow"], timeout=0.1)
+
+                    self.assertEqual(
+                        await client.run_many(["echo b"], timeout=1), ["b"]
+                    )
+
+    async def test_missing_response(self):
+        """Tests that missing responses are detected by the sentinel."""
+
+        def run(enforce_id: bool) -> list[str]:
+            with self.client(Client) as client:
+                return client.run_many(
+                    ["echo a", "ignored", "echo c"], enforce_id=enforce_id
+                )
+
+        with self.assertRaises(SessionTimeout):
+            await to_thread(run, True)
+
+        self.assertEqual(await to_thread(run, False), ["a", "", "c"])
@@ -0,0 +1,278 @@
+"""Test the detection of the end of fragmented responses."""
+
+from asyncio import StreamWriter, sleep, to_thread
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from rcon.source import AsyncClient, Client, rcon
+from rcon.source.framing import IDLE_GAP, LEARN_AFTER, Framing, Termination
+from rcon.source.framing import LEARNED, learned
+from rcon.source.proto import Decoder, Packet, Type
+from rcon.source.server import Server
+
+PASSWD = "secret"
+FRAGMENT_SIZE = 100
+
+
+class TestFraming(TestCase):
+    """Test learning the framing."""
+
+    def test_learn_fragment_size(self):
+        """Tests that consistent fragment sizes are learned."""
+        framing = Framing(learn=True)
+
+        for _ in range(LEARN_AFTER):
+            self.assertIs(framing.termination, Termination.SENTINEL)
+            framing.observe([100, 100, 42])
+
+        self.assertIs(framing.termination, Termination.SIZE)
+        self.assertEqual(framing.frag_size, 100)
+        self.assertEqual(framing.threshold(4096), 100)
+        self.assertTrue(framing.is_last(99))
+        self.assertFalse(framing.is_last(100))
+
+    def test_irregular_fragment_sizes(self):
+        """Tests that irregular fragment sizes stop learning."""
+        framing = Framing(learn=True)
+        framing.observe([100, 80, 42])
+
+        for _ in range(LEARN_AFTER):
+            framing.observe([100, 100, 42])
+
+        self.assertIs(framing.termination, Termination.SENTINEL)
+
+    def test_no_echo(self):
+        """Tests that servers repeatedly not echoing sentinels are read until idle."""
+        framing = Framing(learn=True)
+
+        for _ in range(LEARN_AFTER - 1):
+            framing.no_echo()
+            framing.observe([100])
+
+        for _ in range(LEARN_AFTER - 1):
+            framing.no_echo()
+            self.assertIs(framing.termination, Termination.SENTINEL)
+
+        framing.no_echo()
+        self.assertIs(framing.termination, Termination.IDLE)
+        self.assertFalse(framing.is_last(0))
+
+    def test_explicit(self):
+        """Tests that explicit framings are not changed."""
+        framing = Framing()
+        framing.no_echo()
+
+        for _ in range(LEARN_AFTER):
+            framing.observe([100, 100, 42])
+
+        self.assertIs(framing.termination, Termination.SENTINEL)
+
+
+class CountingServer(Server):
+    """A server counting the sentinels it receives."""
+
+    def __init__(self, *, echo_sentinels: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.echo_sentinels = echo_sentinels
+        self.sentinels = 0
+
+    async def respond(self, request: Packet) -> list[Packet]:
+        if request.type == Type.SERVERDATA_RESPONSE_VALUE or not request.payload:
+            self.sentinels += 1
+
+            if not self.echo_sentinels:
+                return []
+
+        return await super().respond(request)
+
+
+class PausingWriter:
+    """Writes each packet after a pause, like a server under load."""
+
+    def __init__(self, writer: StreamWriter, pause: float):
+        self.writer = writer
+        self.pause = pause
+        self.decoder = Decoder()
+
+    def __getattr__(self, name: str):
+        return getattr(self.writer, name)
+
+    def write(self, data: bytes) -> None:
+        self.decoder.feed(data)
+
+    async def drain(self) -> None:
+        for packet in self.decoder.decode():
+            await sleep(self.pause)
+            self.writer.write(bytes(packet))
+            await self.writer.drain()
+
+
+class PausingServer(CountingServer):
+    """A server pausing longer than the idle gap between packets."""
+
+    async def handle(self, reader, writer):
+        await super().handle(reader, PausingWriter(writer, IDLE_GAP * 2))
+
+
+class TestStrategies(IsolatedAsyncioTestCase):
+    """Test the strategies with the clients."""
+
+    async def start(self, cls=CountingServer, **kwargs) -> CountingServer:
+        """Start a server with a small fragment size."""
+        server = cls(passwd=PASSWD, frag_size=FRAGMENT_SIZE, **kwargs)
+        server.command("big")(lambda size: "x" * int(size))
+        await server.start()
+        self.addAsyncCleanup(server.close)
+        return server
+
+    def run_sync(self, server: Server, *sizes: int, **kwargs) -> list[str]:
+        """Run big commands with the synchronous client."""
+        with Client(
+            "127.0.0.1",
+            server.port,
+            timeout=2,
+            passwd=PASSWD,
+            frag_threshold=FRAGMENT_SIZE,
+            **kwargs,
+        ) as client:
+            return [client.run("big", str(size)) for size in sizes]
+
+    async def run_async(self, server: Server, *sizes: int, **kwargs) -> list[str]:
+        """Run big commands with the asynchronous client."""
+        async with AsyncClient(
+            "127.0.0.1",
+            server.port,
+            timeout=2,
+            passwd=PASSWD,
+            frag_threshold=FRAGMENT_SIZE,
+            **kwargs,
+        ) as client:
+            return [await client.run("big", str(size)) for size in sizes]
+
+    async def test_default(self):
+        """Tests that the clients use sentinels and do not learn by default."""
+        server = await self.start()
+        sizes = [250] * (LEARN_AFTER + 1)
+        expected = ["x" * size for size in sizes]
+        self.assertEqual(await to_thread(self.run_sync, server, *sizes), expected)
+        self.assertEqual(await self.run_async(server, *sizes), expected)
+        self.assertEqual(server.sentinels, len(sizes) * 2)
+        self.assertNotIn(("127.0.0.1", server.port), LEARNED)
+
+    async def test_learning(self):
+        """Tests that the fragment size is learned and sentinels are omitted."""
+        server = await self.start()
+        framing = learned("127.0.0.1", server.port)
+        sizes = [250] * LEARN_AFTER + [250, 300, 42]
+        expected = ["x" * size for size in sizes]
+        self.assertEqual(
+            await to_thread(self.run_sync, server, *sizes, framing=framing), expected
+        )
+        # A sentinel detects the end of the response of 300 characters.
+        self.assertEqual(server.sentinels, LEARN_AFTER + 1)
+        self.assertIs(framing.frag_size, FRAGMENT_SIZE)
+        self.assertEqual(
+            await self.run_async(server, *sizes, framing=framing), expected
+        )
+        self.assertEqual(server.sentinels, LEARN_AFTER + 2)
+
+    async def test_learning_async(self):
+        """Tests that the asynchronous client learns the fragment size."""
+        server = await self.start()
+        sizes = [250] * (LEARN_AFTER + 2)
+        self.assertEqual(
+            await self.run_async(
+                server, *sizes, framing=learned("127.0.0.1", server.port)
+            ),
+            ["x" * size for size in sizes],
+        )
+        self.assertEqual(server.sentinels, LEARN_AFTER)
+
+    async def test_size(self):
+        """Tests responses, whose size is a multiple of the fragment size."""
+        server = await self.start()
+        framing = Framing(Termination.SIZE, frag_size=FRAGMENT_SIZE)
+        sizes = [200, 100, 150, 0]
+        expected = ["x" * size for size in sizes]
+        self.assertEqual(
+            await to_thread(self.run_sync, server, *sizes, framing=framing), expected
+        )
+        self.assertEqual(
+            await self.run_async(server, *sizes, framing=framing), expected
+        )
+        self.assertEqual(
+            await rcon(
+                "big",
+                "200",
+                host="127.0.0.1",
+                port=server.port,
+                passwd=PASSWD,
+                frag_threshold=FRAGMENT_SIZE,
+                framing=framing,
+            ),
+            "x" * 200,
+        )
+        # Sentinels detect the end of the responses of 200 and 100 characters.
+        self.assertEqual(server.sentinels, 5)
+
+    async def test_size_pauses(self):
+        """Tests that pauses after full fragments do not cut responses short."""
+        server = await self.start(PausingServer)
+        framing = Framing(Termination.SIZE, frag_size=FRAGMENT_SIZE)
+        sizes = [250, 42]
+        expected = ["x" * size for size in sizes]
+        self.assertEqual(
+            await to_thread(self.run_sync, server, *sizes, framing=framing), expected
+        )
+        self.assertEqual(
+            await self.run_async(server, *sizes, framing=framing), expected
+        )
+        self.assertEqual(
+            await rcon(
+                "big",
+                "250",
+                host="127.0.0.1",
+                port=server.port,
+                passwd=PASSWD,
+                frag_threshold=FRAGMENT_SIZE,
+                framing=framing,
+            ),
+            "x" * 250,
+        )
+        self.assertEqual(server.sentinels, 3)
+
+    async def test_idle(self):
+        """Tests reading responses of servers, which do not echo sentinels."""
+        server = await self.start(echo_sentinels=False)
+        framing = Framing(Termination.IDLE)
+        sizes = [250, 100, 42]
+        expected = ["x" * size for size in sizes]
+        self.assertEqual(
+            await to_thread(self.run_sync, server, *sizes, framing=framing), expected
+        )
+        self.assertEqual(
+            await self.run_async(server, *sizes, framing=framing), expected
+        )
+        self.assertEqual(server.sentinels, 0)
+
+    async def test_learning_no_echo(self):
+        """Tests that idle gaps are learned if the server repeatedly does not echo."""
+        server = await self.start(echo_sentinels=False)
+        framing = learned("127.0.0.1", server.port)
+
+        def run() -> str:
+            for _ in range(LEARN_AFTER):
+                with Client(
+                    "127.0.0.1",
+                    server.port,
+                    timeout=0.2,
+                    passwd=PASSWD,
+                    frag_threshold=FRAGMENT_SIZE,
+                    framing=framing,
+                ) as client:
+                    self.assertRaises(TimeoutError, client.run, "big", "250")
+
+            return self.run_sync(server, 250, framing=framing)[0]
+
+        self.assertEqual(await to_thread(run), "x" * 250)
+        self.assertIs(framing.termination, Termination.IDLE)
+        self.assertEqual(server.sentinels, LEARN_AFTER)
@@ -0,0 +1,282 @@
+"""Test the pools of logged-in clients."""
+
+from asyncio import StreamReader, StreamWriter, create_task, gather
+from asyncio import get_running_loop, sleep, to_thread
+from threading import Event, Thread
+from time import sleep as sync_sleep
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.source import AsyncClientPool, ClientPool
+from rcon.source.pool import is_alive
+from rcon.source.proto import Decoder, Packet
+from rcon.source.server import MIRROR_TERMINATOR, Server
+
+FRAGMENT_SIZE = 100
+
+
+class LaggingWriter:
+    """Sends the terminators of mirrored empty responses late."""
+
+    def __init__(self, writer: StreamWriter):
+        self.writer = writer
+        self.decoder = Decoder()
+
+    def __getattr__(self, name: str):
+        return getattr(self.writer, name)
+
+    def write(self, data: bytes) -> None:
+        self.decoder.feed(data)
+
+        for packet in self.decoder.decode():
+            if packet.payload == MIRROR_TERMINATOR:
+                get_running_loop().call_later(0.02, self.writer.write, bytes(packet))
+            else:
+                self.writer.write(bytes(packet))
+
+PASSWD = "secret"
+
+
+class DroppingServer(Server):
+    """A server, which drops the connection on the first flaky command
+    and sends the end of mirrored empty responses late.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(frag_size=FRAGMENT_SIZE, **kwargs)
+        self.drops = 1
+
+    async def handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        await super().handle(reader, LaggingWriter(writer))
+
+    async def respond(self, request: Packet) -> list[Packet]:
+        if request.payload == b"flaky" and self.drops:
+            self.drops -= 1
+            raise ConnectionResetError()
+
+        return await super().respond(request)
+
+
+class PoolTestCase(IsolatedAsyncioTestCase):
+    """Run a local server, which counts the logins."""
+
+    async def asyncSetUp(self):
+        self.logins = 0
+        self.server = DroppingServer(authenticate=self.authenticate)
+        self.server.command("name")(lambda: "server")
+        self.server.command("flaky")(lambda: "recovered")
+        self.server.command("big")(lambda: "x" * FRAGMENT_SIZE * 2)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def authenticate(self, passwd: str) -> bool:
+        """Count the logins."""
+        self.logins += 1
+        return passwd == PASSWD
+
+    @property
+    def address(self) -> dict[str, str | int]:
+        """Return the address and password of the server."""
+        return {"host": "127.0.0.1", "port": self.server.port, "passwd": PASSWD}
+
+
+class TestClientPool(PoolTestCase):
+    """Test the thread-safe pool."""
+
+    async def test_reuse(self):
+        """Tests that returned clients are reused."""
+
+        def run() -> list[str]:
+            with ClientPool(timeout=2) as pool:
+                return [pool.run("name", **self.address) for _ in range(5)]
+
+        self.assertEqual(await to_thread(run), ["server"] * 5)
+        self.assertEqual(self.logins, 1)
+
+    async def test_max_size(self):
+        """Tests that checkouts block while all clients are checked out."""
+        checked_out = Event()
+        release = Event()
+        clients = []
+
+        def hold(pool: ClientPool) -> None:
+            with pool.client(**self.address) as client:
+                clients.append(client)
+                checked_out.set()
+                release.wait()
+
+        def run() -> str:
+            with ClientPool(max_size=1, timeout=2) as pool:
+                holder = Thread(target=hold, args=(pool,))
+                holder.start()
+                checked_out.wait()
+                waiter = Thread(target=hold, args=(pool,))
+                waiter.start()
+                sync_sleep(0.05)
+                self.assertEqual(len(clients), 1)
+                release.set()
+                holder.join()
+                waiter.join()
+                return pool.run("name", **self.address)
+
+        self.assertEqual(await to_thread(run), "server")
+        self.assertEqual(len(clients), 2)
+        self.assertIs(clients[0], clients[1])
+        self.assertEqual(self.logins, 1)
+
+    async def test_idle_timeout(self):
+        """Tests that idle clients are evicted."""
+
+        def run() -> None:
+            with ClientPool(idle_timeout=0.01, timeout=2) as pool:
+                with pool.client(**self.address) as client:
+                    pass
+
+                sync_sleep(0.02)
+                pool.evict()
+                self.assertEqual(client.fileno(), -1)
+                self.assertEqual(pool.run("name", **self.address), "server")
+
+        await to_thread(run)
+        self.assertEqual(self.logins, 2)
+
+    async def test_unhealthy(self):
+        """Tests that unhealthy clients are discarded."""
+
+        def run() -> None:
+            with ClientPool(timeout=2, health_check=lambda _: False) as pool:
+                with pool.client(**self.address) as client:
+                    pass
+
+                self.assertEqual(pool.run("name", **self.address), "server")
+                self.assertEqual(client.fileno(), -1)
+
+        await to_thread(run)
+        self.assertEqual(self.logins, 2)
+
+    async def test_is_alive(self):
+        """Tests that closed connections are detected."""
+
+        def run() -> None:
+            with ClientPool(timeout=2) as pool:
+                with pool.client(**self.address) as client:
+                    self.assertTrue(is_alive(client))
+                    client.send(Packet.make_command("name"))
+                    sync_sleep(0.05)
+                    self.assertFalse(is_alive(client))
+
+                with pool.client(**self.address) as client:
+                    client.send(Packet.make_command("flaky"))
+                    sync_sleep(0.05)
+                    self.assertFalse(is_alive(client))
+
+        await to_thread(run)
+
+    async def test_late_echo(self):
+        """Tests that clients receiving the end of an echo when idle are kept."""
+
+        def run() -> list[str]:
+            with ClientPool(timeout=2, frag_threshold=FRAGMENT_SIZE) as pool:
+                responses = []
+
+                for _ in range(5):
+                    responses.append(pool.run("big", **self.address))
+                    sync_sleep(0.05)
+
+                return responses
+
+        self.assertEqual(await to_thread(run), ["x" * FRAGMENT_SIZE * 2] * 5)
+        self.assertEqual(self.logins, 1)
+
+    async def test_retry(self):
+        """Tests that commands are retried once on a new connection."""
+
+        def run() -> str:
+            with ClientPool(timeout=2, health_check=lambda _: True) as pool:
+                self.assertEqual(pool.run("name", **self.address), "server")
+                return pool.run("flaky", **self.address)
+
+        self.assertEqual(await to_thread(run), "recovered")
+        self.assertEqual(self.logins, 2)
+
+    async def test_closed(self):
+        """Tests that closed pools cannot be used."""
+        pool = ClientPool()
+        pool.close()
+        self.assertRaises(RuntimeError, pool.run, "name", **self.address)
+
+
+class TestAsyncClientPool(PoolTestCase):
+    """Test the asynchronous pool against a local server."""
+
+    async def test_reuse(self):
+        """Tests that concurrent commands use at most max_size clients."""
+        async with AsyncClientPool(max_size=2, timeout=2) as pool:
+            responses = await gather(
+                *(pool.run("name", **self.address) for _ in range(10))
+            )
+
+        self.assertEqual(responses, ["server"] * 10)
+        self.assertEqual(self.logins, 2)
+
+    async def test_max_size(self):
+        """Tests that checkouts wait while all clients are checked out."""
+        clients = []
+
+        async def hold(pool: AsyncClientPool) -> None:
+            async with pool.client(**self.address) as client:
+                clients.append(client)
+                await sleep(0.05)
+
+        async with AsyncClientPool(max_size=1, timeout=2) as pool:
+            holder = create_task(hold(pool))
+            await sleep(0.01)
+            waiter = create_task(hold(pool))
+            await sleep(0.02)
+            self.assertEqual(len(clients), 1)
+            await gather(holder, waiter)
+
+        self.assertEqual(len(clients), 2)
+        self.assertIs(clients[0], clients[1])
+        self.assertEqual(self.logins, 1)
+
+    async def test_idle_timeout(self):
+        """Tests that idle clients are evicted."""
+        async with AsyncClientPool(idle_timeout=0.01, timeout=2) as pool:
+            async with pool.client(**self.address) as client:
+                pass
+
+            await sleep(0.02)
+            await pool.evict()
+            self.assertFalse(client.connected)
+            self.assertEqual(await pool.run("name", **self.address), "server")
+
+        self.assertEqual(self.logins, 2)
+
+    async def test_unhealthy(self):
+        """Tests that disconnected clients are discarded."""
+        async with AsyncClientPool(timeout=2) as pool:
+            async with pool.client(**self.address) as client:
+                pass
+
+            await client.close()
+            self.assertEqual(await pool.run("name", **self.address), "server")
+
+        self.assertEqual(self.logins, 2)
+
+    async def test_retry(self):
+        """Tests that commands are retried once on a new connection."""
+        async with AsyncClientPool(timeout=2, health_check=lambda _: True) as pool:
+            self.assertEqual(await pool.run("name", **self.address), "server")
+            self.assertEqual(await pool.run("flaky", **self.address), "recovered")
+
+        self.assertEqual(self.logins, 2)
+
+    async def test_closed(self):
+        """Tests that closed pools cannot be used."""
+        pool = AsyncClientPool()
+        await pool.close()
+
+        with self.assertRaises(RuntimeError):
+            await pool.run("name", **self.address)
@@ -0,0 +1,80 @@
+"""Test the game profiles."""
+
+from asyncio import to_thread
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.source import AsyncClient, Client
+from rcon.source.framing import Termination, learned
+from rcon.source.profiles import PROFILES, get_profile
+from rcon.source.server import Server, echo
+
+PASSWD = "secret"
+
+
+class TestProfiles(IsolatedAsyncioTestCase):
+    """Test the profiles with the clients."""
+
+    async def asyncSetUp(self):
+        self.server = Server(passwd=PASSWD)
+        self.server.command("echo")(echo)
+        self.server.command("big")(lambda size: "x" * int(size))
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def test_registry(self):
+        """Tests the registered profiles."""
+        self.assertIs(get_profile(None), PROFILES["default"])
+        self.assertIs(get_profile("minecraft").termination, Termination.SIZE)
+        self.assertIs(get_profile("rust").termination, Termination.SIZE)
+        self.assertRaises(KeyError, get_profile, "foo")
+
+    def test_framing(self):
+        """Tests that only profiles, which opt in, learn the framing."""
+        self.assertIs(
+            get_profile("source").framing("127.0.0.1", 1), learned("127.0.0.1", 1)
+        )
+
+        for name in ("default", "ark"):
+            with self.subTest(profile=name):
+                framing = get_profile(name).framing("127.0.0.1", 1)
+                self.assertIsNot(framing, learned("127.0.0.1", 1))
+                self.assertFalse(framing.learn)
+
+    async def test_profiles(self):
+        """Tests that the clients work with all profiles."""
+        for name, profile in PROFILES.items():
+            with self.subTest(profile=name):
+                host, port = "127.0.0.1", self.server.port
+                # Servers split responses where the profile expects them to.
+                self.server.frag_size = profile.frag_threshold
+
+                def run() -> list[str]:
+                    with Client(
+                        host,
+                        port,
+                        passwd=PASSWD,
+                        **profile.client_kwargs(host, port) | {"timeout": 2},
+                    ) as client:
+                        return [
+                            client.run("big", "10000", **profile.run_kwargs()),
+                            *client.run_many(["echo a", "echo b"]),
+                        ]
+
+                expected = ["x" * 10000, "a", "b"]
+                self.assertEqual(await to_thread(run), expected)
+
+                async with AsyncClient(
+                    host,
+                    port,
+                    passwd=PASSWD,
+                    **profile.async_client_kwargs(host, port) | {"timeout": 2},
+                ) as client:
+                    self.assertEqual(
+                        [
+                            await client.run("big", "10000"),
+                            *await client.run_many(["echo a", "echo b"]),
+                        ],
+                        expected,
+                    )
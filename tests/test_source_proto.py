@@ -5,9 +5,12 @@ from io import BytesIO
 from random import randint
 from unittest import TestCase
 
+from rcon.exceptions import EmptyResponse
+from rcon.source.proto import Decoder
 from rcon.source.proto import LittleEndianSignedInt32
 from rcon.source.proto import Packet
 from rcon.source.proto import Type
+from rcon.source.proto import pack
 from rcon.source.proto import random_request_id
 
 
@@ -156,3 +159,78 @@ class TestPacket(TestCase):
     def test_bytes_rw(self):
         """Tests recovering from bytes."""
         self.assertEqual(Packet.read(BytesIO(bytes(self.packet))), self.packet)
+
+    def test_bytes_layout(self):
+        """Tests the byte layout of the packet."""
+        self.assertEqual(
+            bytes(self.packet),
+            bytes(LittleEndianSignedInt32(len(self.packet.payload) + 10))
+            + bytes(self.packet.id)
+            + bytes(self.packet.type)
+            + self.packet.payload
+            + self.packet.terminator,
+        )
+
+    def test_join(self):
+        """Tests joining fragments."""
+        fragments = [self.packet._replace(payload=bytes([i]) * 10) for i in range(5)]
+        self.assertEqual(
+            Packet.join(fragments),
+            self.packet._replace(payload=b"".join(f.payload for f in fragments)),
+        )
+        self.assertEqual(Packet.join(fragments), sum(fragments, start=None))
+
+    def test_join_mismatch(self):
+        """Tests joining fragments of different responses."""
+        other = self.packet._replace(id=self.packet.id + 1)
+        self.assertRaises(ValueError, Packet.join, [self.packet, other])
+
+    def test_decode_offset(self):
+        """Tests decoding a packet at an offset of a buffer."""
+        buffer = b"garbage" + bytes(self.packet)
+        self.assertEqual(Packet.decode(buffer, offset=7), self.packet)
+
+    def test_decode_incomplete(self):
+        """Tests decoding an incomplete packet."""
+        self.assertRaises(ValueError, Packet.decode, bytes(self.packet)[:-1])
+
+    def test_read_empty(self):
+        """Tests reading from an exhausted file-like object."""
+        self.assertRaises(EmptyResponse, Packet.read, BytesIO())
+
+    def test_decode_short(self):
+        """Tests decoding a packet too short for its ID, type and terminator."""
+        self.assertRaises(ValueError, Packet.decode_body, bytes(4))
+        self.assertRaises(ValueError, Packet.decode, bytes((4, 0, 0, 0)) + bytes(4))
+
+
+class TestDecoder(TestCase):
+    """Tests the incremental packet decoder."""
+
+    def setUp(self):
+        """Creates packets and a decoder."""
+        self.packets = [
+            Packet.make_command("say", "x" * size) for size in (0, 10, 4096, 100)
+        ]
+        self.decoder = Decoder()
+
+    def test_decode_all(self):
+        """Tests decoding multiple packets from one buffer."""
+        self.decoder.feed(pack(self.packets))
+        self.assertEqual(self.decoder.decode(), self.packets)
+        self.assertFalse(self.decoder.buffer)
+
+    def test_decode_partial(self):
+        """Tests decoding packets fed byte by byte."""
+        decoded = []
+
+        for byte in pack(self.packets):
+            self.decoder.feed(bytes([byte]))
+            decoded += self.decoder.decode()
+
+        self.assertEqual(decoded, self.packets)
+
+    def test_decode_empty_response(self):
+        """Tests decoding of an empty response."""
+        self.decoder.feed(bytes(4))
+        self.assertRaises(EmptyResponse, self.decoder.decode)
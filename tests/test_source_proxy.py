@@ -0,0 +1,113 @@
+"""Test the RCON proxy."""
+
+from asyncio import gather, to_thread
+from itertools import count
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.exceptions import WrongPassword
+from rcon.source import AsyncClient, Client
+from rcon.source.proxy import Proxy
+from rcon.source.server import Server, echo
+
+
+class TestProxy(IsolatedAsyncioTestCase):
+    """Test relaying commands over one upstream session."""
+
+    async def asyncSetUp(self):
+        self.logins = 0
+        self.counter = count()
+        self.upstream = Server(authenticate=self.authenticate, default=echo)
+        self.upstream.command("list")(lambda: f"list {next(self.counter)}")
+        self.upstream.command("kick")(lambda: f"kick {next(self.counter)}")
+        self.upstream.command("big")(lambda: "x" * 10000)
+        await self.upstream.start()
+        self.proxy = Proxy(
+            "127.0.0.1",
+            self.upstream.port,
+            "upstream",
+            timeout=2,
+            cache=["list"],
+            cache_ttl=60,
+            passwd="downstream",
+        )
+        await self.proxy.start()
+
+    async def asyncTearDown(self):
+        await self.proxy.close()
+        await self.upstream.close()
+
+    def authenticate(self, passwd: str) -> bool:
+        """Count the upstream logins."""
+        self.logins += 1
+        return passwd == "upstream"
+
+    def client(self, cls=AsyncClient, passwd="downstream"):
+        """Return a client for the proxy."""
+        return cls("127.0.0.1", self.proxy.port, timeout=2, passwd=passwd)
+
+    async def test_single_upstream_session(self):
+        """Tests that many clients share one upstream login."""
+        clients = [self.client() for _ in range(20)]
+
+        try:
+            await gather(*(client.connect(login=True) for client in clients))
+            responses = await gather(
+                *(client.run("say", str(index)) for index, client in enumerate(clients))
+            )
+        finally:
+            await gather(*(client.close() for client in clients))
+
+        self.assertEqual(responses, [f"say {index}" for index in range(20)])
+        self.assertEqual(self.logins, 1)
+
+    async def test_fragmentation(self):
+        """Tests that large responses are relayed to synchronous clients."""
+
+        def run() -> str:
+            with self.client(Client) as client:
+                return client.run("big")
+
+        self.assertEqual(await to_thread(run), "x" * 10000)
+
+    async def test_cache(self):
+        """Tests that only the configured commands are cached."""
+        async with self.client() as client:
+            self.assertEqual(await client.run("list"), "list 0")
+            self.assertEqual(await client.run("list"), "list 0")
+            self.assertEqual(await client.run("kick"), "kick 1")
+            self.assertEqual(await client.run("kick"), "kick 2")
+
+    async def test_reconnect(self):
+        """Tests that a lost upstream connection is reestablished."""
+        async with self.client() as client:
+            self.assertEqual(await client.run("say", "foo"), "say foo")
+            await self.proxy.upstream.close()
+            self.assertEqual(await client.run("say", "bar"), "say bar")
+
+        self.assertEqual(self.logins, 2)
+
+    async def test_wrong_password(self):
+        """Tests that downstream clients authenticate against the proxy."""
+        with self.assertRaises(WrongPassword):
+            async with self.client(passwd="upstream"):
+                pass
+
+    async def test_default_password(self):
+        """Tests that clients log in with the upstream password by default."""
+        proxy = Proxy("127.0.0.1", self.upstream.port, "upstream", timeout=2)
+
+        async with proxy:
+            client = AsyncClient("127.0.0.1", proxy.port, timeout=2, passwd="upstream")
+
+            async with client:
+                self.assertEqual(await client.run("echo", "hello"), "echo hello")
+
+            with self.assertRaises(WrongPassword):
+                async with AsyncClient(
+                    "127.0.0.1", proxy.port, timeout=2, passwd="anything"
+                ):
+                    pass
+
+    def test_password_required(self):
+        """Tests that the proxy cannot be opened to clients without a password."""
+        self.assertRaises(ValueError, Proxy, "127.0.0.1", self.upstream.port)
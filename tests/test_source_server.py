@@ -0,0 +1,105 @@
+"""Test the Source RCON server against the clients."""
+
+from asyncio import gather, open_connection, sleep, to_thread, wait_for
+from logging import DEBUG
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.exceptions import WrongPassword
+from rcon.source import AsyncClient, Client
+from rcon.source.server import LOGGER, Server, echo
+
+PASSWD = "secret"
+
+
+class TestServer(IsolatedAsyncioTestCase):
+    """Test the server with the synchronous and asynchronous clients."""
+
+    async def asyncSetUp(self):
+        self.server = Server(passwd=PASSWD)
+        self.server.command("echo")(echo)
+        self.server.command("big")(lambda size: "x" * int(size))
+
+        @self.server.command("slow")
+        async def slow(text: str) -> str:
+            await sleep(0.01)
+            return text
+
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def client(self, cls=AsyncClient, passwd=PASSWD):
+        """Return a client for the server."""
+        return cls("127.0.0.1", self.server.port, timeout=2, passwd=passwd)
+
+    async def test_command(self):
+        """Tests that commands are dispatched to their handlers."""
+        async with self.client() as client:
+            self.assertEqual(await client.run("echo", "hello", "world"), "hello world")
+            self.assertEqual(await client.run("slow", "hello"), "hello")
+            self.assertEqual(await client.run("foo"), "Unknown command: foo")
+
+    async def test_wrong_password(self):
+        """Tests that wrong passwords are rejected."""
+        with self.assertRaises(WrongPassword):
+            async with self.client(passwd="wrong"):
+                pass
+
+    async def test_fragmentation(self):
+        """Tests that large responses are fragmented and reassembled."""
+        async with self.client() as client:
+            self.assertEqual(await client.run("big", "10000"), "x" * 10000)
+            self.assertEqual(await client.run("big", "4096"), "x" * 4096)
+            self.assertEqual(await client.run("big", "0"), "")
+
+    async def test_synchronous_client(self):
+        """Tests fragmentation detection of the synchronous client."""
+
+        def run() -> list[str]:
+            with self.client(Client) as client:
+                return [client.run("big", "10000"), client.run("echo", "done")]
+
+        self.assertEqual(await to_thread(run), ["x" * 10000, "done"])
+
+    async def test_concurrent_connections(self):
+        """Tests that many connections are served concurrently."""
+        clients = [self.client() for _ in range(100)]
+
+        try:
+            await gather(*(client.connect(login=True) for client in clients))
+            responses = await gather(
+                *(
+                    client.run("slow", str(index))
+                    for index, client in enumerate(clients)
+                )
+            )
+        finally:
+            await gather(*(client.close() for client in clients))
+
+        self.assertEqual(responses, [str(index) for index in range(100)])
+
+    async def test_invalid_size(self):
+        """Tests that sizes out of bounds are rejected before reading the body."""
+        for size in (4, -1, 4107, 2**31 - 1):
+            with self.subTest(size=size), self.assertLogs(LOGGER, DEBUG) as logs:
+                reader, writer = await open_connection("127.0.0.1", self.server.port)
+                writer.write(size.to_bytes(4, "little", signed=True) + bytes(4))
+
+                try:
+                    self.assertEqual(await wait_for(reader.read(), 2), b"")
+                finally:
+                    writer.close()
+
+                self.assertIn("Invalid packet size.", logs.output[0])
+
+    async def test_close(self):
+        """Tests that closing the server closes the open connections."""
+        reader, writer = await open_connection("127.0.0.1", self.server.port)
+
+        try:
+            await sleep(0.01)
+            await wait_for(self.server.close(), 2)
+            self.assertEqual(await wait_for(reader.read(), 2), b"")
+        finally:
+            writer.close()
@@ -0,0 +1,111 @@
+"""Test streaming large responses as text chunks."""
+
+from asyncio import sleep, to_thread
+from unittest import IsolatedAsyncioTestCase
+
+from rcon.source import AsyncClient, Client
+from rcon.source.framing import Framing
+from rcon.source.server import Server, echo
+
+PASSWD = "secret"
+FRAGMENT_SIZE = 100
+# The fragment boundaries split the two-byte characters.
+TEXT = "x" + "ä" * 250
+
+
+class TestStream(IsolatedAsyncioTestCase):
+    """Test streaming with the synchronous and asynchronous clients."""
+
+    async def asyncSetUp(self):
+        self.server = Server(passwd=PASSWD, frag_size=FRAGMENT_SIZE)
+        self.server.command("echo")(echo)
+        self.server.command("text")(lambda: TEXT)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    def client(self, cls=AsyncClient):
+        """Return a client for the server."""
+        return cls(
+            "127.0.0.1",
+            self.server.port,
+            timeout=2,
+            passwd=PASSWD,
+            frag_threshold=FRAGMENT_SIZE,
+            framing=Framing(),
+        )
+
+    async def test_run_iter(self):
+        """Tests that the text is decoded across fragment boundaries."""
+
+        def run() -> list[str]:
+            with self.client(Client) as client:
+                return list(client.run_iter("text"))
+
+        chunks = await to_thread(run)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), TEXT)
+
+    async def test_run_iter_closed(self):
+        """Tests that the connection stays in sync if the iterator is closed."""
+
+        def run() -> tuple[str, str]:
+            with self.client(Client) as client:
+                chunks = client.run_iter("text")
+                first = next(chunks)
+                chunks.close()
+                return first, client.run("echo", "done")
+
+        first, response = await to_thread(run)
+        self.assertTrue(TEXT.startswith(first))
+        self.assertEqual(response, "done")
+
+    async def test_run_iter_nested(self):
+        """Tests that running a command while iterating raises instead of hanging."""
+
+        def run() -> tuple[str, str]:
+            with self.client(Client) as client:
+                chunks = client.run_iter("text")
+                text = next(chunks)
+                self.assertRaises(RuntimeError, client.run, "echo", "nested")
+                text += "".join(chunks)
+                return text, client.run("echo", "done")
+
+        self.assertEqual(await to_thread(run), (TEXT, "done"))
+
+    async def test_stream(self):
+        """Tests that the text is decoded across fragment boundaries."""
+        async with self.client() as client:
+            chunks = [chunk async for chunk in client.stream("text")]
+            self.assertEqual(await client.run("echo", "done"), "done")
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), TEXT)
+
+    async def test_stream_bounded(self):
+        """Tests that a lagging consumer holds back further fragments."""
+        async with self.client() as client:
+            chunks = []
+            buffered = []
+            stream = client.stream("text", buffer=1)
+            chunks.append(await anext(stream))
+            (pending,) = client._pending.values()
+
+            async for chunk in stream:
+                await sleep(0.02)
+                buffered.append(pending.queue.qsize())
+                chunks.append(chunk)
+
+            # One fragment and the end of the response at most.
+            self.assertLessEqual(max(buffered), 2)
+            self.assertEqual("".join(chunks), TEXT)
+            self.assertEqual(await client.run("echo", "done"), "done")
+
+    async def test_stream_closed(self):
+        """Tests that the connection stays usable if the consumer stops early."""
+        async with self.client() as client:
+            async for _ in client.stream("text", buffer=1):
+                break
+
+            self.assertEqual(await client.run("echo", "done"), "done")
@@ -0,0 +1,83 @@
+"""Test running commands repeatedly."""
+
+from itertools import islice
+from time import monotonic
+from unittest import TestCase
+
+from rcon.exceptions import EmptyResponse
+from rcon.watch import changes, diff, poll
+
+
+class FakeClient:
+    """A client returning scripted responses."""
+
+    def __init__(self, responses: list[str | Exception], log: list[str]):
+        self.responses = responses
+        self.log = log
+
+    def connect(self, login: bool = False) -> None:
+        self.log.append("connect")
+
+    def close(self) -> None:
+        self.log.append("close")
+
+    def run(self, command: str, *args: str) -> str:
+        if isinstance(response := self.responses.pop(0), Exception):
+            raise response
+
+        return response
+
+
+class TestPoll(TestCase):
+    """Test polling commands."""
+
+    def test_schedule(self):
+        """Tests that commands are run on a fixed schedule over one connection."""
+        log = []
+        responses = poll(lambda: FakeClient(["a"] * 5, log), "status", interval=0.02)
+        started = monotonic()
+        self.assertEqual(list(islice(responses, 5)), ["a"] * 5)
+        elapsed = monotonic() - started
+        self.assertGreaterEqual(elapsed, 0.075)
+        self.assertLess(elapsed, 0.15)
+        responses.close()
+        self.assertEqual(log, ["connect", "close"])
+
+    def test_reconnect(self):
+        """Tests that broken connections are replaced."""
+        log = []
+        scripts = [["a", EmptyResponse()], [ConnectionResetError()], ["b"]]
+        responses = poll(
+            lambda: FakeClient(scripts.pop(0), log),
+            "status",
+            interval=0.01,
+            backoff=0.01,
+        )
+        self.assertEqual(list(islice(responses, 2)), ["a", "b"])
+        responses.close()
+        self.assertEqual(log, ["connect", "close"] * 3)
+
+    def test_fatal_error(self):
+        """Tests that errors other than connection errors are raised."""
+        responses = poll(
+            lambda: FakeClient([ValueError()], []), "status", interval=0.01
+        )
+        self.assertRaises(ValueError, next, responses)
+
+
+class TestChanges(TestCase):
+    """Test filtering changed responses."""
+
+    def test_changes(self):
+        """Tests that only changed responses are yielded."""
+        self.assertEqual(
+            list(changes(["a", "a", "b", "b", "a"])),
+            [(None, "a"), ("a", "b"), ("b", "a")],
+        )
+
+    def test_diff(self):
+        """Tests the diff of two responses."""
+        self.assertEqual(
+            diff("a\nb", "a\nc"),
+            "--- previous\n+++ current\n@@ -1,2 +1,2 @@\n a\n-b\n+c",
+        )